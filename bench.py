@@ -0,0 +1,261 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import timeit
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+# Each benchmark is a setup function that returns the operation to time.
+# Setup runs once and is not timed. Results are the best time per operation
+# over several repeats, which is the least noisy number on a busy machine.
+BENCHMARKS = {}
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+# A plain room, so moves never depend on which level a cache deals
+ROOM = [list(row) for row in ["■■■■■■■", "■ X   ■", "■  B  ■", "■  P  ■", "■     ■", "■■■■■■■"]]
+
+@benchmark("spades.sokoban_move")
+def bench_sokoban_move():
+    from spades_g import Spade_SB
+    game = Spade_SB(2)
+    game.set_level(ROOM, (3, 3))
+    def op():
+        game.move('d')
+        game.move('a')
+    return op
+
+@benchmark("spades.sokoban_check_win")
+def bench_sokoban_check_win():
+    from spades_g import Spade_SB
+    game = Spade_SB(2)
+    game.set_level(ROOM, (3, 3))
+    return game.check_win
+
+@benchmark("spades.sokoban_frame_100x100")
+def bench_sokoban_frame():
+    from sokoban_board import open_room
+    from spades_g import Spade_SB
+    game = Spade_SB(2)
+    game.set_level(*open_room(100, 25, random.Random(0)))
+    game.screen = []
+    def op():
+        game.move('d')
+        game.move('a')
+        game.display()
+        game.check_win()
+        game.screen.clear()
+    return op
+
+@benchmark("spades.lights_toggle")
+def bench_lights_toggle():
+    from spades_g import Spade_LO
+    game = Spade_LO(5)
+    cell = game.size * game.size // 2
+    return lambda: game.toggle(cell)
+
+@benchmark("clubs.codebreaker_feedback")
+def bench_codebreaker_feedback():
+    from clubs_g import Club_CBG
+    game = Club_CBG(6)
+    guess = [9, 8, 7, 6, 5][:game.code_length]
+    return lambda: game.get_feedback(guess)
+
+@benchmark("clubs.rps_winner")
+def bench_rps_winner():
+    from clubs_g import Club_RPS
+    game = Club_RPS(5)
+    pairs = [(p, c) for p in game.choices for c in game.choices]
+    def op():
+        for player, computer in pairs:
+            game.determine_winner(player, computer)
+    return op
+
+@benchmark("hearts.hangman_guess")
+def bench_hangman_guess():
+    from hearts_g import Heart_HM
+    game = Heart_HM(5)
+    def op():
+        game.guessed_letters = set()
+        game.remaining_attempts = 6
+        for letter in "etaoin":
+            game.guess(letter)
+    return op
+
+@benchmark("hearts.hangman_progress")
+def bench_hangman_progress():
+    from hearts_g import Heart_HM
+    game = Heart_HM(5)
+    game.guessed_letters = set("etaoin")
+    return game.display_progress
+
+@benchmark("diamonds.color_grid")
+def bench_color_grid():
+    from diamond_g import Diamond_CGM
+    return Diamond_CGM(6).generate_color_grid
+
+@benchmark("diamonds.color_position")
+def bench_color_position():
+    from diamond_g import Diamond_CGM
+    game = Diamond_CGM(6)
+    grid = game.generate_color_grid()
+    return lambda: game.get_color_position(grid, 'BLUE')
+
+@benchmark("diamonds.color_grid_26x26")
+def bench_color_grid_large():
+    from diamond_g import PALETTE, Diamond_CGM
+    game = Diamond_CGM(6, grid_size=26, color_count=len(PALETTE))
+    game.screen = []
+    def op():
+        grid = game.generate_color_grid()
+        game.display_grid(grid, reveal=True)
+        for color in game.color_pool:
+            game.validate_position(game.get_color_position(grid, color))
+        game.screen.clear()
+    return op
+
+@benchmark("main.card_visual")
+def bench_card_visual():
+    from g_main import Card, get_card_visual
+    cards = [Card(suit, number) for suit in "♥♦♣♠" for number in "A23456"]
+    def op():
+        for card in cards:
+            get_card_visual(card)
+    return op
+
+@benchmark("main.save_load_round_trip")
+def bench_save_round_trip():
+    from save_store import SaveStore
+    directory = tempfile.mkdtemp()
+    store = SaveStore(os.path.join(directory, "bench.db"))
+    cards = [(suit, number) for suit in "♥♦♣♠" for number in "A23456"]
+    def op():
+        store.save("bench", 1, cards, 12)
+        store.load("bench", 1)
+    return op
+
+@benchmark("main.checkpoint_round_trip")
+def bench_checkpoint_round_trip():
+    from spades_g import Spade_SB
+    game = Spade_SB(2)
+    game.set_level(ROOM, (3, 3))
+    for direction in "dwaas":
+        game.move(direction)
+    return lambda: Spade_SB.restore(game.snapshot())
+
+@benchmark("render.hangman_frame")
+def bench_render_frame():
+    from renderer import CLEAR, Renderer
+    renderer = Renderer(lambda text: None, size=(80, 24))
+    frames = [[CLEAR, f"\n♥ Heart Game - Hangman\nWord: {word}\nRemaining attempts: 6\n"]
+              for word in ("_ _ _ _", "a _ _ _")]
+    def op():
+        renderer.render(frames[0])
+        renderer.render(frames[1])
+    return op
+
+def bench_gauntlet(policy_name):
+    from simulate import POLICIES, run_gauntlet
+    policy = POLICIES[policy_name]()
+    return lambda: run_gauntlet(policy)
+
+@benchmark("gauntlet.random_policy")
+def bench_gauntlet_random():
+    return bench_gauntlet("random")
+
+@benchmark("gauntlet.smart_policy")
+def bench_gauntlet_smart():
+    return bench_gauntlet("smart")
+
+# -----------------------------
+# Running and Comparing
+# -----------------------------
+def measure(op, repeat):
+    timer = timeit.Timer(op)
+    number, _ = timer.autorange()  # Enough calls to take at least 0.2 s
+    return min(timer.repeat(repeat, number)) / number, number
+
+def run(names, repeat=5, seed=0):
+    results = {}
+    for name in names:
+        random.seed(seed)  # Same random games every run
+        op = BENCHMARKS[name]()
+        seconds, number = measure(op, repeat)
+        results[name] = {"seconds": seconds, "number": number}
+        print(f"{name:<32}{format_time(seconds):>12}")
+    return {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+def format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+def compare(baseline, current, threshold):
+    """Prints the change of every benchmark. Returns the names that got slower than threshold."""
+    regressions = []
+    print(f"{'Benchmark':<32}{'Baseline':>12}{'Current':>12}{'Change':>9}")
+    print("-" * 65)
+    for name, result in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"{name:<32}{'-':>12}{format_time(result['seconds']):>12}{'new':>9}")
+            continue
+        change = result["seconds"] / old["seconds"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<32}{format_time(old['seconds']):>12}{format_time(result['seconds']):>12}"
+              f"{change:>+9.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the games' hot paths and whole gauntlets.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run benchmarks and save the results as JSON")
+    run_parser.add_argument("--out", default="bench_results.json")
+    run_parser.add_argument("--filter", default="", help="only benchmarks whose name contains this")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="slowdown that counts as a regression (default 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        names = [name for name in BENCHMARKS if args.filter in name]
+        report = run(names, args.repeat)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved to {args.out}")
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
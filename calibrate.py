@@ -0,0 +1,124 @@
+import argparse
+import math
+import random
+import time
+from multiprocessing import Pool
+from game_registry import RANKS, SUITS, registry
+from simulate import POLICIES, play_headless
+
+# -----------------------------
+# Difficulty Calibration
+# -----------------------------
+# Plays every card on its own, many times, with each reference policy and
+# reports the pass rate with a 95% Wilson confidence interval. Each game
+# (Hangman on the odd hearts, ...) should get harder as the card number
+# goes up, so its pass rate should never rise from one of its cards to the
+# next; rises are flagged as significant when the two intervals do not
+# overlap. Samples are split into chunks and spread over a process pool.
+#
+# A policy that has not finished a card after MAX_ASKS answers has lost it.
+# Every card is won well within that when it can be won at all (the longest
+# Sokoban solution is under 100 moves), and the cap keeps policies that go
+# round in circles from dominating the run time.
+Z = 1.96  # 95% confidence
+MAX_ASKS = 200
+
+def wilson(passed, total):
+    """95% Wilson score interval for a pass rate, as (low, high)."""
+    if total == 0:
+        return 0.0, 1.0
+    p = passed / total
+    centre = p + Z * Z / (2 * total)
+    spread = Z * math.sqrt(p * (1 - p) / total + Z * Z / (4 * total * total))
+    scale = 1 + Z * Z / total
+    return (centre - spread) / scale, (centre + spread) / scale
+
+def all_cards():
+    return [(suit, rank) for suit in SUITS.values() for rank in RANKS
+            if registry.game_class(suit, rank) is not None]
+
+def calibrate_chunk(job):
+    suit, rank, policy_name, samples, seed = job
+    # Policies draw from the random module and games from their own stream. With
+    # one seed for both, a random policy would repeat the presses that scrambled
+    # its Lights Out board.
+    random.seed(seed)
+    rng = random.Random(f"{seed}:games")
+    policy = POLICIES[policy_name]()
+    passed = 0
+    for _ in range(samples):
+        passed += bool(play_headless(registry.create(suit, rank, rng), policy, MAX_ASKS))
+    return suit, rank, policy_name, samples, passed
+
+def calibrate(cards, policies, samples, processes=None, chunk_size=2000, seed=0):
+    """Returns {(suit, rank, policy): [games, passed]} and the seconds it took."""
+    jobs = []
+    for suit, rank in cards:
+        for policy_name in policies:
+            for start in range(0, samples, chunk_size):
+                jobs.append((suit, rank, policy_name, min(chunk_size, samples - start), seed + len(jobs)))
+    random.Random(seed).shuffle(jobs)  # Mix slow and fast cards across workers
+    counts = {(suit, rank, policy_name): [0, 0] for suit, rank in cards for policy_name in policies}
+    start_time = time.time()
+    with Pool(processes) as pool:
+        for suit, rank, policy_name, games, passed in pool.imap_unordered(calibrate_chunk, jobs):
+            counts[(suit, rank, policy_name)][0] += games
+            counts[(suit, rank, policy_name)][1] += passed
+    return counts, time.time() - start_time
+
+def non_monotonic(cards, policies, counts):
+    """Where a game's pass rate rises from one card to a higher one. Returns (message, significant) pairs."""
+    families = {}
+    for suit, rank in cards:
+        families.setdefault((suit, registry.targets[(suit, rank)]), []).append(rank)
+    found = []
+    for (suit, target), ranks in families.items():
+        for policy_name in policies:
+            for lower, higher in zip(ranks, ranks[1:]):
+                games, passed = counts[(suit, lower, policy_name)]
+                games_high, passed_high = counts[(suit, higher, policy_name)]
+                if not games or not games_high or passed_high / games_high <= passed / games:
+                    continue
+                significant = wilson(passed_high, games_high)[0] > wilson(passed, games)[1]
+                game = target.partition(":")[2]
+                found.append((f"{game} {policy_name}: {suit}{lower} {passed / games:.1%} -> "
+                              f"{suit}{higher} {passed_high / games_high:.1%}", significant))
+    return found
+
+def print_report(cards, policies, counts, elapsed):
+    total = sum(games for games, _ in counts.values())
+    print(f"{total} games in {elapsed:.1f} s ({total / max(elapsed, 1e-9):.0f} games/s)\n")
+    header = f"{'Card':<6}{'Game':<15}" + "".join(f"{name:>24}" for name in policies)
+    print(header)
+    print("-" * len(header))
+    for suit, rank in cards:
+        game = registry.targets[(suit, rank)].partition(":")[2]
+        cells = []
+        for policy_name in policies:
+            games, passed = counts[(suit, rank, policy_name)]
+            low, high = wilson(passed, games)
+            cells.append(f"{passed / max(games, 1):>7.1%} [{low:6.1%},{high:6.1%}]")
+        print(f"{suit}{rank:<5}{game:<15}" + "".join(f"{cell:>24}" for cell in cells))
+    found = non_monotonic(cards, policies, counts)
+    print("\nPass rate rises with the card number (should fall):" if found else
+          "\nEvery game gets harder (or no easier) as its card number rises.")
+    for message, significant in found:
+        print(f"  {'SIGNIFICANT ' if significant else 'within noise '}{message}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure every card's pass rate against reference policies.")
+    parser.add_argument("--samples", type=int, default=10000, help="games per card and policy")
+    parser.add_argument("--policies", nargs="+", choices=sorted(POLICIES), default=["random", "greedy", "smart"])
+    parser.add_argument("--cards", nargs="+", metavar="CARD", help="only these cards, e.g. ♣A ♠6")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    cards = all_cards()
+    if args.cards:
+        cards = [(suit, rank) for suit, rank in cards if f"{suit}{rank}" in args.cards]
+    counts, elapsed = calibrate(cards, args.policies, args.samples, args.processes, args.chunk_size, args.seed)
+    print_report(cards, args.policies, counts, elapsed)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import time
+
+# -----------------------------
+# Clocks
+# -----------------------------
+# Every pause and time limit in the games is in game seconds. A clock says
+# what time it is in game seconds and how long a game pause takes in real
+# seconds, so the same rules run at full speed for players, faster for
+# demos, and instantly for bots and the simulator.
+class RealClock:
+    speed = 1.0
+
+    def now(self):
+        return time.monotonic()
+
+    def real_seconds(self, seconds):
+        """How long a pause of this many game seconds takes in real time."""
+        return seconds / self.speed
+
+    def sleep(self, seconds):
+        time.sleep(self.real_seconds(seconds))
+
+class ScaledClock(RealClock):
+    """Game time runs speed times faster than real time."""
+    def __init__(self, speed):
+        self.speed = speed
+        self.start = time.monotonic()
+
+    def now(self):
+        return self.start + (time.monotonic() - self.start) * self.speed
+
+class VirtualClock:
+    """Game time only moves when something sleeps, and sleeping takes no real time.
+
+    Meant for drivers that answer instantly (simulator, tests), not for people.
+    """
+    def __init__(self, start=0.0):
+        self.time = start
+
+    def now(self):
+        return self.time
+
+    def real_seconds(self, seconds):
+        return 0.0
+
+    def sleep(self, seconds):
+        self.time += seconds
+
+REAL_CLOCK = RealClock()
@@ -1,12 +1,42 @@
 import random
-import time
+from game_io import Ask, Game
+from code_breaker import CodeBreakerSolver
+from rps_predictor import MOVES, Predictor
+from snapshot import SnapshotFormat
+from telemetry import telemetry
 
-class Club_RPS:
-    def __init__(self, card_number):
+def get_marks(guess, secret_code):
+    marks = []
+    digits = set(secret_code)
+    for i in range(len(secret_code)):
+        if guess[i] == secret_code[i]:
+            marks.append("correct")
+        elif guess[i] in digits:
+            marks.append("wrong_pos")
+        else:
+            marks.append("wrong")
+    return marks
+
+class Club_RPS(Game):
+    # card number, player's and opponent's scores; moves played and the opponent's model
+    SNAPSHOT = SnapshotFormat(b"RP", 1, "BBB", blobs=2)
+
+    def __init__(self, card_number, rng=random):
         self.card_number = card_number
-        # For cards 2,4,6: goals are 3,2,1 respectively
-        self.goal = 4 - (card_number // 2) if card_number % 2 == 0 else 7 - card_number
+        self.rng = rng
+        # For cards 1,3,5: goals are 6,4,2 respectively; endurance cards past 5
+        # need one more win every two cards (7: 3, 9: 4)
+        if card_number % 2 == 0:
+            self.goal = max(1, 4 - card_number // 2)
+        elif card_number <= 5:
+            self.goal = 7 - card_number
+        else:
+            self.goal = 2 + (card_number - 5) // 2
         self.choices = ["rock", "paper", "scissors"]
+        self.player_score = 0
+        self.computer_score = 0
+        self.predictor = None  # The opponent, loaded when the game starts
+        self.moves = []        # First letter of every move the player made
         self.colors = {
             'rules': '\033[95m',    # Pink
             'correct': '\033[92m',   # Green
@@ -14,23 +44,28 @@ class Club_RPS:
             'reset': '\033[0m'       # Reset color
         }
 
-    def get_computer_choice(self, player_history):
-        if not player_history:
-            return random.choice(self.choices)
-        
-        # Analyze the last 3 moves
-        recent_moves = player_history[-3:]
-        if len(recent_moves) >= 2:
-            # If the player made the same move twice, choose the move that beats it
-            if recent_moves[-1] == recent_moves[-2]:
-                if recent_moves[-1] == 'rock':
-                    return 'paper'
-                elif recent_moves[-1] == 'paper':
-                    return 'scissors'
-                else:
-                    return 'rock'
-        
-        return random.choice(self.choices)
+    def snapshot(self):
+        model = b"" if self.predictor is None else self.predictor.to_bytes()
+        return self.SNAPSHOT.pack((self.card_number, self.player_score, self.computer_score),
+                                  "".join(self.moves).encode(), model)
+
+    @classmethod
+    def restore(cls, data, rng=random):
+        (card_number, player_score, computer_score), (moves, model) = cls.SNAPSHOT.unpack(data)
+        game = cls(card_number, rng)
+        game.player_score = player_score
+        game.computer_score = computer_score
+        game.moves = list(moves.decode())
+        game.predictor = Predictor.from_bytes(model) if model else None
+        return game
+
+    def load_predictor(self):
+        """The player's saved opponent model, or a fresh one for unknown players."""
+        data = self.load_model("rps")
+        return Predictor() if data is None else Predictor.from_bytes(data)
+
+    def save_predictor(self, predictor):
+        self.save_model("rps", predictor.to_bytes())
 
     def determine_winner(self, player, computer):
         if player == computer:
@@ -42,40 +77,55 @@ class Club_RPS:
         else:
             return "computer"
 
-    def play(self):
-        print("\n♣ Club Card - Rock Paper Scissors")
-        print(f"{self.colors['rules']}You need to win {self.goal} rounds to collect this card!{self.colors['reset']}")
-        player_score = 0
-        computer_score = 0
+    def score(self):
+        return f"SCORE: You {self.player_score}/{self.goal} - Other Player {self.computer_score}/{self.goal}"
+
+    def run(self):
+        self.say("\n♣ Club Card - Rock Paper Scissors")
+        self.say(f"{self.colors['rules']}You need to win {self.goal} rounds to collect this card!{self.colors['reset']}")
+        if self.predictor is None:
+            self.predictor = self.load_predictor()
+        elif self.moves:  # Restored mid-game
+            self.say(self.score())
+        predictor = self.predictor
 
-        while player_score < self.goal and computer_score < self.goal:
-            player = input("Choose 'Rock', 'Paper' or 'Scissors': ").lower()
+        while self.player_score < self.goal and self.computer_score < self.goal:
+            player = (yield Ask("Choose 'Rock', 'Paper' or 'Scissors': ", kind="rps")).lower()
             if player not in self.choices:
-                print("Invalid input.")
+                self.say("Invalid input.")
                 continue
-            computer = random.choice(self.choices)
-            print(f"Other player: {computer}")
-            if player == computer: #All possibilities during the round
-                print("Draw.")
-            elif (player == "rock" and computer == "scissors") or \
-                 (player == "paper" and computer == "rock") or \
-                 (player == "scissors" and computer == "paper"):
-                player_score += 1
-                print(f"{self.colors['correct']}You win this round!{self.colors['reset']}")
+            computer = MOVES[predictor.choose(self.rng)]
+            predictor.update(MOVES.index(player), MOVES.index(computer))
+            self.moves.append(player[0])
+            self.say(f"Other player: {computer}")
+            winner = self.determine_winner(player, computer)
+            if winner == "tie":
+                self.say("Draw.")
+            elif winner == "player":
+                self.player_score += 1
+                self.say(f"{self.colors['correct']}You win this round!{self.colors['reset']}")
             else:
-                computer_score += 1
-                print(f"{self.colors['wrong']}Other player wins this round.{self.colors['reset']}")
+                self.computer_score += 1
+                self.say(f"{self.colors['wrong']}Other player wins this round.{self.colors['reset']}")
 
-            print(f"SCORE: You {player_score}/{self.goal} - Other Player {computer_score}/{self.goal}")
+            self.say(self.score())
 
-        return player_score > computer_score
+        self.save_predictor(predictor)
+        telemetry.emit("rps_moves", moves="".join(self.moves))
+        return self.player_score > self.computer_score
 
-class Club_CBG:
-    def __init__(self, card_number):
+class Club_CBG(Game):
+    # card number; the secret code and every scored guess, one byte per digit
+    SNAPSHOT = SnapshotFormat(b"CB", 1, "B", blobs=2)
+
+    def __init__(self, card_number, rng=random):
         self.card_number = card_number
-        self.code_length = {2: 3, 4: 4, 6: 5}[card_number]
-        self.max_attempts = self.code_length + 1
+        self.rng = rng
+        # Past 6 (endurance decks) codes stay 5 digits and attempts run short
+        self.code_length = {2: 3, 4: 4}.get(card_number, 5)
+        self.max_attempts = self.code_length + 1 - max(0, card_number - 6) // 2
         self.secret_code = self.generate_code()
+        self.guesses = []  # (guess, marks) for every scored attempt
         # ANSI color codes
         self.colors = {
             "correct": '\033[92m',    # Green
@@ -85,45 +135,69 @@ class Club_CBG:
             "rules": '\033[95m'       # Pink
         }
 
+    def snapshot(self):
+        return self.SNAPSHOT.pack((self.card_number,), bytes(self.secret_code),
+                                  b"".join(bytes(guess) for guess, _ in self.guesses))
+
+    @classmethod
+    def restore(cls, data, rng=random):
+        (card_number,), (code, guesses) = cls.SNAPSHOT.unpack(data)
+        game = cls(card_number, rng)
+        game.secret_code = list(code)
+        length = game.code_length
+        for start in range(0, len(guesses), length):
+            guess = list(guesses[start:start + length])
+            game.guesses.append((guess, game.get_marks(guess)))
+        return game
+
     def generate_code(self):
         digits = list(range(10))
-        random.shuffle(digits)
+        self.rng.shuffle(digits)
         return digits[:self.code_length]
 
+    def get_marks(self, guess):
+        return get_marks(guess, self.secret_code)
+
     def get_feedback(self, guess):
         feedback = []
-        for i in range(self.code_length):
-            if guess[i] == self.secret_code[i]:
-                feedback.append(f"{self.colors['correct']}✓{self.colors['reset']}")
-            elif guess[i] in self.secret_code:
-                feedback.append(f"{self.colors['wrong_pos']}~{self.colors['reset']}")
-            else:
-                feedback.append(f"{self.colors['wrong']}✗{self.colors['reset']}")
+        for mark in self.get_marks(guess):
+            symbol = {"correct": "✓", "wrong_pos": "~", "wrong": "✗"}[mark]
+            feedback.append(f"{self.colors[mark]}{symbol}{self.colors['reset']}")
         return " ".join(feedback)
 
-    def play(self):
-        print("\n♣ Club Card - Code Breaker")
-        print(f"{self.colors['rules']}Try to break the {self.code_length}-digit secret code.")
-        print(f"You have {self.max_attempts} attempts.")
-        print(f"Hints: {self.colors['correct']}✓{self.colors['reset']} correct position | {self.colors['wrong_pos']}~{self.colors['reset']} wrong position but correct digit | {self.colors['wrong']}✗{self.colors['reset']} not in code{self.colors['reset']}")
+    def hint(self):
+        guess = CodeBreakerSolver(self.code_length).hint(self.guesses)
+        if guess is None:
+            return "💡 No code fits those hints."
+        return f"💡 Hint: try {''.join(map(str, guess))}"
+
+    def run(self):
+        self.say("\n♣ Club Card - Code Breaker")
+        self.say(f"{self.colors['rules']}Try to break the {self.code_length}-digit secret code.")
+        self.say(f"You have {self.max_attempts} attempts.")
+        self.say(f"Hints: {self.colors['correct']}✓{self.colors['reset']} correct position | {self.colors['wrong_pos']}~{self.colors['reset']} wrong position but correct digit | {self.colors['wrong']}✗{self.colors['reset']} not in code{self.colors['reset']}")
 
-        attempts = 0
-        while attempts < self.max_attempts:
+        for number, (guess, _) in enumerate(self.guesses, start=1):  # A restored game's earlier guesses
+            self.say(f"Guess {number}: {''.join(map(str, guess))}  Hint: {self.get_feedback(guess)}")
+        while len(self.guesses) < self.max_attempts:
             try:
-                raw = input(f"Guess {attempts+1}: ").strip()
+                raw = (yield Ask(f"Guess {len(self.guesses)+1} (h for a hint): ", kind="code")).strip()
+                if raw.lower() == 'h':
+                    self.say(self.hint())
+                    continue
                 guess = [int(d) for d in raw]
                 if len(guess) != self.code_length:
-                    print(f"Enter a {self.code_length}-digit number.")
+                    self.say(f"Enter a {self.code_length}-digit number.")
                     continue
                 feedback = self.get_feedback(guess)
-                print("Hint:", feedback)
-                attempts += 1
+                self.guesses.append((guess, self.get_marks(guess)))
+                self.say(f"Hint: {feedback}")
                 if guess == self.secret_code:
-                    print(f"{self.colors['correct']}🎉 Correct code! You opened the door.{self.colors['reset']}")
+                    self.say(f"{self.colors['correct']}🎉 Correct code! You opened the door.{self.colors['reset']}")
                     return True
             except ValueError:
-                print("Use only digits.")
-        print(f"{self.colors['wrong']}💀 Code not broken. The code was: {''.join(map(str, self.secret_code))}{self.colors['reset']}")
+                self.say("Use only digits.")
+        self.say(f"{self.colors['wrong']}💀 Code not broken. The code was: {''.join(map(str, self.secret_code))}{self.colors['reset']}")
         return False 
     
 
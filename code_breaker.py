@@ -0,0 +1,243 @@
+import argparse
+import itertools
+import math
+import mmap
+import os
+import time
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
+
+# -----------------------------
+# Code Breaker Engine
+# -----------------------------
+# Secret codes are permutations of the digits 0-9. The feedback for a guess
+# is one mark per position (2 = right digit, right place; 1 = digit elsewhere
+# in the code; 0 = not in the code), stored as the base-3 number
+# sum(mark[i] * 3**i). For length 5 that is at most 242, so feedback fits in
+# a byte and the table of every guess against every code is N*N bytes.
+MARK_VALUES = {"correct": 2, "wrong_pos": 1, "wrong": 0}
+TABLE_DIR = os.path.dirname(os.path.abspath(__file__))
+BUILD_LIMIT = 4  # Longer codes compute rows on demand unless a table was built
+
+def feedback_value(marks):
+    return sum(MARK_VALUES[mark] * 3 ** i for i, mark in enumerate(marks))
+
+def solved_value(length):
+    return 3 ** length - 1  # Every mark is "correct"
+
+@lru_cache(maxsize=None)
+def all_codes(length):
+    return list(itertools.permutations(range(10), length))
+
+class FeedbackTable:
+    """Feedback of every guess against every code, one byte each.
+
+    Rows are computed a whole row at a time with big integers used as byte
+    vectors: lane k of has[d] is 1 if code k contains digit d, lane k of
+    at[i][d] is 1 if code k has d at position i. Adding those gives the mark
+    for one position of the guess in every lane at once.
+    """
+    def __init__(self, length, directory=TABLE_DIR):
+        self.length = length
+        self.codes = all_codes(length)
+        self.count = len(self.codes)
+        self.index = {code: k for k, code in enumerate(self.codes)}
+        self.path = os.path.join(directory, f"codebreaker_{length}.bin")
+        self.table = None
+        self.lanes = None
+        if not os.path.exists(self.path) and length <= BUILD_LIMIT:
+            self.build()
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                self.table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def make_lanes(self):
+        has = [int.from_bytes(bytes(d in code for code in self.codes), "little") for d in range(10)]
+        at = [[int.from_bytes(bytes(code[i] == d for code in self.codes), "little")
+               for d in range(10)] for i in range(self.length)]
+        return has, at
+
+    def compute_row(self, guess):
+        if self.lanes is None:
+            self.lanes = self.make_lanes()
+        has, at = self.lanes
+        row = 0
+        for i, d in enumerate(guess):
+            row += (at[i][d] + has[d]) * 3 ** i
+        return row.to_bytes(self.count, "little")
+
+    def build(self):
+        # Written beside the final name and renamed, so a half-built table is never mapped
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            for code in self.codes:
+                f.write(self.compute_row(code))
+        os.replace(temp_path, self.path)
+
+    def row(self, guess):
+        """Feedback of guess (a code tuple) against every code, as bytes."""
+        if self.table is not None and guess in self.index:
+            start = self.index[guess] * self.count
+            return self.table[start:start + self.count]
+        return self.compute_row(guess)
+
+    def partitions(self, guess, candidates):
+        """How many candidates give each feedback value for this guess."""
+        row = self.row(guess)
+        if len(candidates) == 1:
+            return Counter([row[candidates[0]]])
+        return Counter(itemgetter(*candidates)(row))
+
+    def filter(self, candidates, guess, value):
+        # Feedback bytes become 1 where they equal value, so the scan runs in C
+        matches = self.row(guess).translate(match_table(value))
+        if len(candidates) == self.count:
+            return list(itertools.compress(range(self.count), matches))
+        if len(candidates) == 1:
+            return list(candidates) if matches[candidates[0]] else []
+        return list(itertools.compress(candidates, itemgetter(*candidates)(matches)))
+
+@lru_cache(maxsize=None)
+def match_table(value):
+    """A bytes.translate table mapping value to 1 and every other byte to 0."""
+    return bytes(byte == value for byte in range(256))
+
+@lru_cache(maxsize=None)
+def get_table(length):
+    return FeedbackTable(length)
+
+# -----------------------------
+# Solver
+# -----------------------------
+class CodeBreakerSolver:
+    def __init__(self, length, strategy="minimax", pool_limit=60, max_pool=300):
+        self.length = length
+        self.table = get_table(length)
+        self.strategy = strategy
+        # Nodes with more candidates than pool_limit only try up to max_pool of
+        # the candidates as guesses, which keeps big searches fast at the cost
+        # of a slightly worse bound
+        self.pool_limit = pool_limit
+        self.max_pool = max_pool
+
+    def candidates(self, history):
+        """Indexes of every code consistent with [(guess, marks), ...]."""
+        remaining = range(self.table.count)
+        for guess, marks in history:
+            remaining = self.table.filter(remaining, tuple(guess), feedback_value(marks))
+        return list(remaining)
+
+    def score(self, parts, total):
+        if self.strategy == "entropy":
+            # Lower is better, so negate the expected information
+            return sum(n * math.log2(n) for n in parts.values()) / total - math.log2(total)
+        return max(parts.values())
+
+    def best_guess(self, candidates):
+        """The guess (a code tuple) with the best partition of the candidates."""
+        if len(candidates) <= 2:
+            return self.table.codes[candidates[0]]
+        codes = self.table.codes
+        if len(candidates) <= self.pool_limit and self.table.table is not None:
+            pool = codes
+        elif len(candidates) <= self.pool_limit:
+            # Without a built table every guess costs a computed row, so try the
+            # candidates plus an evenly spaced sample of the other codes
+            spacing = max(1, self.table.count // self.max_pool)
+            pool = [codes[k] for k in candidates] + codes[::spacing]
+        else:
+            spacing = max(1, len(candidates) // self.max_pool)
+            pool = [codes[k] for k in candidates[::spacing]]
+        best = None
+        best_key = None
+        candidate_set = set(candidates)
+        for guess in pool:
+            parts = self.table.partitions(guess, candidates)
+            # Prefer guesses that could win on the spot when scores tie
+            key = (self.score(parts, len(candidates)), self.table.index[guess] not in candidate_set)
+            if best_key is None or key < best_key:
+                best, best_key = guess, key
+        return best
+
+    def hint(self, history):
+        if not history:
+            return self.table.codes[0]  # Every first guess is as good as any other
+        candidates = self.candidates(history)
+        if not candidates:
+            return None
+        return self.best_guess(candidates)
+
+    def worst_case(self, candidates=None, first_guess=None):
+        """The most guesses this strategy ever needs, checked over every secret code."""
+        if candidates is None:
+            candidates = list(range(self.table.count))
+            # Every first guess is the same up to renaming digits and positions
+            first_guess = self.table.codes[0]
+        if len(candidates) == 1:
+            return 1
+        guess = first_guess or self.best_guess(candidates)
+        row = self.table.row(guess)
+        groups = {}
+        for k in candidates:
+            groups.setdefault(row[k], []).append(k)
+        solved = solved_value(self.length)
+        return 1 + max((self.worst_case(group) for value, group in groups.items() if value != solved),
+                       default=0)
+
+    def winnable(self, guesses, candidates=None):
+        """Exhaustive check: can every secret be found within this many guesses?"""
+        if candidates is None:
+            candidates = list(range(self.table.count))
+            first_guesses = [self.table.codes[0]]  # All first guesses are alike
+        else:
+            first_guesses = None
+        if len(candidates) == 1:
+            return guesses >= 1
+        if guesses <= 1:
+            return False
+        # With one guess left after this one, every other answer must pin the code down
+        classes = 3 ** self.length
+        if guesses == 2 and len(candidates) > classes:
+            return False
+        solved = solved_value(self.length)
+        # Players may type repeated digits too, so every digit string is a possible guess
+        pool = first_guesses or sorted(
+            itertools.product(range(10), repeat=self.length),
+            key=lambda guess: max(self.table.partitions(guess, candidates).values()))
+        for guess in pool:
+            row = self.table.row(guess)
+            groups = {}
+            for k in candidates:
+                groups.setdefault(row[k], []).append(k)
+            if len(groups) == 1 and solved not in groups:
+                continue  # Learns nothing
+            if all(self.winnable(guesses - 1, group)
+                   for value, group in sorted(groups.items(), key=lambda item: -len(item[1]))
+                   if value != solved):
+                return True
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Code Breaker feedback tables and solver.")
+    parser.add_argument("lengths", type=int, nargs="*", default=[3, 4], help="code lengths to check")
+    parser.add_argument("--strategy", choices=["minimax", "entropy"], default="minimax")
+    parser.add_argument("--build", action="store_true",
+                        help="build and save the feedback table even for long codes")
+    args = parser.parse_args()
+    for length in args.lengths:
+        start_time = time.time()
+        if args.build:
+            FeedbackTable(length).build()
+            get_table.cache_clear()
+        solver = CodeBreakerSolver(length, args.strategy)
+        worst = solver.worst_case()
+        attempts = length + 1  # Club_CBG.max_attempts
+        # The strategy's bound is an upper bound; when it is too high, search every strategy
+        winnable = worst <= attempts or solver.winnable(attempts)
+        verdict = "always winnable" if winnable else "NOT always winnable"
+        print(f"Length {length}: worst case {worst} guesses, {attempts} allowed -> {verdict} "
+              f"({time.time() - start_time:.1f} s)")
+
+if __name__ == "__main__":
+    main()
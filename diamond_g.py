@@ -1,7 +1,8 @@
 import random
-import time
-import os
-import msvcrt
+import struct
+from functools import lru_cache
+from game_io import Ask, Game, Wait
+from snapshot import SnapshotFormat
 
 # -----------------------------
 # Custom Errors
@@ -18,11 +19,16 @@ class InvalidInputError(Exception):
 # -----------------------------
 # Number Memory Game (♦ 1-3-5)
 # -----------------------------
-class Diamond_NMG:
-    def __init__(self, card_no):
+class Diamond_NMG(Game):
+    # card number, numbers shown and hidden again; the numbers
+    SNAPSHOT = SnapshotFormat(b"NM", 1, "BB", blobs=1)
+
+    def __init__(self, card_no, rng=random):
         self.card_no = card_no
+        self.rng = rng
         self.numbers = []
         self.time_limit = 8  # 8 seconds for each level
+        self.shown = False  # The memorizing time is over; a game restored before that shows them again
         self.colors = {
             'blue': '\033[94m',    # Blue
             'correct': '\033[92m',   # Green
@@ -32,190 +38,286 @@ class Diamond_NMG:
         }
         self.generate_numbers()
 
+    def snapshot(self):
+        return self.SNAPSHOT.pack((self.card_no, self.shown), bytes(self.numbers))
+
+    @classmethod
+    def restore(cls, data, rng=random):
+        (card_no, shown), (numbers,) = cls.SNAPSHOT.unpack(data)
+        game = cls(card_no, rng)
+        game.numbers = list(numbers)
+        game.shown = bool(shown)
+        return game
+
     def generate_numbers(self):
-        if self.card_no == 1:
-            self.numbers = random.sample(range(1, 10), 3)  # 3 numbers
-        elif self.card_no == 3:
-            self.numbers = random.sample(range(1, 10), 4)  # 4 numbers
-        elif self.card_no == 5:
-            self.numbers = random.sample(range(1, 10), 5)  # 5 numbers
+        # 3, 4, 5 numbers for cards A, 3, 5 and one more for every odd card after
+        self.numbers = self.rng.sample(range(1, 10), min(9, 3 + (self.card_no - 1) // 2))
 
     def clear_screen(self, delay=3):
         if delay > 0:
-            time.sleep(delay)
-        os.system('cls' if os.name == 'nt' else 'clear')
+            yield Wait(delay)
+        self.clear()
 
     def show_numbers(self):
-        self.clear_screen()
-        print(f"\n{self.colors['blue']}♦ Diamond Game - Number Memory{self.colors['reset']}")
-        print("\nPress Enter to start...")
-        input()
-        
-        print(f"\n{self.colors['info']}Remember these numbers:{self.colors['reset']}")
-        print(f"{self.colors['info']}{' '.join(map(str, self.numbers))}{self.colors['reset']}")
-        print(f"\nYou have {self.time_limit} seconds to memorize...")
-        
-        start_time = time.time()
-        while time.time() - start_time < self.time_limit:
-            remaining = self.time_limit - (time.time() - start_time)
-            print(f"\r⏰ Time remaining: {remaining:.1f} seconds", end="", flush=True)
-            time.sleep(0.1)
-        
-        self.clear_screen(delay=0) # Clear screen immediately
-        print(f"\n{self.colors['blue']}♦ Diamond Game - Number Memory{self.colors['reset']}")
-        print(f"\n{self.colors['info']}Time\'s up! Enter the numbers in the correct order.{self.colors['reset']}")
+        yield from self.clear_screen()
+        self.say(f"\n{self.colors['blue']}♦ Diamond Game - Number Memory{self.colors['reset']}")
+        yield Ask("\nPress Enter to start...\n")
+
+        self.say(f"\n{self.colors['info']}Remember these numbers:{self.colors['reset']}")
+        self.say(f"{self.colors['info']}{' '.join(map(str, self.numbers))}{self.colors['reset']}")
+        self.say(f"\nYou have {self.time_limit} seconds to memorize...")
+        yield Wait(self.time_limit, countdown=True)
+        self.shown = True
 
     def get_user_input(self):
         try:
-            user_input = input("\nEnter the numbers (space-separated): ").strip()
+            user_input = (yield Ask("\nEnter the numbers (space-separated): ", kind="numbers")).strip()
             user_numbers = [int(x) for x in user_input.split()]
             return user_numbers
         except ValueError:
-            print(f"{self.colors['wrong']}Please enter valid numbers!{self.colors['reset']}")
+            self.say(f"{self.colors['wrong']}Please enter valid numbers!{self.colors['reset']}")
             return None
 
     def check_answer(self, user_numbers):
         if user_numbers == self.numbers:
-            print(f"\n{self.colors['correct']}✅ Correct! You remembered all numbers in the right order!{self.colors['reset']}")
+            self.say(f"\n{self.colors['correct']}✅ Correct! You remembered all numbers in the right order!{self.colors['reset']}")
             return True
         else:
-            print(f"\n{self.colors['wrong']}❌ Wrong! The correct order was: {' '.join(map(str, self.numbers))}{self.colors['reset']}")
+            self.say(f"\n{self.colors['wrong']}❌ Wrong! The correct order was: {' '.join(map(str, self.numbers))}{self.colors['reset']}")
             return False
 
-    def start(self):
-        self.show_numbers()
+    def run(self):
+        if not self.shown:
+            yield from self.show_numbers()
+        yield from self.clear_screen(delay=0) # Clear screen immediately
+        self.say(f"\n{self.colors['blue']}♦ Diamond Game - Number Memory{self.colors['reset']}")
+        self.say(f"\n{self.colors['info']}Time\'s up! Enter the numbers in the correct order.{self.colors['reset']}")
         while True:
-            user_numbers = self.get_user_input()
+            user_numbers = yield from self.get_user_input()
             if user_numbers is not None:
                 if len(user_numbers) != len(self.numbers):
-                    print(f"{self.colors['wrong']}Please enter exactly {len(self.numbers)} numbers!{self.colors['reset']}")
+                    self.say(f"{self.colors['wrong']}Please enter exactly {len(self.numbers)} numbers!{self.colors['reset']}")
                     continue
                 return self.check_answer(user_numbers)
 
 # -----------------------------
 # Color Grid Memory Game (♦ 2-4-6)
 # -----------------------------
-class Diamond_CGM:
-    def __init__(self, card_number):
+# The grid is one bytearray, a byte per cell holding 0 for an empty cell or
+# 1 + the colour's place in the palette, and a dict from each colour to its
+# cell, so finding a colour never scans the grid. Only the revealed colours
+# are placed: their cells are drawn with rng.sample, which picks k cells out
+# of a range without shuffling or even listing the rest. The hidden rows are
+# built once per grid size and shared, and showing the colours rebuilds just
+# the rows that hold one. Rows are lettered A-Z, so grids go up to 26x26.
+ROW_LABELS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+COL_LABELS = [str(j + 1) for j in range(len(ROW_LABELS))]
+ROW_INDEX = {label: i for i, label in enumerate(ROW_LABELS)}
+COL_INDEX = {label: j for j, label in enumerate(COL_LABELS)}
+MAX_GRID_SIZE = len(ROW_LABELS)
+
+WHITE = '\033[97m'
+RESET = '\033[0m'
+# Every cell is CELL_WIDTH columns wide: a colour is two coloured columns and
+# a space, a hidden cell a space, ■ and a space. Column labels are padded to
+# the same width, so they sit over their cells on any size of grid.
+CELL_WIDTH = 3
+HIDDEN_CELL = f"{WHITE} ■{RESET} "
+# Background colours, in the order cards use them
+PALETTE = {
+    'RED': '\033[41m  \033[0m',
+    'GREEN': '\033[42m  \033[0m',
+    'BLUE': '\033[44m  \033[0m',
+    'YELLOW': '\033[43m  \033[0m',
+    'MAGENTA': '\033[45m  \033[0m',
+    'CYAN': '\033[46m  \033[0m',
+    'WHITE': '\033[47m  \033[0m',
+    'GREY': '\033[100m  \033[0m',
+    'ORANGE': '\033[48;5;208m  \033[0m',
+    'PINK': '\033[48;5;213m  \033[0m',
+    'PURPLE': '\033[48;5;93m  \033[0m',
+    'BROWN': '\033[48;5;94m  \033[0m',
+}
+PALETTE_NAMES = list(PALETTE)
+
+@lru_cache(maxsize=None)
+def hidden_lines(size):
+    """Every row of a size x size grid with nothing shown, label first."""
+    cells = HIDDEN_CELL * size
+    return tuple(f"{WHITE}{label} {cells}" for label in ROW_LABELS[:size])
+
+class ColorGrid:
+    def __init__(self, size):
+        self.size = size
+        self.cells = bytearray(size * size)  # 0 empty, else 1 + palette index
+        self.where = {}                      # colour -> cell
+
+    def place(self, color, cell):
+        self.cells[cell] = PALETTE_NAMES.index(color) + 1
+        self.where[color] = cell
+
+    def label(self, cell):
+        i, j = divmod(cell, self.size)
+        return ROW_LABELS[i] + COL_LABELS[j]
+
+    def lines(self, reveal=False):
+        """The rows as display_grid shows them."""
+        lines = hidden_lines(self.size)
+        if not reveal or not self.where:
+            return lines
+        rows = {}
+        for color, cell in self.where.items():
+            i, j = divmod(cell, self.size)
+            rows.setdefault(i, [HIDDEN_CELL] * self.size)[j] = PALETTE[color] + " "
+        lines = list(lines)
+        for i, row in rows.items():
+            lines[i] = f"{WHITE}{ROW_LABELS[i]} " + "".join(row)
+        return lines
+
+class Diamond_CGM(Game):
+    # Card number -> (grid size, colours to remember); 8 is for endurance decks
+    LAYOUTS = {2: (3, 3), 4: (4, 3), 6: (5, 3), 8: (6, 4)}
+    # card number, grid size, colours, colours answered, right answers;
+    # each colour's cell as u16, empty until the grid has been shown
+    SNAPSHOT = SnapshotFormat(b"CG", 1, "BBBBB", blobs=1)
+    CELL = struct.Struct("<H")
+
+    def __init__(self, card_number, rng=random, grid_size=None, color_count=None):
+        """grid_size and color_count override the card's layout, up to 26x26 and every palette colour."""
         self.card_number = card_number
-        self.grid_size = {2: 3, 4: 4, 6: 5}[card_number]
-        self.color_pool = ['RED', 'GREEN', 'BLUE']
-        self.reveal_count = 3
-        # ANSI color codes
-        self.color_codes = {
-            'RED': '\033[41m  \033[0m',    # Red background
-            'GREEN': '\033[42m  \033[0m',  # Green background
-            'BLUE': '\033[44m  \033[0m'    # Blue background
-        }
+        self.rng = rng
+        default_size, default_count = self.LAYOUTS[card_number]
+        self.grid_size = grid_size or default_size
+        color_count = color_count or default_count
+        if not 2 <= self.grid_size <= MAX_GRID_SIZE:
+            raise ValueError(f"grid size must be 2-{MAX_GRID_SIZE}, not {self.grid_size}")
+        if not 1 <= color_count <= min(len(PALETTE), self.grid_size * self.grid_size):
+            raise ValueError(f"cannot place {color_count} colours on a {self.grid_size}x{self.grid_size} grid")
+        self.color_pool = PALETTE_NAMES[:color_count]
+        self.reveal_count = color_count
+        self.color_codes = PALETTE
         # Row and column labels based on grid size
-        self.rows = ['A', 'B', 'C', 'D', 'E'][:self.grid_size]
-        self.cols = ['1', '2', '3', '4', '5'][:self.grid_size]
+        self.rows = list(ROW_LABELS[:self.grid_size])
+        self.cols = COL_LABELS[:self.grid_size]
+        self.label_length = 1 + len(self.cols[-1])
         self.colors = {
             'blue': '\033[94m',    # Blue
             'correct': '\033[92m',   # Green
             'wrong': '\033[91m',     # Red
-            'white': '\033[97m',     # White
-            'reset': '\033[0m'       # Reset color
+            'white': WHITE,          # White
+            'reset': RESET           # Reset color
         }
+        self.grid = None
+        self.current_color = None  # Color the player is being asked about
+        self.answered = 0          # Colours answered so far
+        self.correct_answers = 0
+
+    def snapshot(self):
+        cells = b""
+        if self.grid is not None:
+            cells = b"".join(self.CELL.pack(self.grid.where[color]) for color in self.color_pool)
+        return self.SNAPSHOT.pack((self.card_number, self.grid_size, self.reveal_count,
+                                   self.answered, self.correct_answers), cells)
+
+    @classmethod
+    def restore(cls, data, rng=random):
+        (card_number, grid_size, color_count, answered, correct_answers), (cells,) = cls.SNAPSHOT.unpack(data)
+        game = cls(card_number, rng, grid_size, color_count)
+        if cells:
+            game.grid = ColorGrid(grid_size)
+            for color, (cell,) in zip(game.color_pool, cls.CELL.iter_unpack(cells)):
+                game.grid.place(color, cell)
+        game.answered = answered
+        game.correct_answers = correct_answers
+        return game
 
     def clear_screen(self):
-        time.sleep(3)  # Wait 3 seconds for the card visual to appear
-        os.system('cls' if os.name == 'nt' else 'clear')
+        yield Wait(3)  # Wait 3 seconds for the card visual to appear
+        self.clear()
 
     def generate_color_grid(self):
-        # Create a grid with one of each color
-        grid = [[' ' for _ in range(self.grid_size)] for _ in range(self.grid_size)]
-        colors = self.color_pool.copy()
-        random.shuffle(colors)
-        
-        # Place colors in random positions
-        positions = [(i, j) for i in range(self.grid_size) for j in range(self.grid_size)]
-        random.shuffle(positions)
-        
-        for color, (i, j) in zip(colors, positions[:3]):  # Place only in the first 3 positions
-            grid[i][j] = color
-            
+        # One of each color, on cells drawn without replacement
+        grid = ColorGrid(self.grid_size)
+        cells = self.rng.sample(range(self.grid_size * self.grid_size), len(self.color_pool))
+        for color, cell in zip(self.color_pool, cells):
+            grid.place(color, cell)
         return grid
 
     def display_grid(self, grid, reveal=False):
+        if self.screen is None:
+            return
         # Show column numbers
-        print(f"{self.colors['white']}   " + "  ".join(self.cols))
-        
-        for i, row in enumerate(grid):
-            # Show row letter
-            print(f"{self.colors['white']}{self.rows[i]} ", end="")
-            
-            for cell in row:
-                if reveal and cell in self.color_codes:
-                    print(self.color_codes[cell], end=" ")
-                else:
-                    print(f"{self.colors['white']}■{self.colors['reset']}", end=" ")
-            print()
-        print(f"{self.colors['reset']}")
+        self.say(f"{self.colors['white']}  " + "".join(f"{c:>{CELL_WIDTH - 1}} " for c in self.cols).rstrip())
+        for line in grid.lines(reveal):
+            self.say(line)
+        self.say(f"{self.colors['reset']}")
 
     def get_color_position(self, grid, color):
-        for i in range(self.grid_size):
-            for j in range(self.grid_size):
-                if grid[i][j] == color:
-                    return f"{self.rows[i]}{self.cols[j]}"
-        return None
+        cell = grid.where.get(color)
+        return None if cell is None else grid.label(cell)
 
     def validate_position(self, guess):
         # Clear spaces and convert to uppercase
         guess = guess.strip().upper()
-        
-        # If longer than 2 characters or empty, invalid
-        if len(guess) != 2 or not guess:
-            return False, "Please enter a 2-character position (e.g., A1 or 1A)"
-            
-        # First character can be a letter, second a number, or vice-versa
-        if guess[0] in self.rows and guess[1] in self.cols:
-            return True, f"{guess[0]}{guess[1]}"
-        elif guess[0] in self.cols and guess[1] in self.rows:
-            return True, f"{guess[1]}{guess[0]}"
+
+        # Too short or too long for any position on this grid
+        if not 2 <= len(guess) <= self.label_length:
+            length = "2" if self.label_length == 2 else f"2 or {self.label_length}"
+            return False, f"Please enter a {length}-character position (e.g., A1 or 1A)"
+
+        # The letter can come first or last, the number is the rest
+        row, col = guess[0], guess[1:]
+        if row not in ROW_INDEX:
+            row, col = guess[-1], guess[:-1]
+        if ROW_INDEX.get(row, self.grid_size) < self.grid_size and COL_INDEX.get(col, self.grid_size) < self.grid_size:
+            return True, f"{row}{col}"
         else:
             return False, f"Invalid position! Available letters: {', '.join(self.rows)}, Available numbers: {', '.join(self.cols)}"
 
-    def start(self):
-        print(f"\n{self.colors['blue']}♦ Diamond Game - Color Grid Memory{self.colors['reset']}")
-        print(f"Grid Size: {self.grid_size}x{self.grid_size}")
-        print("Remember the positions of the colors! Each color appears only once.")
-        print(f"Positions are marked with letters ({self.rows[0]}-{self.rows[-1]}) and numbers ({self.cols[0]}-{self.cols[-1]}).")
-        print(f"Example: A1 or 1A{self.colors['reset']}\n")
-        
-        grid = self.generate_color_grid()
-        
-        print("Showing the colored grid to remember...")
-        self.display_grid(grid, reveal=True)
-        time.sleep(5)
-        self.clear_screen()
-
-        print("Now answer where each color is located (e.g., A1 or 1A):\n")
+    def run(self):
+        if self.grid is None:  # A restored game has shown its grid already
+            self.say(f"\n{self.colors['blue']}♦ Diamond Game - Color Grid Memory{self.colors['reset']}")
+            self.say(f"Grid Size: {self.grid_size}x{self.grid_size}")
+            self.say("Remember the positions of the colors! Each color appears only once.")
+            self.say(f"Positions are marked with letters ({self.rows[0]}-{self.rows[-1]}) and numbers ({self.cols[0]}-{self.cols[-1]}).")
+            self.say(f"Example: A1 or 1A{self.colors['reset']}\n")
+
+            self.grid = self.generate_color_grid()
+
+            self.say("Showing the colored grid to remember...")
+            self.display_grid(self.grid, reveal=True)
+            yield Wait(5)
+            yield from self.clear_screen()
+        grid = self.grid
+
+        self.say("Now answer where each color is located (e.g., A1 or 1A):\n")
         self.display_grid(grid)
 
-        correct_answers = 0
-        for color in self.color_pool:
+        while self.answered < len(self.color_pool):
+            color = self.color_pool[self.answered]
             correct_pos = self.get_color_position(grid, color)
+            self.current_color = color
             while True:
-                guess = input(f"Where is {color}? ").strip()
+                guess = (yield Ask(f"Where is {color}? ", kind="position")).strip()
                 is_valid, result = self.validate_position(guess)
                 
                 if is_valid:
                     if result == correct_pos:
-                        print(f"{self.colors['correct']}✓ Correct!{self.colors['reset']}")
-                        correct_answers += 1
+                        self.say(f"{self.colors['correct']}✓ Correct!{self.colors['reset']}")
+                        self.correct_answers += 1
                     else:
-                        print(f"{self.colors['wrong']}✗ Wrong! {color} was at {correct_pos}{self.colors['reset']}")
+                        self.say(f"{self.colors['wrong']}✗ Wrong! {color} was at {correct_pos}{self.colors['reset']}")
+                    self.answered += 1
                     break
                 else:
-                    print(f"⚠️ {result}")
-                    print("Please try again.")
+                    self.say(f"⚠️ {result}")
+                    self.say("Please try again.")
 
-        if correct_answers == len(self.color_pool):
-            print(f"\n{self.colors['correct']}🎉 Perfect! You remembered all colors correctly!{self.colors['reset']}")
+        if self.correct_answers == len(self.color_pool):
+            self.say(f"\n{self.colors['correct']}🎉 Perfect! You remembered all colors correctly!{self.colors['reset']}")
             return True
         else:
-            print(f"\n{self.colors['wrong']}❌ You got {correct_answers} out of {len(self.color_pool)} correct.{self.colors['reset']}")
+            self.say(f"\n{self.colors['wrong']}❌ You got {self.correct_answers} out of {len(self.color_pool)} correct.{self.colors['reset']}")
             return False
 
 # -----------------------------
@@ -1,39 +1,47 @@
+import argparse
 import random
 import sys
-import json
-import os
 import time
-from hearts_g import Heart_EDG, Heart_HM  # Games for Hearts card
-from diamond_g import Diamond_NMG, Diamond_CGM  # Games for Diamond card
-from spades_g import Spade_SB, Spade_LO # Games for Spades card
-from clubs_g import Club_CBG, Club_RPS
-# Later, diamond_g, spades_g, clubs_g etc. files can be added
+from functools import lru_cache
+from clock import REAL_CLOCK, ScaledClock
+from deck import NUMBERS, STANDARD, Deck, DeckSpec, FixedDeck
+from game_io import console
+from game_registry import registry  # Suit modules are imported on first use
+from run_history import get_history, print_deadliest, print_runs
+from save_store import DEFAULT_PROFILE, SAVE_SLOTS, get_store
+from session import DEFAULT_RECORDING, Recording
+from telemetry import telemetry
+from timed_input import read_line
 
 def get_card_visual(card):
     """Returns ASCII art representation of a card"""
+    return card_art(card.suit, card.number)
+
+@lru_cache(maxsize=None)
+def card_art(suit, number):
     # Color codes
     red = '\033[91m'  # Red
     black = '\033[30m'  # Black
     reset = '\033[0m'  # Reset color
     
     # Determine card color
-    color = red if card.suit in ["♥", "♦"] else black
+    color = red if suit in ["♥", "♦"] else black
     
     # Format number
-    display_number = str(card.number)
-    if card.number == '1':
+    display_number = str(number)
+    if number == '1':
         display_number = "A"
     
-    card_art = f"""
+    art = f"""
     {color}┌─────────┐
     │ {display_number:<2}      │
     │         │
-    │    {card.suit}    │
+    │    {suit}    │
     │         │
     │      {display_number:>2} │
     └─────────┘{reset}
     """
-    return card_art
+    return art
 
 def print_welcome():
     welcome_text = """
@@ -57,7 +65,7 @@ def print_welcome():
 class Card:
     def __init__(self, suit, number):
         self.suit = suit  # "♥", "♦", "♣", "♠"
-        self.number = number  # 1-6
+        self.number = number  # "A", "2"-"6", up to "9" in endurance decks
 
     def __str__(self):
         return f"{self.suit} {self.number}"
@@ -69,115 +77,200 @@ class Card:
     def from_dict(cls, data):
         return cls(data["suit"], data["number"])
 
-def save_game(deck, current_card_index):
-    save_data = {
-        "deck": [card.to_dict() for card in deck],
-        "current_card_index": current_card_index
-    }
-    with open("save_game.json", "w") as f:
-        json.dump(save_data, f)
+CARDS_LISTED = 24  # Completed cards View Cards lists
+
+def choose_slot(prompt):
+    """Asks for a save slot (Enter means 1). Returns None if the answer is not a slot."""
+    answer = read_line(prompt).strip() or "1"
+    if answer.isdigit() and 1 <= int(answer) <= SAVE_SLOTS:
+        return int(answer)
+    print(f"\n❌ Slots are 1-{SAVE_SLOTS}.")
+    return None
+
+def save_game(deck, current_card_index, slot=1):
+    get_store().save(DEFAULT_PROFILE, slot, deck, current_card_index)
     print("\n✅ Game saved!")
 
 def load_game():
-    try:
-        with open("save_game.json", "r") as f:
-            save_data = json.load(f)
-        deck = [Card.from_dict(card_data) for card_data in save_data["deck"]]
-        return deck, save_data["current_card_index"]
-    except FileNotFoundError:
+    """Returns (deck, card index, snapshot of the card to resume or None); deck is None if nothing loaded."""
+    resumed = resume_checkpoint()
+    if resumed is not None:
+        return resumed
+    saves = get_store().list_saves(DEFAULT_PROFILE)
+    if not saves:
         print("\n❌ No saved game found!")
-        return None, None
+        return None, None, None
+    if len(saves) == 1:
+        slot = saves[0].slot
+    else:
+        print("\n💾 Saved games:")
+        for info in sorted(saves, key=lambda info: info.slot):
+            print(f"  {info}")
+        slot = choose_slot(f"Load which slot? (1-{SAVE_SLOTS}): ")
+        if slot is None:
+            return None, None, None  # choose_slot has said why
+    cards, current_card_index = get_store().load(DEFAULT_PROFILE, slot)
+    if cards is None:
+        print("\n❌ No saved game found!")
+        return None, None, None
+    return as_deck(cards), current_card_index, None
+
+def resume_checkpoint():
+    """Offers to carry on with a card left unfinished. Returns (deck, card index, snapshot) or None."""
+    cards, card_index, snapshot = get_store().load_checkpoint(DEFAULT_PROFILE)
+    if cards is None:
+        return None
+    deck = as_deck(cards)
+    suit, number = deck.card(card_index)
+    choice = read_line(f"\n⏸️ Card {card_index + 1} ({suit} {number}) was left unfinished. Resume it? (Y/N): ")
+    if choice.strip().upper() != "Y":
+        return None
+    return deck, card_index, snapshot
+
+def as_deck(cards):
+    """A loaded deck as something to deal from: streamed decks already are."""
+    return cards if isinstance(cards, Deck) else FixedDeck(cards)
 
 def view_cards():
-    try:
-        with open('save_game.json', 'r') as f:
-            game_state = json.load(f)
-        deck = [Card.from_dict(card_data) for card_data in game_state['deck']]
-        current_card_index = game_state['current_card_index']
-        
-        print("\n📚 Your Cards:")
-        print(f"Progress: {current_card_index}/{len(deck)} cards completed\n")
-        
-        print("Card List:")
-        print("-" * 50)
-        for i, card in enumerate(deck[:current_card_index], start=1):
-            print(f"✓ Card {i}: {card.suit} {card.number}")
-        print("-" * 50)
-            
-    except FileNotFoundError:
+    saves = get_store().list_saves(DEFAULT_PROFILE)
+    if not saves:
         print("\n❌ No saved game found!")
         print("Start a new game to collect cards!")
+    else:
+        view_saved_cards(saves[0])
+    history = get_history()
+    print()
+    print_runs("🏅 Your best runs:", history.top(5, profile=DEFAULT_PROFILE))
+    print()
+    print_runs("🌍 Leaderboard:", history.top(5))
+    print()
+    print_deadliest(history.deadliest(3))
 
-def get_card_number(card_number):
-    if card_number == 'A':
-        return 1
-    return int(card_number)
+def view_saved_cards(latest):
+    cards, current_card_index = get_store().load(DEFAULT_PROFILE, latest.slot)
+    deck = as_deck(cards)
 
-def play_card(card):
+    print(f"\n📚 Your Cards (slot {latest.slot}):")
+    print(f"Progress: {current_card_index}/{len(deck)} cards completed\n")
+
+    print("Card List:")
+    print("-" * 50)
+    # Endurance runs can be thousands of cards long; the latest ones will do
+    first = max(0, current_card_index - CARDS_LISTED)
+    if first:
+        print(f"  ... {first} earlier cards")
+    for i in range(first, current_card_index):
+        suit, number = deck.card(i)
+        print(f"✓ Card {i + 1}: {suit} {number}")
+    print("-" * 50)
+
+def make_game(card, rng=None):
+    """Returns the game for a card, or None if the card has no game"""
+    return registry.create(card.suit, card.number, rng)
+
+def restore_game(card, snapshot, rng=None):
+    """The game of a card left unfinished, or None if its snapshot cannot be read."""
+    game_class = registry.game_class(card.suit, card.number)
+    try:
+        return game_class.restore(snapshot) if rng is None else game_class.restore(snapshot, rng)
+    except ValueError as e:
+        print(f"⚠️ The unfinished card could not be restored ({e}); it starts over.")
+        return None
+
+def play_card(card, clock=REAL_CLOCK, recording=None, index=0, deck=None, restored=None):
+    """Plays one card, checkpointed after every answer when its deck is given; restored is a snapshot to resume."""
     print(f"\nPlaying card: {card.suit} {card.number}")
     card_visual = get_card_visual(card)
     print(card_visual)
-    time.sleep(3)  # Wait 3 seconds for the card visual to be displayed
+    clock.sleep(3)  # Wait 3 seconds for the card visual to be displayed
     
-    success = False
-    if card.suit == "♥":
-        if card.number in ['2', '4', '6']:
-            game = Heart_EDG(get_card_number(card.number))
-        elif card.number in ['A', '3', '5']:
-            game = Heart_HM(get_card_number(card.number))
-        else:
-            print("Invalid Heart card number!")
-            return False
-        success = game.start()
-    elif card.suit == "♦":
-        if card.number in ['A', '3', '5']:
-            game = Diamond_NMG(get_card_number(card.number))
-        elif card.number in ['2', '4', '6']:
-            game = Diamond_CGM(get_card_number(card.number))
-        else:
-            print("Invalid Diamond card number!")
-            return False
-        success = game.start()
-    elif card.suit == "♠":
-        if card.number in ['A', '3', '5']:
-            game = Spade_LO(get_card_number(card.number))
-            success = game.start()
-        elif card.number in ['2', '4', '6']:
-            game = Spade_SB(get_card_number(card.number))
-            success = game.play()
-        else:
-            print("Invalid Spade card number!")
-            return False
-    elif card.suit == "♣":
-        if card.number in ['1', '3', '5']:
-            game = Club_RPS(get_card_number(card.number))
-        elif card.number in ['2', '4', '6']:
-            game = Club_CBG(get_card_number(card.number))
-        else:
-            print("Invalid Club card number!")
-            return False
-        success = game.play()
-    else:
+    rng = None if recording is None else recording.card_rng(index)
+    game = None if restored is None else restore_game(card, restored, rng)
+    if game is None:
+        restored = None
+        game = make_game(card, rng)
+    if game is None:
         print("Invalid card!")
-        success = False
-    return success
+        # Still a card lost, as the server reports it
+        telemetry.emit("card_end", card=f"{card.suit}{card.number}", game=None, won=False, seconds=0.0)
+        return False
+    game.player = DEFAULT_PROFILE
+    if deck is not None:
+        store = get_store()
+        game.checkpoint = lambda snapshot: store.save_checkpoint(DEFAULT_PROFILE, deck, index, snapshot)
+    telemetry.emit("card_start", card=f"{card.suit}{card.number}", game=type(game).__name__)
+    start_time = time.monotonic()
+    if recording is not None:
+        recording.start_card(game, restored)
+    won = game.start(clock)
+    if deck is not None:
+        store.clear_checkpoint(DEFAULT_PROFILE)
+    if recording is not None:
+        recording.end_card(index, game, won)
+    telemetry.emit("card_end", card=f"{card.suit}{card.number}", game=type(game).__name__,
+                   won=bool(won), seconds=round(time.monotonic() - start_time, 3))
+    return won
+
+def new_deck(rng=random):
+    suits = ['♥', '♦', '♣', '♠']
+    numbers = ['A', '2', '3', '4', '5', '6']
+    deck = [Card(suit, number) for suit in suits for number in numbers]
+    rng.shuffle(deck)
+    return deck
+
+def record_run(deck, cards_survived, started_at):
+    """Adds a finished gauntlet to the run history: the cards played and the deck's length."""
+    history = get_history()
+    played = [deck.card(i) for i in range(min(cards_survived + 1, len(deck)))]
+    history.record(DEFAULT_PROFILE, played, cards_survived,
+                   round(time.monotonic() - started_at, 3), card_count=len(deck))
+    history.flush()
+
+def save_recording(recording, path):
+    if path:
+        recording.save(path)
+        print(f"🎞️ Session recorded to {path} (seed {recording.seed}). Replay it with: python session.py {path}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Play the Borderland card gauntlet.")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="run pauses and time limits this many times faster (for demos)")
+    parser.add_argument("--telemetry", metavar="PATH", help="append gameplay events to this JSONL file")
+    parser.add_argument("--seed", type=int, help="deal new games and their cards from this seed")
+    parser.add_argument("--record", metavar="PATH", default=DEFAULT_RECORDING,
+                        help="where to save each session's answers for replay (default %(default)s, '' for nowhere)")
+    parser.add_argument("--decks", type=int, default=1,
+                        help="endurance mode: shuffle this many decks together")
+    parser.add_argument("--numbers", type=int, default=6, choices=range(1, len(NUMBERS) + 1),
+                        help="cards per suit, A-6 by default; 7-9 play their game at harder settings")
+    args = parser.parse_args()
+    clock = REAL_CLOCK if args.speed == 1.0 else ScaledClock(args.speed)
+    spec = DeckSpec(args.decks, args.numbers)
+    if args.telemetry:
+        telemetry.enable(args.telemetry)
+    try:
+        menu(clock, args.seed, args.record, spec)
+    finally:
+        telemetry.close()
+
+def menu(clock, seed=None, record_path=DEFAULT_RECORDING, spec=STANDARD):
     while True:
         print_welcome()
-        choice = input("Your choice (1-4): ").strip()
+        choice = read_line("Your choice (1-4): ").strip()
         
         if choice == "1":  # New Game
-            suits = ['♥', '♦', '♣', '♠']
-            numbers = ['A', '2', '3', '4', '5', '6']
-            deck = [Card(suit, number) for suit in suits for number in numbers]
-            random.shuffle(deck)
+            recording = Recording(seed)
+            deck = Deck(recording.deck_rng().getrandbits(64), spec)
+            recording.set_stream(deck)
             current_card_index = 0
+            restored = None
             
-            print("\n🕹️ Game starts! There are 24 cards.")
+            print(f"\n🕹️ Game starts! There are {len(deck)} cards.")
+            started_at = time.monotonic()
             while current_card_index < len(deck):
-                card = deck[current_card_index]
-                success = play_card(card)
+                card = Card(*deck.card(current_card_index))
+                success = play_card(card, clock, recording, current_card_index, deck, restored)
+                restored = None
                 
                 if not success:
                     print("\n💀 You lost the game. Card: ", card)
@@ -186,22 +279,33 @@ def main():
                 
                 current_card_index += 1
                 if current_card_index < len(deck):
-                    save_choice = input("\nDo you want to save the game? (Y/N): ").strip().upper()
+                    save_choice = read_line("\nDo you want to save the game? (Y/N): ").strip().upper()
                     if save_choice == "Y":
-                        save_game(deck, current_card_index)
+                        slot = choose_slot(f"Save to which slot? (1-{SAVE_SLOTS}, Enter for 1): ")
+                        if slot is not None:
+                            save_game(deck, current_card_index, slot)
             
             if current_card_index == len(deck):
                 print("\n🏆 You successfully passed all cards! You survived.")
+            record_run(deck, current_card_index, started_at)
+            save_recording(recording, record_path)
             
         elif choice == "2":  # Load Game
-            deck, current_card_index = load_game()
+            deck, current_card_index, restored = load_game()
             if deck is None:
                 continue
+            recording = Recording(seed)
+            if isinstance(deck, Deck):
+                recording.set_stream(deck)
+            else:
+                recording.set_deck(deck.cards)
             
             print("\n🕹️ Game loaded! Remaining cards:", len(deck) - current_card_index)
+            started_at = time.monotonic()
             while current_card_index < len(deck):
-                card = deck[current_card_index]
-                success = play_card(card)
+                card = Card(*deck.card(current_card_index))
+                success = play_card(card, clock, recording, current_card_index, deck, restored)
+                restored = None
                 
                 if not success:
                     print("\n💀 You lost the game. Card: ", card)
@@ -210,12 +314,16 @@ def main():
                 
                 current_card_index += 1
                 if current_card_index < len(deck):
-                    save_choice = input("\nDo you want to save the game? (Y/N): ").strip().upper()
+                    save_choice = read_line("\nDo you want to save the game? (Y/N): ").strip().upper()
                     if save_choice == "Y":
-                        save_game(deck, current_card_index)
+                        slot = choose_slot(f"Save to which slot? (1-{SAVE_SLOTS}, Enter for 1): ")
+                        if slot is not None:
+                            save_game(deck, current_card_index, slot)
             
             if current_card_index == len(deck):
                 print("\n🏆 You successfully passed all cards! You survived.")
+            record_run(deck, current_card_index, started_at)
+            save_recording(recording, record_path)
             
         elif choice == "3":  # View Cards
             view_cards()
@@ -227,8 +335,8 @@ def main():
         else:
             print("\n❌ Invalid choice! Please enter a number between 1-4.")
         
-        input("\nPress Enter to continue...")
-        os.system('cls' if os.name == 'nt' else 'clear')
+        read_line("\nPress Enter to continue...")
+        console.clear()
 
 if __name__ == "__main__":
     main()
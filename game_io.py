@@ -0,0 +1,165 @@
+import random
+import sys
+import time
+from clock import REAL_CLOCK
+from renderer import CLEAR, Renderer
+from telemetry import telemetry
+from timed_input import countdown, read_line, timed_input
+
+# -----------------------------
+# Game Events
+# -----------------------------
+# Games never call input() or time.sleep() themselves. Their run() method is a
+# generator that yields these events and the driver (console, headless
+# simulator, ...) decides how to satisfy them.
+class Ask:
+    def __init__(self, prompt, kind="continue", timeout=None):
+        self.prompt = prompt
+        self.kind = kind          # What is being asked: "letter", "move", ...
+        self.timeout = timeout    # Seconds to answer, None waits forever
+
+class Wait:
+    def __init__(self, seconds, countdown=False):
+        self.seconds = seconds
+        self.countdown = countdown  # Show the remaining time while waiting
+
+# -----------------------------
+# Game Base Class
+# -----------------------------
+class Game:
+    # Pending output, attached by the driver. None means nobody is watching.
+    screen = None
+    # Where time limits are measured, also set by the driver
+    clock = REAL_CLOCK
+    # Save profile of the person playing. None (bots, server) keeps nothing.
+    player = None
+    # Where the game draws its randomness; games given an rng use their own
+    rng = random
+    # Set by a driver that records the game (see session.py): every answer as
+    # (game seconds since the game started, reply), and every saved model the
+    # game loaded. A replay fills models in beforehand instead of the store.
+    inputs = None
+    models = None
+    # Set by a driver that keeps checkpoints: called with snapshot() after
+    # every answer the game has taken
+    checkpoint = None
+
+    def say(self, text="", end="\n"):
+        if self.screen is not None:
+            self.screen.append(text + end)
+
+    def clear(self):
+        if self.screen is not None:
+            self.screen.append(CLEAR)
+
+    def load_model(self, name):
+        """Bytes this game last saved for the player under name, or None."""
+        if self.models is not None and name in self.models:
+            return self.models[name]
+        data = None
+        if self.player is not None:
+            from save_store import get_store  # Only games with models need the database
+            data = get_store().load_model(self.player, name)
+        if self.models is not None:
+            self.models[name] = data
+        return data
+
+    def save_model(self, name, data):
+        if self.player is not None:
+            from save_store import get_store
+            store = get_store()
+            store.save_model(self.player, name, data)
+            store.flush()
+
+    def run(self):
+        raise NotImplementedError
+
+    def snapshot(self):
+        """The game's state as bytes (see snapshot.py)."""
+        raise NotImplementedError
+
+    @classmethod
+    def restore(cls, data, rng=random):
+        """A game built from snapshot() bytes; its run() carries on from the same question."""
+        raise NotImplementedError
+
+    def start(self, clock=REAL_CLOCK):
+        return play_console(self, clock)
+
+    def play(self, clock=REAL_CLOCK):
+        return play_console(self, clock)
+
+# -----------------------------
+# Console Driver
+# -----------------------------
+console = Renderer(diff=sys.stdout.isatty())
+
+def flush_screen(screen):
+    if telemetry.enabled and screen:
+        start_time = time.perf_counter()
+        console.render(screen)
+        telemetry.observe("render", time.perf_counter() - start_time)
+    else:
+        console.render(screen)
+    screen.clear()
+
+def console_input(prompt):
+    console.render([prompt])
+    reply = read_line()
+    if sys.stdin.isatty():
+        console.note(reply + "\n")  # The terminal echoed it
+    return reply
+
+def console_timed_input(prompt, timeout, speed):
+    reply = timed_input(prompt, timeout, speed)
+    if sys.stdin.isatty():
+        # Blank lines, then a countdown line the answer was typed on
+        console.note(prompt[:len(prompt) - len(prompt.lstrip("\n"))])
+        console.scribbled()
+        console.note("\n")
+    else:
+        console.note(prompt)
+    return reply
+
+def play_console(game, clock=REAL_CLOCK):
+    """Plays a game in the terminal. clock is a RealClock or a ScaledClock."""
+    game.screen = []
+    game.clock = clock
+    started_at = clock.now()
+    console.forget()  # Whatever was printed before the game is not the renderer's
+    steps = game.run()
+    reply = None
+    answered = False
+    try:
+        while True:
+            event = steps.send(reply)
+            flush_screen(game.screen)
+            reply = None
+            if isinstance(event, Wait):
+                if event.countdown:
+                    countdown(event.seconds, clock.speed)
+                    console.scribbled()
+                else:
+                    clock.sleep(event.seconds)
+            else:
+                if answered and game.checkpoint is not None:
+                    # Taken at the next question, once the last answer and its pauses are over
+                    game.checkpoint(game.snapshot())
+                asked_at = time.monotonic()
+                if event.timeout is not None:
+                    reply = console_timed_input(event.prompt, event.timeout, clock.speed)
+                else:
+                    reply = console_input(event.prompt)
+                answered = True
+                if game.inputs is not None:
+                    game.inputs.append((round(clock.now() - started_at, 3), reply))
+                if telemetry.enabled:
+                    answer_time = time.monotonic() - asked_at
+                    telemetry.observe("answer", answer_time)
+                    telemetry.emit("answer", game=type(game).__name__, kind=event.kind,
+                                   seconds=round(answer_time, 4), timed_out=reply is None)
+    except StopIteration as done:
+        flush_screen(game.screen)
+        return done.value
+    finally:
+        game.screen = None
@@ -0,0 +1,115 @@
+import argparse
+import importlib
+import statistics
+import subprocess
+import sys
+import time
+
+# -----------------------------
+# Game Registry
+# -----------------------------
+# Which game each card plays, keyed by (suit, rank). Games are named as
+# "module:Class" and only imported the first time a card needs them, so
+# starting the menu never loads a suit module.
+#
+# Installed packages can add or replace games through the entry point group
+# "borderland.games". The entry point name is "<suit>:<ranks>", for example
+#     [project.entry-points."borderland.games"]
+#     "hearts:2,4,6" = "my_games:Crossword"
+# and the class must be a game_io.Game taking the card number (1-6, up to 9
+# in endurance decks) and, optionally, the random.Random a session wants the
+# game to draw from.
+ENTRY_POINT_GROUP = "borderland.games"
+SUITS = {"hearts": "♥", "diamonds": "♦", "clubs": "♣", "spades": "♠"}
+RANKS = ['A', '2', '3', '4', '5', '6']
+ENDURANCE_RANKS = ['7', '8', '9']  # Only in decks dealt with more numbers (deck.py)
+
+class GameRegistry:
+    def __init__(self):
+        self.targets = {}     # (suit, rank) -> "module:Class"
+        self.loaded = {}      # "module:Class" -> class
+        self.discovered = False
+
+    def register(self, suit, ranks, target):
+        for rank in ranks:
+            self.targets[(suit, rank)] = target
+
+    def discover(self):
+        """Registers games from installed entry points. Runs once, on the first lookup."""
+        # Imported here because importlib.metadata alone costs more than the menu
+        from importlib.metadata import entry_points
+        self.discovered = True
+        for entry in entry_points(group=ENTRY_POINT_GROUP):
+            suit, _, ranks = entry.name.partition(":")
+            suit = SUITS.get(suit.lower(), suit)
+            self.register(suit, [rank.strip().upper() for rank in ranks.split(",")], entry.value)
+
+    def game_class(self, suit, rank):
+        """The game class for a card, imported on first use. None if the card has no game."""
+        if not self.discovered:
+            self.discover()
+        target = self.targets.get((suit, rank))
+        if target is None:
+            return None
+        if target not in self.loaded:
+            module, _, name = target.partition(":")
+            self.loaded[target] = getattr(importlib.import_module(module), name)
+        return self.loaded[target]
+
+    def create(self, suit, rank, rng=None):
+        game_class = self.game_class(suit, rank)
+        if game_class is None:
+            return None
+        if rng is None:
+            return game_class(card_number(rank))
+        return game_class(card_number(rank), rng)
+
+def card_number(rank):
+    return 1 if rank == 'A' else int(rank)
+
+registry = GameRegistry()
+registry.register("♥", ['A', '3', '5', '7', '9'], "hearts_g:Heart_HM")
+registry.register("♥", ['2', '4', '6', '8'], "hearts_g:Heart_EDG")
+registry.register("♦", ['A', '3', '5', '7', '9'], "diamond_g:Diamond_NMG")
+registry.register("♦", ['2', '4', '6', '8'], "diamond_g:Diamond_CGM")
+registry.register("♣", ['A', '3', '5', '7', '9'], "clubs_g:Club_RPS")
+registry.register("♣", ['2', '4', '6', '8'], "clubs_g:Club_CBG")
+registry.register("♠", ['A', '3', '5', '7', '9'], "spades_g:Spade_LO")
+registry.register("♠", ['2', '4', '6', '8'], "spades_g:Spade_SB")
+
+# -----------------------------
+# Startup Benchmark
+# -----------------------------
+# Each measurement runs in a fresh interpreter, so nothing is cached.
+STARTUP_CASES = {
+    "time to menu": "import g_main; g_main.print_welcome()",
+    "time to first ♥ card": "import g_main; g_main.make_game(g_main.Card('♥', '2'))",
+    "time to first ♦ card": "import g_main; g_main.make_game(g_main.Card('♦', '2'))",
+    "time to first ♣ card": "import g_main; g_main.make_game(g_main.Card('♣', '2'))",
+    "time to first ♠ card": "import g_main; g_main.make_game(g_main.Card('♠', '2'))",
+    "all suits imported": "import g_main, hearts_g, diamond_g, clubs_g, spades_g",  # Old eager start
+}
+
+def time_startup(code, runs):
+    times = []
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start_time)
+    return statistics.median(times)
+
+def main():
+    parser = argparse.ArgumentParser(description="List the registered games and time a cold start.")
+    parser.add_argument("--runs", type=int, default=10, help="fresh interpreters per measurement")
+    args = parser.parse_args()
+    for suit in SUITS.values():
+        games = ", ".join(f"{rank}: {registry.targets.get((suit, rank), '-')}" for rank in RANKS + ENDURANCE_RANKS)
+        print(f"{suit}  {games}")
+    print()
+    baseline = time_startup("pass", args.runs)
+    print(f"{'bare interpreter':<24}{baseline * 1000:>8.1f} ms")
+    for name, code in STARTUP_CASES.items():
+        print(f"{name:<24}{time_startup(code, args.runs) * 1000:>8.1f} ms")
+
+if __name__ == "__main__":
+    main()
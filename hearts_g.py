@@ -1,7 +1,7 @@
 import random
-import time
-import os
-import msvcrt
+from game_io import Ask, Game, Wait
+from snapshot import SnapshotFormat
+from word_store import load_store, signature
 
 # -----------------------------
 # Custom Errors
@@ -15,40 +15,61 @@ class TimeOutError(Exception):
 # -----------------------------
 # Word Banks
 # -----------------------------
-class HangmanWords:
-    def __init__(self):
-        self.words = {
-            1: ["team", "final"],
-            3: ["design", "project"],
-            5: ["computer", "software"]
-        }
+# With a compiled word store (see word_store.py) words come from there;
+# otherwise these short built-in lists are used.
+class WordBank:
+    words = {}
+    signatures = None  # Anagram index of the built-in words, built on first use
 
-    def get_word(self, difficulty):
-        return random.choice(self.words[difficulty])
+    def words_for(self, difficulty):
+        store = load_store()
+        if store is not None:
+            return store.words(difficulty)
+        return self.words[difficulty]
 
-class EDGWords:
-    def __init__(self):
-        self.words = {
-            2: ["code", "maze", "play", "data"],
-            4: ["brain", "object", "random", "player"],
-            6: ["function", "program", "simulate", "solution"]
-        }
+    def get_word(self, difficulty, rng=random):
+        store = load_store()
+        if store is not None:
+            return store.sample(difficulty, rng)
+        return rng.choice(self.words[difficulty])
+
+    def anagrams(self, word):
+        """Every known word made of exactly the same letters, the word itself included."""
+        store = load_store()
+        if store is not None:
+            return store.anagrams(word)
+        cls = type(self)
+        if cls.signatures is None:
+            cls.signatures = {}
+            for bank in self.words.values():
+                for known in bank:
+                    cls.signatures.setdefault(signature(known), []).append(known)
+        return cls.signatures.get(signature(word), [])
+
+class HangmanWords(WordBank):
+    words = {
+        1: ["team", "final"],
+        3: ["design", "project"],
+        5: ["computer", "software"]
+    }
 
-    def get_word(self, difficulty):
-        return random.choice(self.words[difficulty])
+class EDGWords(WordBank):
+    words = {
+        2: ["code", "maze", "play", "data"],
+        4: ["brain", "object", "random", "player"],
+        6: ["function", "program", "simulate", "solution"]
+    }
 
 # -----------------------------
 # Hangman Game (♥ 1-3-5)
 # -----------------------------
-class Heart_HM:
-    def __init__(self, difficulty):
-        self.word_bank = HangmanWords()
-        self.secret_word = self.word_bank.get_word(difficulty)
-        self.guessed_letters = set()
-        self.remaining_attempts = 6
-        self.correct_letters = set(self.secret_word)
-        self.hangman_states = [
-            '''
+class Heart_HM(Game):
+    # difficulty, attempts left, card shown; the word and the letters tried
+    SNAPSHOT = SnapshotFormat(b"HM", 1, "BBB", blobs=2)
+
+    # Drawn the same way every game, so built once
+    hangman_states = [
+        '''
                 -----
                 |   |
                     |
@@ -56,7 +77,7 @@ class Heart_HM:
                     |
                     |
              =========''',
-            '''
+        '''
                 -----
                 |   |
                 O   |
@@ -64,7 +85,7 @@ class Heart_HM:
                     |
                     |
              =========''',
-            '''
+        '''
                 -----
                 |   |
                 O   |
@@ -72,7 +93,7 @@ class Heart_HM:
                     |
                     |
              =========''',
-            '''
+        '''
                 -----
                 |   |
                 O   |
@@ -80,7 +101,7 @@ class Heart_HM:
                     |
                     |
              =========''',
-            '''
+        '''
                 -----
                 |   |
                 O   |
@@ -88,7 +109,7 @@ class Heart_HM:
                     |
                     |
              =========''',
-            '''
+        '''
                 -----
                 |   |
                 O   |
@@ -96,7 +117,7 @@ class Heart_HM:
                /    |
                     |
              =========''',
-            '''
+        '''
                 -----
                 |   |
                 O   |
@@ -104,7 +125,19 @@ class Heart_HM:
                / \  |
                     |
              ========='''
-        ]
+    ]
+
+    def __init__(self, difficulty, rng=random):
+        self.difficulty = difficulty
+        self.rng = rng
+        self.word_bank = HangmanWords()
+        # Cards past 5 (endurance decks) keep the hardest words and lose attempts
+        self.word_grade = min(difficulty, 5)
+        self.secret_word = self.word_bank.get_word(self.word_grade, rng)
+        self.guessed_letters = set()
+        self.remaining_attempts = 6 - max(0, difficulty - 5) // 2
+        self.correct_letters = set(self.secret_word)
+        self.shown_card = False
         self.colors = {
             'blue': '\033[94m',    # Blue
             'correct': '\033[92m',   # Green
@@ -112,12 +145,29 @@ class Heart_HM:
             'reset': '\033[0m'       # Reset color
         }
 
+    def snapshot(self):
+        return self.SNAPSHOT.pack((self.difficulty, self.remaining_attempts, self.shown_card),
+                                  self.secret_word.encode(), "".join(sorted(self.guessed_letters)).encode())
+
+    @classmethod
+    def restore(cls, data, rng=random):
+        (difficulty, remaining_attempts, shown_card), (word, letters) = cls.SNAPSHOT.unpack(data)
+        game = cls(difficulty, rng)
+        game.secret_word = word.decode()
+        game.correct_letters = set(game.secret_word)
+        game.guessed_letters = set(letters.decode())
+        game.remaining_attempts = remaining_attempts
+        game.shown_card = bool(shown_card)
+        return game
+
     def display_progress(self):
         return " ".join([char if char in self.guessed_letters else "_" for char in self.secret_word])
 
     def clear_screen(self):
-        time.sleep(3)  # Wait 3 seconds for the card visual to appear
-        os.system('cls' if os.name == 'nt' else 'clear')
+        if not self.shown_card:
+            yield Wait(3)  # Wait 3 seconds for the card visual to appear
+            self.shown_card = True
+        self.clear()
 
     def guess(self, letter):
         if not letter.isalpha() or len(letter) != 1:
@@ -135,94 +185,136 @@ class Heart_HM:
     def is_lost(self):
         return self.remaining_attempts <= 0
 
-    def start(self):
+    def run(self):
         while not self.is_won() and not self.is_lost():
-            self.clear_screen()
-            print(f"\n{self.colors['blue']}♥ Heart Game - Hangman{self.colors['reset']}")
+            yield from self.clear_screen()
+            self.say(f"\n{self.colors['blue']}♥ Heart Game - Hangman{self.colors['reset']}")
             self.display()
             try:
-                guess = input("\nEnter a letter: ")
+                guess = yield Ask("\nEnter a letter: ", kind="letter")
                 self.guess(guess)
             except InvalidGuessError as e:
-                print("⚠️", e)
-                time.sleep(1)
+                self.say(f"⚠️ {e}")
+                yield Wait(1)
 
         if self.is_won():
-            print(f"\n🎉 Congratulations! You guessed the word: {self.secret_word}")
+            self.say(f"\n🎉 Congratulations! You guessed the word: {self.secret_word}")
             return True
         else:
-            print(f"\n💀 You lost. The correct word was: {self.secret_word}")
+            self.say(f"\n💀 You lost. The correct word was: {self.secret_word}")
             return False
 
     def display(self):
-        print(self.hangman_states[6 - self.remaining_attempts])
-        print("\nWord:", self.display_progress())
-        print("Remaining attempts:", self.remaining_attempts)
-        print("Tried letters:", " ".join(sorted(self.guessed_letters)))
+        self.say(self.hangman_states[6 - self.remaining_attempts])
+        self.say(f"\nWord: {self.display_progress()}")
+        self.say(f"Remaining attempts: {self.remaining_attempts}")
+        self.say(f"Tried letters: {' '.join(sorted(self.guessed_letters))}")
 
 # -----------------------------
 # Encrypted Door Game (♥ 2-4-6)
 # -----------------------------
-class Heart_EDG:
-    def __init__(self, difficulty):
+class Heart_EDG(Game):
+    # difficulty, started, milliseconds played; the scramble and the answers
+    SNAPSHOT = SnapshotFormat(b"ED", 1, "BBI", blobs=2)
+
+    max_answers = 3    # Skip scrambles with more correct answers than this
+    word_tries = 20    # Words to draw before settling for the last one
+    shuffle_tries = 20
+
+    def __init__(self, difficulty, rng=random):
         self.difficulty = difficulty
+        self.rng = rng
         self.word_bank = EDGWords()
+        # Cards past 6 (endurance decks) keep the hardest words with less time
+        self.word_grade = min(difficulty, 6)
+        self.time_limit = 15 - 3 * max(0, difficulty - 6) // 2
+        self.scrambled = None
+        self.answers = set()
+        self.started = False      # The player pressed Enter and the clock is running
+        self.started_at = None    # Clock time the scramble was shown
+        self.elapsed = 0          # Seconds already played before a restore
         self.colors = {
             'blue': '\033[94m',    # Blue
             'reset': '\033[0m'     # Reset color
         }
 
+    def seconds_played(self):
+        if self.started_at is None:
+            return self.elapsed
+        return self.clock.now() - self.started_at
+
+    def snapshot(self):
+        return self.SNAPSHOT.pack((self.difficulty, self.started, round(self.seconds_played() * 1000)),
+                                  (self.scrambled or "").encode(), " ".join(sorted(self.answers)).encode())
+
+    @classmethod
+    def restore(cls, data, rng=random):
+        (difficulty, started, milliseconds), (scrambled, answers) = cls.SNAPSHOT.unpack(data)
+        game = cls(difficulty, rng)
+        game.scrambled = scrambled.decode() or None
+        game.answers = set(answers.decode().split())
+        game.started = bool(started)
+        game.elapsed = milliseconds / 1000
+        return game
+
+    def pick_word(self):
+        """A word with at least two different letters and only a few anagrams, if one turns up."""
+        for _ in range(self.word_tries):
+            word = self.word_bank.get_word(self.word_grade, self.rng)
+            answers = set(self.word_bank.anagrams(word)) | {word}
+            if len(set(word)) > 1 and len(answers) <= self.max_answers:
+                break
+        return word, answers
+
     def shuffle_word(self, word):
+        # A scramble that spells an answer gives the game away, so avoid those
         scrambled = list(word)
-        while True:
-            random.shuffle(scrambled)
-            if ''.join(scrambled) != word:
-                break
-        return ''.join(scrambled)
+        for _ in range(self.shuffle_tries):
+            self.rng.shuffle(scrambled)
+            if ''.join(scrambled) not in self.answers | {word}:
+                return ''.join(scrambled)
+        # Sorted or reversed letters differ from the word unless it is one letter repeated
+        ordered = sorted(word)
+        return ''.join(ordered if ordered != list(word) else reversed(ordered))
 
     def clear_screen(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
-
-    def start(self):
-        word = self.word_bank.get_word(self.difficulty)
-        scrambled = self.shuffle_word(word)
-        time_limit = 15
-
-        print(f"\n{self.colors['blue']}♥ Heart Game - Encrypted Door{self.colors['reset']}")
-        print(f"You have {time_limit} seconds to solve the word.")
-        print("Press Enter to start...")
-        input()
-
-        # Show scrambled word after time starts
-        print(f"\nScrambled word: {scrambled}")
-        start_time = time.time()
-        
+        self.clear()
+
+    def run(self):
+        if self.scrambled is None:
+            word, self.answers = self.pick_word()
+            self.scrambled = self.shuffle_word(word)
+        time_limit = self.time_limit
+
+        self.say(f"\n{self.colors['blue']}♥ Heart Game - Encrypted Door{self.colors['reset']}")
+        if not self.started:
+            self.say(f"You have {time_limit} seconds to solve the word.")
+            yield Ask("Press Enter to start...\n")
+            self.started = True
+
+        # Show scrambled word after time starts; a restored game carries on with the time it had left
+        self.say(f"\nScrambled word: {self.scrambled}")
+        self.started_at = self.clock.now() - self.elapsed
+
         while True:
-            elapsed = time.time() - start_time
+            elapsed = self.seconds_played()
             remaining = max(0, time_limit - elapsed)
-            
-            # Only update the time
-            print(f"\r⏰ Time remaining: {remaining:.1f} seconds", end="", flush=True)
-            
             if remaining <= 0:
-                print("\n⏰ Time's up!")
+                self.say("\n⏰ Time's up!")
+                return False
+
+            # The driver shows the countdown and gives up at the deadline
+            guess = yield Ask("\nYour guess: ", kind="word", timeout=remaining)
+            if guess is None:
+                self.say("\n⏰ Time's up!")
                 return False
-            
-            # Check for input without blocking
-            if msvcrt.kbhit():
-                guess = input("\nYour guess: ").strip().lower()
-                if guess == word:
-                    print("\n✅ Correct! The door is now open.")
-                    return True
-                elif guess:
-                    print(f"❌ Wrong! Try again.")
-                    time.sleep(1)  # Short delay
-                    # Update time after wrong guess
-                    elapsed = time.time() - start_time
-                    remaining = max(0, time_limit - elapsed)
-                    if remaining <= 0:
-                        print("\n⏰ Time's up!")
-                        return False
+            guess = guess.strip().lower()
+            if guess in self.answers:
+                self.say("\n✅ Correct! The door is now open.")
+                return True
+            elif guess:
+                self.say("❌ Wrong! Try again.")
+                yield Wait(1)  # Short delay
 
 # -----------------------------
 # Heart Card Game Starter
@@ -0,0 +1,94 @@
+import random
+from functools import lru_cache
+
+# -------------------------
+# Lights Out Engine
+# -------------------------
+# A board of rows x cols lights is one integer, bit i = row * cols + col.
+# Pressing light i XORs the board with masks[i] (the light and its four
+# neighbours). Which presses turn a board off is a linear system over GF(2),
+# reduced once per board shape and cached.
+popcount = int.bit_count
+
+class LightsOutEngine:
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.masks = []
+        for i in range(rows):
+            for j in range(cols):
+                mask = 1 << (i * cols + j)
+                for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                    if 0 <= i + di < rows and 0 <= j + dj < cols:
+                        mask |= 1 << ((i + di) * cols + j + dj)
+                self.masks.append(mask)
+        self.reduce()
+
+    def reduce(self):
+        # Row r of the system is "which presses flip light r"; the masks are
+        # symmetric, so that is masks[r]. Each row carries the combination of
+        # original rows it came from, so solving is one pass over the pivots.
+        rows = [(self.masks[r], 1 << r) for r in range(self.size)]
+        self.pivots = []        # (pivot press, combination of lights)
+        pivot_rows = []
+        used = 0
+        for column in range(self.size):
+            bit = 1 << column
+            found = next((k for k in range(len(rows)) if rows[k][0] & bit), None)
+            if found is None:
+                continue
+            row, combo = rows.pop(found)
+            rows = [(r ^ row, c ^ combo) if r & bit else (r, c) for r, c in rows]
+            pivot_rows = [(r ^ row, c ^ combo) if r & bit else (r, c) for r, c in pivot_rows]
+            pivot_rows.append((row, combo))
+            used |= bit
+        self.pivots = [((row & -row).bit_length() - 1, combo) for row, combo in pivot_rows]
+        # Lights combinations that must have even parity for a board to be solvable
+        self.checks = [combo for row, combo in rows]
+        # Press sets that change nothing: adding one to a solution gives another solution
+        free = [c for c in range(self.size) if not used >> c & 1]
+        self.null_space = []
+        for column in free:
+            vector = 1 << column
+            for row, combo in pivot_rows:
+                if row >> column & 1:
+                    vector |= 1 << ((row & -row).bit_length() - 1)
+            self.null_space.append(vector)
+
+    def press(self, lights, cell):
+        return lights ^ self.masks[cell]
+
+    def solvable(self, lights):
+        return all(popcount(check & lights) % 2 == 0 for check in self.checks)
+
+    def solve(self, lights):
+        """The smallest set of presses that turns every light off, or None."""
+        if not self.solvable(lights):
+            return None
+        presses = 0
+        for pivot, combo in self.pivots:
+            if popcount(combo & lights) % 2:
+                presses |= 1 << pivot
+        # Walk every other solution in Gray code order, one XOR each
+        best = presses
+        best_count = popcount(presses)
+        for k in range(1, 1 << len(self.null_space)):
+            presses ^= self.null_space[(k & -k).bit_length() - 1]
+            count = popcount(presses)
+            if count < best_count:
+                best, best_count = presses, count
+        return best
+
+    def scramble(self, presses, rng=random):
+        """A lit board that can be turned off in at most the given number of presses."""
+        while True:
+            lights = 0
+            for cell in rng.sample(range(self.size), presses):
+                lights ^= self.masks[cell]
+            if lights:
+                return lights
+
+@lru_cache(maxsize=None)
+def get_engine(rows, cols):
+    return LightsOutEngine(rows, cols)
@@ -0,0 +1,123 @@
+import re
+import shutil
+import sys
+import unicodedata
+
+# -----------------------------
+# Terminal Renderer
+# -----------------------------
+# Games write text and CLEAR markers (see game_io.py). Instead of wiping the
+# terminal on every CLEAR, the renderer remembers the lines of the frame on
+# screen and, when the next frame is ready, rewrites only the lines that
+# changed, using cursor moves. Everything for one frame goes out in a single
+# write. Lines are the unit of change because they carry color codes and
+# emoji, whose columns the renderer cannot reliably tell apart.
+#
+# When the renderer cannot trust its picture of the screen (something else
+# printed, a frame is taller than the terminal, a line wraps) it falls back to
+# clearing and redrawing the whole frame, still without running a shell.
+CLEAR = object()  # Marker in the output buffer for a screen clear
+CLEAR_SCREEN = "\033[H\033[2J"
+ANSI = re.compile(r"\033\[[0-9;?]*[A-Za-z]")
+SGR = re.compile(r"\033\[[0-9;]*m")
+RESET = "\033[0m"
+
+def text_width(text):
+    """Columns a line takes on a terminal, ignoring color codes."""
+    width = 0
+    for char in ANSI.sub("", text):
+        if unicodedata.category(char) in ("Mn", "Me", "Cf"):
+            continue  # Combining marks, variation selectors, ...
+        width += 2 if unicodedata.east_asian_width(char) in "WF" else 1
+    return width
+
+def line_styles(lines):
+    """The color codes in effect at the start of each line, since lines may leave a color on."""
+    styles = []
+    active = ""
+    for line in lines:
+        styles.append(active)
+        for code in SGR.findall(line or ""):
+            active = "" if code in (RESET, "\033[m") else active + code
+    return styles
+
+def append_text(lines, text):
+    # The last line is the one the cursor is on. None stands for a line with
+    # content the renderer did not draw itself.
+    parts = text.split("\n")
+    if lines[-1] is not None:
+        lines[-1] += parts[0]
+    lines.extend(parts[1:])
+
+class Renderer:
+    def __init__(self, write=None, size=None, diff=True):
+        self.write = write or self.write_stdout
+        self.size = size    # (columns, rows), None asks the terminal before each frame
+        self.diff = diff    # False always redraws whole frames, e.g. when output is not a terminal
+        self.shown = None   # Lines on screen since the last clear, None if unknown
+
+    @staticmethod
+    def write_stdout(text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def terminal_size(self):
+        if self.size is not None:
+            return self.size
+        size = shutil.get_terminal_size()
+        return size.columns, size.lines
+
+    def render(self, chunks):
+        """Writes pending output. Anything before the last CLEAR would be wiped at once, so it is skipped."""
+        last_clear = max((i for i, chunk in enumerate(chunks) if chunk is CLEAR), default=None)
+        if last_clear is None:
+            text = ''.join(chunks)
+            self.note(text)
+        else:
+            frame = [""]
+            for chunk in chunks[last_clear + 1:]:
+                append_text(frame, chunk)
+            text = self.draw(frame)
+        if text:
+            self.write(text)
+
+    def fits(self, lines):
+        columns, rows = self.terminal_size()
+        return (lines is not None and len(lines) <= rows
+                and all(line is None or text_width(line) < columns for line in lines))
+
+    def draw(self, frame):
+        old = self.shown
+        self.shown = frame
+        if not self.diff or not self.fits(old) or not self.fits(frame):
+            return CLEAR_SCREEN + "\n".join(frame)
+        parts = []
+        last = len(frame) - 1
+        old_styles = line_styles(old)
+        styles = line_styles(frame)
+        for i, line in enumerate(frame):
+            if i < last and i < len(old) and old[i] == line and old_styles[i] == styles[i]:
+                continue
+            # Move to the start of row i+1, write the line in the colors it starts with
+            # and erase what is left of the old one
+            parts.append(f"\033[{i + 1};1H{RESET}{styles[i]}{line}" + ("\033[K" if i < last else ""))
+        parts.append("\033[J")  # Old rows below the new frame, and the rest of the cursor's line
+        return ''.join(parts)
+
+    def note(self, text):
+        """Records text that reached the screen, e.g. an answer the terminal echoed."""
+        if self.shown is not None:
+            append_text(self.shown, text)
+
+    def scribbled(self):
+        """Something else rewrote the cursor's line, e.g. a countdown."""
+        if self.shown is not None:
+            self.shown[-1] = None
+
+    def forget(self):
+        """Something else printed; the next frame is drawn from scratch."""
+        self.shown = None
+
+    def clear(self):
+        self.write(CLEAR_SCREEN)
+        self.shown = [""]
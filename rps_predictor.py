@@ -0,0 +1,212 @@
+import argparse
+import json
+import random
+import struct
+import time
+from array import array
+
+# -----------------------------
+# Rock Paper Scissors Opponent
+# -----------------------------
+# Moves are 0 = rock, 1 = paper, 2 = scissors, so (m + 1) % 3 beats m.
+# Several models each guess the player's next move:
+#   order k (0-4)  how often each move followed the player's last k moves
+#   shift          after a win, draw or loss, does the player repeat, move up
+#                  or move down (win-stay/lose-shift)
+# Each model keeps a decaying score of how the move that beats its guess
+# would have done, and the computer follows the best model. A round touches
+# a fixed number of counters, whatever the length of the history.
+MOVES = ["rock", "paper", "scissors"]
+MAX_ORDER = 4
+DECAY = 0.9
+COUNT_LIMIT = 0xFFFF  # Counters are u16; a full row is halved
+MODEL_COUNT = MAX_ORDER + 2
+POWERS = [3 ** order for order in range(MAX_ORDER + 1)]
+
+def beats(move):
+    return (move + 1) % 3
+
+def outcome(player, computer):
+    """0 draw, 1 player wins, 2 computer wins."""
+    return (player - computer) % 3
+
+class Predictor:
+    def __init__(self):
+        self.tables = [array('H', bytes(2 * 3 ** order * 3)) for order in range(MAX_ORDER + 1)]
+        self.shift = array('H', bytes(2 * 9))  # [last outcome * 3 + step from the last move]
+        self.history = 0        # Last MAX_ORDER player moves as a base-3 number
+        self.length = 0         # Moves seen, capped at MAX_ORDER
+        self.last_move = None
+        self.last_outcome = None
+        self.scores = [0.0] * MODEL_COUNT
+        self.guesses = [None] * MODEL_COUNT
+
+    @staticmethod
+    def most_likely(counts, start):
+        a, b, c = counts[start], counts[start + 1], counts[start + 2]
+        if a >= b and a >= c:
+            return 0 if a else None
+        return 1 if b >= c else 2
+
+    def predict(self):
+        """Each model's guess at the player's next move (None where a model has no data)."""
+        for order in range(MAX_ORDER + 1):
+            if order <= self.length:
+                context = self.history % POWERS[order]
+                self.guesses[order] = self.most_likely(self.tables[order], context * 3)
+            else:
+                self.guesses[order] = None
+        if self.last_move is None:
+            self.guesses[-1] = None
+        else:
+            step = self.most_likely(self.shift, self.last_outcome * 3)
+            self.guesses[-1] = None if step is None else (self.last_move + step) % 3
+        return self.guesses
+
+    def choose(self, rng=random):
+        """The computer's move: beat the best scoring model's guess, or play at random."""
+        guesses = self.predict()
+        best = max((i for i in range(MODEL_COUNT) if guesses[i] is not None),
+                   key=lambda i: self.scores[i], default=None)
+        if best is None or self.scores[best] <= 0:
+            return rng.randrange(3)
+        return beats(guesses[best])
+
+    def bump(self, counts, index):
+        counts[index] += 1
+        if counts[index] == COUNT_LIMIT:
+            row = index - index % 3
+            for i in range(row, row + 3):
+                counts[i] //= 2
+
+    def update(self, player, computer):
+        """Learns from one round. Call after choose() for the same round."""
+        for i, guess in enumerate(self.guesses):
+            if guess is not None:
+                # +1 if the answer to this guess would have won, -1 if it would have lost
+                result = (0, -1, 1)[outcome(player, beats(guess))]
+                self.scores[i] = self.scores[i] * DECAY + result
+        for order in range(min(self.length, MAX_ORDER) + 1):
+            self.bump(self.tables[order], self.history % POWERS[order] * 3 + player)
+        if self.last_move is not None:
+            self.bump(self.shift, self.last_outcome * 3 + (player - self.last_move) % 3)
+        self.history = (self.history * 3 + player) % POWERS[MAX_ORDER]
+        self.length = min(self.length + 1, MAX_ORDER)
+        self.last_move = player
+        self.last_outcome = outcome(player, computer)
+
+    # -----------------------------
+    # Binary Form
+    # -----------------------------
+    # magic b"RPSM", version u8, max order u8, history u16, length u8,
+    # last move i8, last outcome i8, scores f32 * models, shift u16 * 9,
+    # then the order 0..MAX_ORDER tables as u16. About 800 bytes in all.
+    MAGIC = b"RPSM"
+    VERSION = 1
+    HEAD = struct.Struct(f"<4sBBHBbb{MODEL_COUNT}f")
+
+    def to_bytes(self):
+        head = self.HEAD.pack(self.MAGIC, self.VERSION, MAX_ORDER, self.history, self.length,
+                              -1 if self.last_move is None else self.last_move,
+                              -1 if self.last_outcome is None else self.last_outcome,
+                              *self.scores)
+        return head + self.shift.tobytes() + b"".join(table.tobytes() for table in self.tables)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """A predictor from to_bytes() output, or a fresh one if the data is from another version."""
+        predictor = cls()
+        if len(data) != len(predictor.to_bytes()):
+            return predictor
+        magic, version, max_order, history, length, last_move, last_outcome, *scores = \
+            cls.HEAD.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION or max_order != MAX_ORDER:
+            return predictor
+        predictor.history = history
+        predictor.length = length
+        predictor.last_move = None if last_move < 0 else last_move
+        predictor.last_outcome = None if last_outcome < 0 else last_outcome
+        predictor.scores = list(scores)
+        offset = cls.HEAD.size
+        for counts in [predictor.shift] + predictor.tables:
+            size = len(counts) * 2
+            counts[:] = array('H', data[offset:offset + size])
+            offset += size
+        return predictor
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+# Synthetic players with habits people are known to have. Each one sees its
+# own last move and the computer's. Recorded games can be replayed from a
+# telemetry file (rps_moves events); those ignore what the computer does.
+def synthetic_players(rng):
+    def win_stay_lose_shift(last, computer):
+        if outcome(last, computer) == 1:
+            return last
+        return (last + 1 + rng.randrange(2)) % 3
+    return {
+        "random": lambda last, computer: rng.randrange(3),
+        "favours rock": lambda last, computer: 0 if rng.random() < 0.5 else rng.randrange(3),
+        "cycles r-p-s": lambda last, computer: (last + 1) % 3 if rng.random() < 0.8 else rng.randrange(3),
+        "win-stay/lose-shift": win_stay_lose_shift,
+        "copies the computer": lambda last, computer: computer if rng.random() < 0.7 else rng.randrange(3),
+    }
+
+def replay(moves):
+    moves = iter(moves)
+    return lambda last, computer: next(moves)
+
+def recorded_players(path):
+    """name -> (player, rounds) for every rps_moves event in a telemetry file."""
+    players = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            event = json.loads(line)
+            if event["event"] == "rps_moves" and event["moves"]:
+                moves = ["rps".index(move) for move in event["moves"]]
+                players[f"recorded {len(players) + 1}"] = (replay(moves), len(moves))
+    return players
+
+def play_against(player, rounds, rng):
+    """Plays the predictor against a player. Returns (computer wins, player wins)."""
+    predictor = Predictor()
+    wins = losses = 0
+    last = computer = rng.randrange(3)
+    for _ in range(rounds):
+        move = player(last, computer)
+        computer = predictor.choose(rng)
+        predictor.update(move, computer)
+        result = outcome(move, computer)
+        wins += result == 2
+        losses += result == 1
+        last = move
+    return wins, losses
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Rock Paper Scissors opponent.")
+    parser.add_argument("--rounds", type=int, default=20000)
+    parser.add_argument("--telemetry", metavar="PATH",
+                        help="also play the games recorded in this telemetry file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    players = {name: (player, args.rounds) for name, player in synthetic_players(rng).items()}
+    if args.telemetry:
+        players.update(recorded_players(args.telemetry))
+
+    print(f"{'Player':<22}{'Rounds':>8}{'Computer wins':>15}{'Player wins':>13}")
+    print("-" * 58)
+    total_rounds = 0
+    start_time = time.perf_counter()
+    for name, (player, rounds) in players.items():
+        wins, losses = play_against(player, rounds, rng)
+        total_rounds += rounds
+        print(f"{name:<22}{rounds:>8}{wins / rounds:>15.1%}{losses / rounds:>13.1%}")
+    elapsed = time.perf_counter() - start_time
+    print(f"\n{total_rounds / elapsed:,.0f} predictions and updates per second")
+    size = len(Predictor().to_bytes())
+    print(f"Saved model size: {size} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import argparse
+import os
+import random
+import sqlite3
+import time
+from collections import Counter
+from save_store import DEFAULT_DB, SAVE_DIR, decode_deck, encode_deck
+
+# -----------------------------
+# Run History
+# -----------------------------
+# Every finished gauntlet, won or lost, is one row of the runs table in the
+# save database. Runs are ranked by cards survived, then by total time, and
+# each ranking the game asks for has an index in that order, so a top-K
+# query reads K index entries however many runs there are:
+#   runs_by_score   (cards survived DESC, seconds)          everyone
+#   runs_by_player  (profile, cards survived DESC, seconds) one player
+#   runs_by_day     (day, cards survived DESC, seconds)     one day
+#   runs_by_recent  (profile, finished_at)                  a player's history
+#
+# "Which card kills the most players" would be a scan of every run, so the
+# card_stats table keeps, per card, how many runs reached it and how many
+# died on it, updated with each batch. Runs are buffered and written in one
+# transaction every commit interval (or BATCH_SIZE runs), which keeps the
+# game loop from paying for four index updates per run.
+BATCH_SIZE = 1000
+CACHE_KIB = 64 * 1024  # Index pages stay in memory while batches land all over them
+DEFAULT_TOP = 10
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    profile TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    day TEXT NOT NULL,
+    deck TEXT NOT NULL,
+    card_count INTEGER NOT NULL,
+    cards_survived INTEGER NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (cards_survived DESC, seconds);
+CREATE INDEX IF NOT EXISTS runs_by_player ON runs (profile, cards_survived DESC, seconds);
+CREATE INDEX IF NOT EXISTS runs_by_day ON runs (day, cards_survived DESC, seconds);
+CREATE INDEX IF NOT EXISTS runs_by_recent ON runs (profile, finished_at);
+CREATE TABLE IF NOT EXISTS card_stats (
+    card TEXT PRIMARY KEY,
+    reached INTEGER NOT NULL,
+    deaths INTEGER NOT NULL
+);
+"""
+
+RUN_COLUMNS = "profile, finished_at, deck, card_count, cards_survived, seconds"
+
+class Run:
+    def __init__(self, profile, finished_at, deck, card_count, cards_survived, seconds):
+        self.profile = profile
+        self.finished_at = finished_at
+        self.cards = decode_deck(deck)  # The cards played, the deadly one last
+        self.card_count = card_count
+        self.cards_survived = cards_survived
+        self.seconds = seconds
+
+    @property
+    def killed_by(self):
+        """The card that ended the run, None if every card was survived."""
+        if self.cards_survived >= min(self.card_count, len(self.cards)):
+            return None
+        suit, number = self.cards[self.cards_survived]
+        return suit + number
+
+    def __str__(self):
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(self.finished_at))
+        ending = "survived 🏆" if self.killed_by is None else f"died on {self.killed_by}"
+        return (f"{self.profile:<12} {self.cards_survived:>2}/{self.card_count} cards "
+                f"{format_seconds(self.seconds):>8}  {ending:<14} ({when})")
+
+def format_seconds(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+class RunHistory:
+    def __init__(self, path=DEFAULT_DB, commit_interval=0):
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+        self.db.executescript(SCHEMA)
+        self.commit_interval = commit_interval
+        self.batch = []           # Runs recorded but not written yet
+        self.last_commit = time.monotonic()
+
+    def record(self, profile, cards, cards_survived, seconds, finished_at=None, card_count=None):
+        """Adds a finished run: its (suit, number) cards and how many were survived.
+
+        cards may stop at the card that killed the player; card_count is then
+        the length of the whole deck.
+        """
+        finished_at = time.time() if finished_at is None else finished_at
+        day = time.strftime("%Y-%m-%d", time.localtime(finished_at))
+        card_count = len(cards) if card_count is None else card_count
+        self.batch.append((profile, finished_at, day, encode_deck(cards), card_count, cards_survived, seconds))
+        if len(self.batch) >= BATCH_SIZE or time.monotonic() - self.last_commit >= self.commit_interval:
+            self.flush()
+
+    def flush(self):
+        """Writes every buffered run and its card counts in one transaction."""
+        self.last_commit = time.monotonic()
+        if not self.batch:
+            return
+        reached = Counter()
+        deaths = Counter()
+        for _, _, _, deck, _, cards_survived, _ in self.batch:
+            # Cards survived plus the one that killed the player, if any
+            for i in range(0, min(2 * cards_survived + 2, len(deck)), 2):
+                reached[deck[i:i + 2]] += 1
+            if 2 * cards_survived < len(deck):
+                deaths[deck[2 * cards_survived:2 * cards_survived + 2]] += 1
+        self.db.execute("BEGIN")
+        self.db.executemany("INSERT INTO runs (profile, finished_at, day, deck, card_count, cards_survived, "
+                            "seconds) VALUES (?, ?, ?, ?, ?, ?, ?)", self.batch)
+        self.db.executemany("INSERT INTO card_stats VALUES (?, ?, ?) ON CONFLICT (card) DO UPDATE SET "
+                            "reached = reached + excluded.reached, deaths = deaths + excluded.deaths",
+                            [(card, count, deaths[card]) for card, count in reached.items()])
+        self.db.execute("COMMIT")
+        self.batch = []
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    def top(self, k=DEFAULT_TOP, profile=None, day=None):
+        """The k best runs, most cards survived first and fastest first among equals.
+
+        Narrowed to one profile or one day ("YYYY-MM-DD") if given, not both.
+        """
+        sql = f"SELECT {RUN_COLUMNS} FROM runs"
+        params = ()
+        if profile is not None:
+            sql += " INDEXED BY runs_by_player WHERE profile = ?"
+            params = (profile,)
+        elif day is not None:
+            sql += " INDEXED BY runs_by_day WHERE day = ?"
+            params = (day,)
+        else:
+            sql += " INDEXED BY runs_by_score"
+        sql += " ORDER BY cards_survived DESC, seconds LIMIT ?"
+        return [Run(*row) for row in self.db.execute(sql, params + (k,))]
+
+    def recent(self, profile, k=DEFAULT_TOP):
+        """A profile's last k runs, newest first."""
+        return [Run(*row) for row in self.db.execute(
+            f"SELECT {RUN_COLUMNS} FROM runs INDEXED BY runs_by_recent WHERE profile = ? "
+            "ORDER BY finished_at DESC LIMIT ?", (profile, k))]
+
+    def deadliest(self, k=DEFAULT_TOP):
+        """(card, deaths, runs that reached it) for the k cards that kill the largest share of players."""
+        return self.db.execute("SELECT card, deaths, reached FROM card_stats "
+                               "ORDER BY CAST(deaths AS REAL) / reached DESC, deaths DESC LIMIT ?",
+                               (k,)).fetchall()
+
+_history = None
+
+def get_history(path=DEFAULT_DB):
+    """The shared run history, opened on first use."""
+    global _history
+    if _history is None:
+        _history = RunHistory(path)
+    return _history
+
+# -----------------------------
+# Printing
+# -----------------------------
+def print_runs(title, runs):
+    print(title)
+    if not runs:
+        print("  (no runs yet)")
+    for place, run in enumerate(runs, start=1):
+        print(f"  {place:>2}. {run}")
+
+def print_deadliest(rows):
+    print("Deadliest cards:")
+    if not rows:
+        print("  (no runs yet)")
+    for card, deaths, reached in rows:
+        print(f"  {card:<4} killed {deaths} of {reached} players who reached it ({deaths / reached:.1%})")
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def fill(history, runs, players, rng):
+    """Records runs by random players on random decks, spread over the last year."""
+    cards = [(suit, number) for suit in "♥♦♣♠" for number in "A23456"]
+    now = time.time()
+    start_time = time.perf_counter()
+    for _ in range(runs):
+        rng.shuffle(cards)
+        survived = min(int(rng.expovariate(1 / 6)), len(cards))
+        history.record(f"player{rng.randrange(players)}", cards, survived,
+                       rng.uniform(30, 90) * (survived + 1), now - rng.uniform(0, 365 * 86400))
+    history.flush()
+    return runs / (time.perf_counter() - start_time)
+
+def bench(path, runs, players, seed):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    history = RunHistory(path, commit_interval=1.0)
+    rate = fill(history, runs, players, random.Random(seed))
+    print(f"Recorded {runs} runs at {rate:,.0f} runs/s")
+    day = time.strftime("%Y-%m-%d", time.localtime(time.time() - 86400))
+    queries = {
+        "top 10": lambda: history.top(10),
+        "top 10 of one player": lambda: history.top(10, profile="player7"),
+        "top 10 of one day": lambda: history.top(10, day=day),
+        "last 10 of one player": lambda: history.recent("player7", 10),
+        "deadliest 10 cards": lambda: history.deadliest(10),
+    }
+    for name, query in queries.items():
+        start_time = time.perf_counter()
+        for _ in range(100):
+            query()
+        print(f"{name:<24}{(time.perf_counter() - start_time) * 10:>8.3f} ms")
+    history.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def main():
+    parser = argparse.ArgumentParser(description="Leaderboards and deadliest cards from the run history.")
+    parser.add_argument("--db", default=DEFAULT_DB, help="save database (default %(default)s)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    top_parser = commands.add_parser("top", help="best runs, most cards survived then fastest")
+    top_parser.add_argument("-k", type=int, default=DEFAULT_TOP)
+    top_parser.add_argument("--player", help="only this profile's runs")
+    top_parser.add_argument("--day", metavar="YYYY-MM-DD", help="only runs finished on this day")
+    recent_parser = commands.add_parser("recent", help="a profile's last runs")
+    recent_parser.add_argument("player")
+    recent_parser.add_argument("-k", type=int, default=DEFAULT_TOP)
+    deadliest_parser = commands.add_parser("deadliest", help="cards that kill the largest share of players")
+    deadliest_parser.add_argument("-k", type=int, default=DEFAULT_TOP)
+    bench_parser = commands.add_parser("bench", help="time the queries over a large synthetic history")
+    bench_parser.add_argument("--runs", type=int, default=1000000)
+    bench_parser.add_argument("--players", type=int, default=50000)
+    bench_parser.add_argument("--path", default=os.path.join(SAVE_DIR, "bench_runs.db"))
+    bench_parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.command == "bench":
+        bench(args.path, args.runs, args.players, args.seed)
+        return
+    history = RunHistory(args.db)
+    if args.command == "top":
+        scope = f" of {args.player}" if args.player else f" on {args.day}" if args.day else ""
+        print_runs(f"Top {args.k} runs{scope}:", history.top(args.k, args.player, args.day))
+    elif args.command == "recent":
+        print_runs(f"Last {args.k} runs of {args.player}:", history.recent(args.player, args.k))
+    else:
+        print_deadliest(history.deadliest(args.k))
+    history.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from deck import Deck, FixedDeck
+
+# -----------------------------
+# Save Store
+# -----------------------------
+# Saved gauntlets live in one SQLite database, one row per (profile, slot).
+# Every save is an atomic upsert, so a crash leaves either the old save or
+# the new one, never half a file. The database runs in WAL mode, where a
+# commit is an append to the log and fsyncs are batched at checkpoints.
+# A store opened with a commit interval also groups saves into one commit
+# every interval seconds, which is what a server saving after every card
+# wants; a crash then loses at most that many seconds of saves.
+#
+# Decks are stored as their cards' suit and number run together ("♥A♦3..."),
+# except streamed decks (deck.py), which are stored as their 16-byte saved
+# form, so a save is the same size at card 3 of 24 or card 3000 of 36000.
+# The deck columns are declared BLOB, which keeps either kind of value
+# exactly as it was written; the type of the value tells the two apart.
+# Games that learn a player's habits keep their model as a blob in the
+# models table, one row per (profile, model name).
+#
+# The checkpoints table holds each profile's card in progress: the deck, the
+# card's index and the game's snapshot (snapshot.py), rewritten after every
+# answer and deleted when the card ends. A crash or a closed terminal in the
+# middle of a long card then costs the last answer at most.
+SAVE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB = os.path.join(SAVE_DIR, "saves.db")
+LEGACY_JSON = os.path.join(SAVE_DIR, "save_game.json")
+DEFAULT_PROFILE = "player"
+SAVE_SLOTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS saves (
+    profile TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    deck BLOB NOT NULL,
+    card_index INTEGER NOT NULL,
+    card_count INTEGER NOT NULL,
+    saved_at REAL NOT NULL,
+    PRIMARY KEY (profile, slot)
+);
+CREATE TABLE IF NOT EXISTS models (
+    profile TEXT NOT NULL,
+    name TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (profile, name)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    profile TEXT PRIMARY KEY,
+    deck BLOB NOT NULL,
+    card_index INTEGER NOT NULL,
+    game BLOB NOT NULL,
+    saved_at REAL NOT NULL
+);
+"""
+
+class SaveInfo:
+    """One row of the save index: everything but the deck."""
+    def __init__(self, profile, slot, card_index, card_count, saved_at):
+        self.profile = profile
+        self.slot = slot
+        self.card_index = card_index
+        self.card_count = card_count
+        self.saved_at = saved_at
+
+    def __str__(self):
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(self.saved_at))
+        return f"Slot {self.slot}: {self.card_index}/{self.card_count} cards ({when})"
+
+def encode_deck(cards):
+    return ''.join(suit + number for suit, number in cards)
+
+def decode_deck(text):
+    return [(text[i], text[i + 1]) for i in range(0, len(text), 2)]
+
+def deck_value(cards):
+    """What the deck column holds for a Deck, FixedDeck or list of (suit, number) pairs."""
+    if isinstance(cards, Deck):
+        return cards.to_bytes()
+    return encode_deck(cards.cards if isinstance(cards, FixedDeck) else cards)
+
+def deck_from_value(value):
+    return Deck.from_bytes(value) if isinstance(value, bytes) else decode_deck(value)
+
+class SaveStore:
+    def __init__(self, path=DEFAULT_DB, commit_interval=0):
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.commit_interval = commit_interval
+        self.pending = False      # A transaction with unsaved changes is open
+        self.last_commit = time.monotonic()
+
+    def write(self, sql, params):
+        if not self.pending:
+            self.db.execute("BEGIN")
+            self.pending = True
+        self.db.execute(sql, params)
+        if time.monotonic() - self.last_commit >= self.commit_interval:
+            self.flush()
+
+    def flush(self):
+        """Commits every save made since the last commit."""
+        if self.pending:
+            self.db.execute("COMMIT")
+            self.pending = False
+        self.last_commit = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    def save(self, profile, slot, cards, card_index):
+        """Saves a deck (a Deck, FixedDeck or list of (suit, number) pairs) and how many cards were survived."""
+        self.write("INSERT OR REPLACE INTO saves VALUES (?, ?, ?, ?, ?, ?)",
+                   (profile, slot, deck_value(cards), card_index, len(cards), time.time()))
+
+    def load(self, profile, slot):
+        """Returns (cards, card_index), or (None, None) if the slot is empty.
+
+        cards is a Deck for a streamed deck, else a list of (suit, number) pairs.
+        """
+        row = self.db.execute("SELECT deck, card_index FROM saves WHERE profile = ? AND slot = ?",
+                              (profile, slot)).fetchone()
+        if row is None:
+            return None, None
+        return deck_from_value(row[0]), row[1]
+
+    def delete(self, profile, slot):
+        self.write("DELETE FROM saves WHERE profile = ? AND slot = ?", (profile, slot))
+
+    def list_saves(self, profile=None):
+        """The save index, newest first, without reading any deck."""
+        sql = "SELECT profile, slot, card_index, card_count, saved_at FROM saves"
+        params = ()
+        if profile is not None:
+            sql += " WHERE profile = ?"
+            params = (profile,)
+        return [SaveInfo(*row) for row in self.db.execute(sql + " ORDER BY saved_at DESC", params)]
+
+    def save_model(self, profile, name, data):
+        self.write("INSERT OR REPLACE INTO models VALUES (?, ?, ?)", (profile, name, data))
+
+    def load_model(self, profile, name):
+        """The bytes last saved for a model, or None."""
+        row = self.db.execute("SELECT data FROM models WHERE profile = ? AND name = ?",
+                              (profile, name)).fetchone()
+        return None if row is None else row[0]
+
+    def save_checkpoint(self, profile, cards, card_index, game):
+        """Keeps the card being played: the deck, its index and the game's snapshot bytes."""
+        self.write("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?)",
+                   (profile, deck_value(cards), card_index, game, time.time()))
+
+    def load_checkpoint(self, profile):
+        """Returns (cards, card_index, snapshot) like load(), or (None, None, None) if there is none."""
+        row = self.db.execute("SELECT deck, card_index, game FROM checkpoints WHERE profile = ?",
+                              (profile,)).fetchone()
+        if row is None:
+            return None, None, None
+        return deck_from_value(row[0]), row[1], row[2]
+
+    def clear_checkpoint(self, profile):
+        self.write("DELETE FROM checkpoints WHERE profile = ?", (profile,))
+
+    def migrate_json(self, path=LEGACY_JSON, profile=DEFAULT_PROFILE):
+        """Moves a save_game.json from older versions into the first free slot.
+
+        Returns the slot it went into, or None. When every slot is taken the
+        file is left where it is, so the old save is never lost.
+        """
+        if not os.path.exists(path):
+            return None
+        taken = {info.slot for info in self.list_saves(profile)}
+        free = [slot for slot in range(1, SAVE_SLOTS + 1) if slot not in taken]
+        if not free:
+            print(f"\n⚠️ Every save slot is taken, so {path} was not imported and is left as it is.")
+            return None
+        with open(path) as f:
+            save_data = json.load(f)
+        cards = [(card["suit"], str(card["number"])) for card in save_data["deck"]]
+        self.save(profile, free[0], cards, save_data["current_card_index"])
+        self.flush()
+        os.replace(path, path + ".migrated")  # Kept as a backup, never read again
+        return free[0]
+
+_store = None
+
+def get_store(path=DEFAULT_DB):
+    """The shared store, opened (and any old JSON save migrated) on first use."""
+    global _store
+    if _store is None:
+        _store = SaveStore(path)
+        _store.migrate_json()
+    return _store
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def bench(path, saves, players, commit_interval):
+    if os.path.exists(path):
+        os.remove(path)
+    store = SaveStore(path, commit_interval)
+    cards = [(suit, number) for suit in "♥♦♣♠" for number in "A23456"]
+    start_time = time.perf_counter()
+    for i in range(saves):
+        store.save(f"player{i % players}", 1, cards, i % 24)
+    store.flush()
+    elapsed = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    listed = len(store.list_saves())
+    list_time = time.perf_counter() - start_time
+    store.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return saves / elapsed, listed, list_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure how many saves per second the save store takes.")
+    parser.add_argument("--saves", type=int, default=20000)
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--path", default=os.path.join(SAVE_DIR, "bench_saves.db"))
+    args = parser.parse_args()
+    for interval in (0, 0.1, 1.0):
+        rate, listed, list_time = bench(args.path, args.saves, args.players, interval)
+        print(f"Commit interval {interval:>4} s: {rate:>9.0f} saves/s, "
+              f"listing {listed} saves took {list_time * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
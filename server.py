@@ -0,0 +1,398 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import secrets
+import time
+from collections import deque
+from clock import REAL_CLOCK, ScaledClock
+from game_io import Ask, Wait
+from renderer import Renderer
+from telemetry import telemetry
+from g_main import get_card_visual, make_game, new_deck
+from game_registry import registry
+from run_history import RunHistory
+from save_store import decode_deck
+from session import Recording
+from spectate import SpectatorHub, serve_spectators
+
+# -----------------------------
+# Session
+# -----------------------------
+GUEST_PROFILE = "guest"  # Players on the server have no profile
+# A player cut off mid-run gets it back by connecting again and typing the
+# run's resume code: the run's recording, the card it was on and that
+# card's last checkpoint (snapshot.py) wait in memory, oldest dropped first.
+PAUSED_LIMIT = 10000
+
+class Session:
+    """One player connected over TCP. Lines in, text out."""
+    def __init__(self, reader, writer, stats, clock=REAL_CLOCK, channel=None):
+        self.reader = reader
+        self.writer = writer
+        self.stats = stats
+        self.clock = clock
+        # Every session deals from its own seed, never the shared random module
+        self.recording = Recording()
+        self.answered_at = None  # When the last answer arrived
+        # Remote terminal sizes are unknown; frames taller than a classic
+        # 80x24 terminal are simply redrawn in full
+        self.renderer = Renderer(lambda text: writer.write(text.encode()), size=(80, 24))
+        self.channel = channel  # Where spectators watch this run, None if nobody can
+        self.code = secrets.token_hex(4)  # Resume code
+        self.card_index = 0
+        self.snapshot = None     # Last checkpoint of the card being played
+
+    def checkpoint(self, data):
+        self.snapshot = data
+
+    def write(self, chunks):
+        self.renderer.render(chunks)
+        if self.channel is not None:
+            self.channel.publish(chunks)
+
+    def responded(self):
+        # Input-to-response latency: answer received until the game's reply is queued
+        if self.answered_at is not None:
+            latency = time.perf_counter() - self.answered_at
+            self.stats.latencies.append(latency)
+            telemetry.observe("response", latency)
+            self.answered_at = None
+
+    async def ask(self, ask, screen):
+        screen.append(ask.prompt)
+        self.write(screen)
+        screen.clear()
+        self.responded()
+        await self.writer.drain()
+        asked_at = time.perf_counter()
+        try:
+            if ask.timeout is None:
+                line = await self.reader.readline()
+            else:
+                line = await asyncio.wait_for(self.reader.readline(), self.clock.real_seconds(ask.timeout))
+        except asyncio.TimeoutError:
+            return None
+        if not line:
+            raise ConnectionResetError("Player disconnected")
+        self.answered_at = time.perf_counter()
+        telemetry.observe("answer", self.answered_at - asked_at)
+        answer = line.decode(errors="replace").rstrip("\r\n")
+        self.renderer.note(answer + "\n")  # Echoed by the player's terminal
+        if self.channel is not None:
+            self.channel.publish([answer + "\n"])
+        return answer
+
+    async def wait(self, wait, screen):
+        self.write(screen)
+        screen.clear()
+        self.responded()
+        await self.writer.drain()
+        await asyncio.sleep(self.clock.real_seconds(wait.seconds))
+
+async def play_async(game, session):
+    """Drives a game's run() on the event loop. Returns True on a win."""
+    game.screen = []
+    game.clock = session.clock
+    started_at = session.clock.now()
+    steps = game.run()
+    reply = None
+    answered = False
+    try:
+        while True:
+            event = steps.send(reply)
+            if isinstance(event, Wait):
+                reply = await session.wait(event, game.screen)
+            else:
+                if answered and game.checkpoint is not None:
+                    game.checkpoint(game.snapshot())
+                reply = await session.ask(event, game.screen)
+                answered = True
+                if game.inputs is not None:
+                    game.inputs.append((round(session.clock.now() - started_at, 3), reply))
+    except StopIteration as done:
+        session.write(game.screen)
+        session.responded()
+        return done.value
+    finally:
+        steps.close()
+        game.screen = None
+
+async def play_gauntlet(session, resume=None):
+    """Plays the session's deck. resume is (card index, snapshot or None) to carry on a run cut off."""
+    start, restored = resume or (0, None)
+    recording = session.recording
+    deck = new_deck(recording.deck_rng())
+    recording.set_deck((card.suit, card.number) for card in deck)
+    if resume is not None:
+        session.write([f"\n⏯️ Run resumed at card {start + 1} of {len(deck)}.\n"])
+    else:
+        session.write([f"\n🕹️ Game starts! There are {len(deck)} cards.\n"])
+    session.write([f"🔑 Resume code: {session.code} (if you get cut off, connect again and type it)\n"])
+    session.responded()  # The answer to the resume prompt
+    for index in range(start, len(deck)):
+        card = deck[index]
+        session.card_index = index
+        session.snapshot = None
+        if session.channel is not None:
+            session.channel.status = f"card {index + 1}/{len(deck)}: {card.suit}{card.number}"
+            session.channel.progress = index
+        session.write([f"\nPlaying card: {card.suit} {card.number}\n", get_card_visual(card), "\n"])
+        await session.writer.drain()
+        await asyncio.sleep(session.clock.real_seconds(3))  # Let the card visual sink in
+        if restored is not None and index == start:
+            game = registry.game_class(card.suit, card.number).restore(restored, recording.card_rng(index))
+        else:
+            game = make_game(card, recording.card_rng(index))
+        started_at = time.monotonic()
+        if game is not None:
+            game.checkpoint = session.checkpoint
+            recording.start_card(game, restored if index == start else None)
+        won = game is not None and await play_async(game, session)
+        if game is not None:
+            recording.end_card(index, game, won)
+        # A card without a game is still a card lost; it is just not tagged with a game
+        telemetry.emit("card_end", card=f"{card.suit}{card.number}",
+                       game=type(game).__name__ if game is not None else None,
+                       won=bool(won), seconds=round(time.monotonic() - started_at, 3))
+        if not won:
+            session.write([f"\n💀 You lost the game. Card: {card}\n", "🩸 You died.\n"])
+            return index
+    session.write(["\n🏆 You successfully passed all cards! You survived.\n"])
+    return len(deck)
+
+# -----------------------------
+# Server
+# -----------------------------
+class Stats:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.finished = 0
+        self.tasks = set()
+        self.latencies = deque(maxlen=100000)  # Most recent responses only
+        self.hub = None  # Spectator hub, if spectators are served
+        self.paused = {}  # Resume code -> (recording, card index, snapshot) of runs cut off
+
+    def percentile(self, p):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+async def handle_player(reader, writer, stats, clock, record_dir=None, hub=None, history=None):
+    session = Session(reader, writer, stats, clock, hub.open() if hub is not None else None)
+    stats.tasks.add(asyncio.current_task())
+    stats.active += 1
+    stats.peak = max(stats.peak, stats.active)
+    started_at = time.monotonic()
+    finished = False
+    try:
+        code = ((await session.ask(Ask("Resume code (Enter for a new run): "), [])) or "").strip().lower()
+        paused = stats.paused.pop(code, None)
+        if paused is not None:
+            session.code = code
+            session.recording, start, restored = paused
+            survived = await play_gauntlet(session, (start, restored))
+        else:
+            survived = await play_gauntlet(session)
+        finished = True
+        if history is not None:
+            history.record(GUEST_PROFILE, decode_deck(session.recording.deck), survived,
+                           round(time.monotonic() - started_at, 3))
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    except asyncio.CancelledError:
+        pass  # Server shutting down, end the session quietly
+    finally:
+        if not finished and session.recording.deck:  # Cut off mid-run: keep it for a resume
+            stats.paused[session.code] = (session.recording, session.card_index, session.snapshot)
+            if len(stats.paused) > PAUSED_LIMIT:
+                del stats.paused[next(iter(stats.paused))]
+        stats.tasks.discard(asyncio.current_task())
+        stats.active -= 1
+        stats.finished += 1
+        writer.close()
+        if hub is not None:
+            hub.close(session.channel)
+        if record_dir and session.recording.cards:
+            session.recording.save(os.path.join(record_dir, f"session-{session.recording.seed}.json"))
+
+async def flush_history(history):
+    # Runs are batched; make sure a quiet server still writes them out
+    while True:
+        await asyncio.sleep(history.commit_interval)
+        history.flush()
+
+async def serve(host, port, stats, duration=None, clock=REAL_CLOCK, record_dir=None, spectate_port=None,
+                history=None):
+    hub = SpectatorHub() if spectate_port is not None else None
+    server = await asyncio.start_server(
+        lambda r, w: handle_player(r, w, stats, clock, record_dir, hub, history),
+        host, port, limit=4096, backlog=4096)
+    spectators = asyncio.create_task(serve_spectators(hub, host, spectate_port)) if hub is not None else None
+    flusher = asyncio.create_task(flush_history(history)) if history is not None else None
+    stats.hub = hub
+    async with server:
+        try:
+            if duration is None:
+                await server.serve_forever()
+            else:
+                await asyncio.sleep(duration)
+                for task in list(stats.tasks):
+                    task.cancel()
+                await asyncio.gather(*stats.tasks, return_exceptions=True)
+        finally:
+            if spectators is not None:
+                spectators.cancel()
+            if flusher is not None:
+                flusher.cancel()
+                history.flush()
+
+# -----------------------------
+# Load Test
+# -----------------------------
+def bot_answer(prompt):
+    """Answers a prompt the way a careless player would."""
+    if "letter" in prompt:
+        return random.choice("abcdefghijklmnopqrstuvwxyz")
+    if "numbers" in prompt:
+        return ' '.join(map(str, random.sample(range(1, 10), random.randint(3, 5))))
+    if "Where is" in prompt:
+        return random.choice("ABC") + random.choice("123")
+    if "Rock" in prompt:
+        return random.choice(["rock", "paper", "scissors"])
+    if "Guess" in prompt:
+        return ''.join(map(str, random.sample(range(10), random.randint(3, 5))))
+    if "Press a light" in prompt:
+        # The prompt does not say how big the board is; every board has at least A-E and 1-5
+        return random.choice("ABCDE") + str(random.randint(1, 5))
+    if "Move" in prompt:
+        return random.choice("wasd")
+    if "Your guess" in prompt:
+        return "door"
+    return ""
+
+async def bot_watcher(host, port, stop_at):
+    """Watches the run furthest along, reading everything as fast as it comes."""
+    while time.time() < stop_at:
+        try:
+            reader, writer = await asyncio.open_connection(host, port, limit=4096)
+        except ConnectionRefusedError:
+            await asyncio.sleep(0.1)
+            continue
+        writer.write(b"\n")
+        try:
+            while await asyncio.wait_for(reader.read(65536), max(0.0, stop_at - time.time())):
+                pass
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        writer.close()
+        await asyncio.sleep(0.5)  # No run to watch yet, or the run ended
+
+async def bot_player(host, port, think, stop_at):
+    while time.time() < stop_at:
+        try:
+            reader, writer = await asyncio.open_connection(host, port, limit=4096)
+        except ConnectionRefusedError:  # Server not listening yet
+            await asyncio.sleep(0.1)
+            continue
+        text = ""
+        try:
+            while time.time() < stop_at:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                text = (text + data.decode(errors="replace"))[-200:]
+                if text.endswith((": ", "? ", "start...\n")):
+                    await asyncio.sleep(random.uniform(0, 2 * think))
+                    writer.write((bot_answer(text) + "\n").encode())
+                    text = ""
+        except ConnectionError:
+            pass
+        writer.close()
+
+def run_bots(host, port, sessions, think, stop_at, spectate_port=None, watchers=0):
+    async def swarm():
+        await asyncio.gather(*(bot_player(host, port, think, stop_at) for _ in range(sessions)),
+                             *(bot_watcher(host, spectate_port, stop_at) for _ in range(watchers)))
+    asyncio.run(swarm())
+
+def bench(host, port, sessions, duration, think, clients, watchers=0, spectate_port=None):
+    stats = Stats()
+    stop_at = time.time() + duration
+    if watchers and spectate_port is None:
+        spectate_port = port + 1
+    bots = [multiprocessing.Process(target=run_bots,
+                                    args=(host, port, sessions // clients, think, stop_at,
+                                          spectate_port, watchers // clients))
+            for _ in range(clients)]
+    for bot in bots:
+        bot.start()
+    cpu_start = time.process_time()
+    asyncio.run(serve(host, port, stats, duration, spectate_port=spectate_port))
+    busy = (time.process_time() - cpu_start) / duration
+    for bot in bots:
+        bot.join()
+
+    print(f"Peak concurrent sessions: {stats.peak} ({stats.finished} finished)")
+    print(f"Server CPU: {busy:.1%} of one core")
+    print(f"Sessions per core: {stats.peak / max(busy, 1e-9):.0f}")
+    print(f"Responses: {len(stats.latencies)}")
+    print(f"Input-to-response latency p50: {stats.percentile(0.50) * 1000:.2f} ms, "
+          f"p99: {stats.percentile(0.99) * 1000:.2f} ms")
+    if stats.hub is not None:
+        print(f"Spectator broadcasts: {stats.hub.broadcasts} ({stats.hub.skipped} writes skipped for slow viewers)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Host gauntlets for many players over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--bench", type=int, metavar="SESSIONS",
+                        help="run a load test with this many bot players instead of serving")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--think", type=float, default=0.5, help="mean bot think time in seconds")
+    parser.add_argument("--telemetry", metavar="PATH", help="append gameplay events to this JSONL file")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="run pauses and time limits this many times faster (for demos)")
+    parser.add_argument("--record", metavar="DIR",
+                        help="save every session's answers to DIR for replay with session.py")
+    parser.add_argument("--history", metavar="DB",
+                        help="add every finished run to the run history in this save database (e.g. saves.db)")
+    parser.add_argument("--spectate-port", type=int, metavar="PORT",
+                        help="let anyone watch the runs live on this port (e.g. nc 127.0.0.1 7778)")
+    parser.add_argument("--watchers", type=int, default=0,
+                        help="spectators to add to the load test (on --spectate-port, default port + 1)")
+    parser.add_argument("--clients", type=int, default=max(1, (os.cpu_count() or 2) - 1),
+                        help="bot processes for the load test")
+    args = parser.parse_args()
+    if args.telemetry:
+        telemetry.enable(args.telemetry)
+    try:
+        run(args)
+    finally:
+        telemetry.close()
+
+def run(args):
+    if args.bench:
+        bench(args.host, args.port, args.bench, args.duration, args.think, args.clients,
+              args.watchers, args.spectate_port)
+    else:
+        print(f"Serving gauntlets on {args.host}:{args.port}")
+        clock = REAL_CLOCK if args.speed == 1.0 else ScaledClock(args.speed)
+        if args.record:
+            os.makedirs(args.record, exist_ok=True)
+        if args.spectate_port is not None:
+            print(f"Spectators can watch on {args.host}:{args.spectate_port}")
+        history = RunHistory(args.history, commit_interval=1.0) if args.history else None
+        try:
+            asyncio.run(serve(args.host, args.port, Stats(), clock=clock, record_dir=args.record,
+                              spectate_port=args.spectate_port, history=history))
+        finally:
+            if history is not None:
+                history.close()
+
+if __name__ == "__main__":
+    main()
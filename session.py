@@ -0,0 +1,172 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from clock import VirtualClock
+from deck import Deck, DeckSpec
+from game_io import Wait
+from game_registry import registry
+
+# -----------------------------
+# Session Recordings
+# -----------------------------
+# A session is one gauntlet played from a seed. The deck and every card's
+# game draw from their own random.Random streams derived from that seed, so
+# sessions sharing a process never share randomness and a seed deals the
+# same deck and the same games again. While a card is played the driver
+# records each answer with the game time it came at (seconds since the game
+# started, None for a timed out answer), and the game records any saved
+# model it loaded, such as the Rock Paper Scissors opponent.
+#
+# That is everything a replay needs: it plays each card headlessly on a
+# virtual clock, feeds the answers back at the same game times and checks
+# the card ends the same way, so a player's bug report becomes a regression
+# test that runs in milliseconds. Replays assume the same word store and
+# Sokoban level cache as the recording. A card resumed from a checkpoint
+# records the snapshot it was restored from and only the answers after it.
+RECORDING_VERSION = 3  # 2 added streamed decks, 3 restored cards; older files still load
+DEFAULT_RECORDING = os.path.join(os.path.dirname(os.path.abspath(__file__)), "last_session.json")
+
+class Recording:
+    def __init__(self, seed=None):
+        self.seed = random.randrange(2**63) if seed is None else seed
+        self.deck = ""          # The cards as suit and number run together ("♥A♦3...")
+        self.stream = None      # Or the streamed Deck they are dealt from
+        self.cards = []         # {"index", "inputs", "models", "won"} per card played
+        self.restored = None    # Snapshot the card being played was restored from
+
+    def deck_rng(self):
+        return random.Random(f"{self.seed}:deck")
+
+    def card_rng(self, index):
+        return random.Random(f"{self.seed}:card:{index}")
+
+    def set_deck(self, cards):
+        """The (suit, number) pairs being played, fixed before the first card."""
+        self.deck = ''.join(suit + number for suit, number in cards)
+
+    def set_stream(self, deck):
+        """A streamed deck (deck.py) being played; only its seed and spec are kept."""
+        self.stream = deck
+
+    def card(self, index):
+        if self.stream is not None:
+            return self.stream.card(index)
+        return self.deck[2 * index], self.deck[2 * index + 1]
+
+    def start_card(self, game, restored=None):
+        game.inputs = []
+        game.models = {}
+        self.restored = restored
+
+    def end_card(self, index, game, won):
+        entry = {
+            "index": index,
+            "inputs": game.inputs,
+            "models": {name: None if data is None else data.hex() for name, data in game.models.items()},
+            "won": bool(won),
+        }
+        if self.restored is not None:
+            entry["restored"] = self.restored.hex()
+        self.cards.append(entry)
+
+    def save(self, path):
+        data = {"version": RECORDING_VERSION, "seed": self.seed, "deck": self.deck, "cards": self.cards}
+        if self.stream is not None:
+            data["stream"] = [self.stream.seed, self.stream.spec.decks, self.stream.spec.numbers]
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") not in (1, 2, RECORDING_VERSION):
+            raise ValueError(f"{path}: recording version {data.get('version')}, expected {RECORDING_VERSION}")
+        recording = cls(data["seed"])
+        recording.deck = data["deck"]
+        if "stream" in data:
+            seed, decks, numbers = data["stream"]
+            recording.stream = Deck(seed, DeckSpec(decks, numbers))
+        recording.cards = data["cards"]
+        return recording
+
+# -----------------------------
+# Replay
+# -----------------------------
+def replay_card(recording, entry):
+    """Plays one recorded card again. Returns (won, answers used), won is None if the answers ran out."""
+    index = entry["index"]
+    if "restored" in entry:
+        game = registry.game_class(*recording.card(index)).restore(bytes.fromhex(entry["restored"]),
+                                                                    recording.card_rng(index))
+    else:
+        game = registry.create(*recording.card(index), recording.card_rng(index))
+    game.models = {name: None if data is None else bytes.fromhex(data)
+                   for name, data in entry["models"].items()}
+    clock = game.clock = VirtualClock()
+    inputs = entry["inputs"]
+    used = 0
+    steps = game.run()
+    reply = None
+    try:
+        while True:
+            event = steps.send(reply)
+            reply = None
+            if isinstance(event, Wait):
+                clock.sleep(event.seconds)
+                continue
+            if used == len(inputs):
+                steps.close()
+                return None, used
+            at, reply = inputs[used]
+            used += 1
+            if at > clock.now():
+                clock.sleep(at - clock.now())
+    except StopIteration as done:
+        return bool(done.value), used
+
+def replay(recording):
+    """Replays every recorded card. Returns a list of problems, empty if all outcomes match."""
+    problems = []
+    for entry in recording.cards:
+        suit, number = recording.card(entry["index"])
+        won, used = replay_card(recording, entry)
+        expected = "won" if entry["won"] else "lost"
+        if won is None:
+            problems.append(f"card {entry['index'] + 1} ({suit}{number}): ran out of answers "
+                            f"after {used}, recording {expected}")
+        elif won != entry["won"]:
+            problems.append(f"card {entry['index'] + 1} ({suit}{number}): recording {expected}, "
+                            f"replay {'won' if won else 'lost'}")
+        elif used != len(entry["inputs"]):
+            problems.append(f"card {entry['index'] + 1} ({suit}{number}): {expected} with "
+                            f"{len(entry['inputs']) - used} answers left over")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded sessions and check every card ends the same way.")
+    parser.add_argument("paths", nargs="*", default=[DEFAULT_RECORDING], metavar="RECORDING")
+    args = parser.parse_args()
+    failed = 0
+    for path in args.paths:
+        recording = Recording.load(path)
+        answers = sum(len(entry["inputs"]) for entry in recording.cards)
+        start_time = time.perf_counter()
+        problems = replay(recording)
+        elapsed = time.perf_counter() - start_time
+        status = "FAILED" if problems else "ok"
+        print(f"{path}: {len(recording.cards)} cards, {answers} answers replayed in "
+              f"{elapsed * 1000:.1f} ms ({status})")
+        for problem in problems:
+            print(f"  {problem}")
+        failed += bool(problems)
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import argparse
+import random
+import time
+from collections import deque
+from multiprocessing import Pool
+from clock import VirtualClock
+from game_io import Ask, Wait
+from g_main import make_game, new_deck
+from code_breaker import feedback_value, get_table
+from sokoban_board import BOX, PUSHED, WALKED
+from sokoban_solver import solve
+
+# -----------------------------
+# Player Policies
+# -----------------------------
+# A policy answers every Ask a game yields. The answer comes from the
+# method named after the Ask kind, e.g. on_letter for Hangman.
+class Policy:
+    def begin(self, game):
+        pass
+
+    def answer(self, game, ask):
+        return getattr(self, "on_" + ask.kind)(game, ask)
+
+    def on_continue(self, game, ask):
+        return ""
+
+class RandomPolicy(Policy):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+
+    def on_letter(self, game, ask):
+        return random.choice([l for l in self.letters if l not in game.guessed_letters])
+
+    def on_word(self, game, ask):
+        letters = list(game.scrambled)
+        random.shuffle(letters)
+        return ''.join(letters)
+
+    def on_numbers(self, game, ask):
+        return ' '.join(map(str, random.sample(range(1, 10), len(game.numbers))))
+
+    def on_position(self, game, ask):
+        return random.choice(game.rows) + random.choice(game.cols)
+
+    def on_rps(self, game, ask):
+        return random.choice(game.choices)
+
+    def on_code(self, game, ask):
+        return ''.join(map(str, random.sample(range(10), game.code_length)))
+
+    def on_button(self, game, ask):
+        return game.label(random.randrange(game.size * game.size))
+
+    def on_move(self, game, ask):
+        return random.choice('wasd')
+
+class SmartPolicy(RandomPolicy):
+    """Plays every game as well as a player with perfect memory can."""
+    frequency = "etaoinshrdlcumwfgypbvkjxqz"
+    sokoban_plans = {}
+
+    def begin(self, game):
+        self.tried = set()
+        self.plan = deque()
+        self.candidates = None
+
+    def on_letter(self, game, ask):
+        pattern = game.display_progress().split(" ")
+        wrong = {l for l in game.guessed_letters if l not in pattern}
+        if self.candidates is None:
+            self.candidates = [w for w in game.word_bank.words_for(game.word_grade)
+                               if len(w) == len(pattern)]
+        # Candidates only ever shrink, so each guess filters the previous list
+        self.candidates = [w for w in self.candidates if not wrong & set(w)
+                           and all(p == "_" and c not in game.guessed_letters or p == c
+                                   for p, c in zip(pattern, w))]
+        counts = {}
+        for word in self.candidates:
+            for letter in set(word) - game.guessed_letters:
+                counts[letter] = counts.get(letter, 0) + 1
+        if counts:
+            return max(counts, key=counts.get)
+        return next(l for l in self.frequency if l not in game.guessed_letters)
+
+    def on_word(self, game, ask):
+        for word in game.word_bank.anagrams(game.scrambled):
+            if word not in self.tried:
+                self.tried.add(word)
+                return word
+        return super().on_word(game, ask)
+
+    def on_numbers(self, game, ask):
+        return ' '.join(map(str, game.numbers))
+
+    def on_position(self, game, ask):
+        return game.get_color_position(game.grid, game.current_color)
+
+    def on_code(self, game, ask):
+        table = get_table(game.code_length)
+        if self.candidates is None:
+            self.candidates = range(table.count)
+            self.scored = 0
+        for guess, marks in game.guesses[self.scored:]:
+            self.candidates = table.filter(self.candidates, tuple(guess), feedback_value(marks))
+            self.scored += 1
+        return ''.join(map(str, table.codes[random.choice(self.candidates)]))
+
+    def on_button(self, game, ask):
+        presses = game.engine.solve(game.lights)
+        if not presses:
+            return super().on_button(game, ask)
+        return game.label((presses & -presses).bit_length() - 1)
+
+    def on_move(self, game, ask):
+        if not self.plan:
+            key = bytes(game.board.cells)
+            if key not in self.sokoban_plans:
+                solution = solve(game.grid, game.player_pos, game.board.target_cells())
+                self.sokoban_plans[key] = solution.path if solution else ""
+            self.plan.extend(self.sokoban_plans[key])
+        return self.plan.popleft() if self.plan else super().on_move(game, ask)
+
+class GreedyPolicy(RandomPolicy):
+    """Takes whatever looks best right now: no search, and no memory beyond the last answer."""
+    frequency = SmartPolicy.frequency
+
+    def begin(self, game):
+        self.targets = None
+        self.distances = {}  # Board -> distance, greedy play tends to go round in circles
+
+    def on_letter(self, game, ask):
+        return next(l for l in self.frequency if l not in game.guessed_letters)
+
+    def on_word(self, game, ask):
+        anagrams = game.word_bank.anagrams(game.scrambled)
+        return anagrams[0] if anagrams else super().on_word(game, ask)
+
+    def on_code(self, game, ask):
+        # The first code after a random one that fits the feedback of the last guess alone
+        table = get_table(game.code_length)
+        if not game.guesses:
+            return super().on_code(game, ask)
+        guess, marks = game.guesses[-1]
+        row = table.row(tuple(guess))
+        value = bytes([feedback_value(marks)])
+        start = random.randrange(table.count)
+        found = row.find(value, start)
+        if found < 0:
+            found = row.find(value)
+        return ''.join(map(str, table.codes[found]))
+
+    def on_button(self, game, ask):
+        # The light whose press leaves the fewest lights on
+        cells = range(game.size * game.size)
+        after = {cell: bin(game.engine.press(game.lights, cell)).count("1") for cell in cells}
+        fewest = min(after.values())
+        return game.label(random.choice([cell for cell in cells if after[cell] == fewest]))
+
+    def on_move(self, game, ask):
+        # The move that brings boxes closest to targets, and the player to a box
+        board = game.board
+        if self.targets is None:
+            self.targets = board.target_cells()
+        scores = {}
+        for direction in "wasd":
+            if board.move(direction) in (WALKED, PUSHED):
+                key = bytes(board.cells)
+                if key not in self.distances:
+                    self.distances[key] = self.distance(board)
+                scores[direction] = self.distances[key]
+                board.undo()
+        if not scores:
+            return super().on_move(game, ask)
+        best = min(scores.values())
+        return random.choice([d for d in scores if scores[d] == best])
+
+    def distance(self, board):
+        boxes = [board.position(cell) for cell, value in enumerate(board.cells)
+                 if value == BOX and not board.targets[cell]]
+        if not boxes:
+            return 0
+        pi, pj = board.player_pos
+        total = min(abs(pi - i) + abs(pj - j) for i, j in boxes)
+        for i, j in boxes:
+            total += 2 * min(abs(ti - i) + abs(tj - j) for ti, tj in self.targets)
+        return total
+
+POLICIES = {"random": RandomPolicy, "greedy": GreedyPolicy, "smart": SmartPolicy}
+
+# -----------------------------
+# Headless Driver
+# -----------------------------
+def play_headless(game, policy, max_asks=500, clock=None):
+    """Plays one game with no screen and no waiting. Returns True on a win.
+
+    Pauses move a virtual clock instead, so timed rules still apply.
+    """
+    game.clock = clock or VirtualClock()
+    policy.begin(game)
+    steps = game.run()
+    reply = None
+    asks = 0
+    try:
+        while True:
+            event = steps.send(reply)
+            reply = None
+            if isinstance(event, Wait):
+                game.clock.sleep(event.seconds)
+            elif isinstance(event, Ask):
+                asks += 1
+                if asks > max_asks:  # A policy that never finishes loses
+                    steps.close()
+                    return False
+                reply = policy.answer(game, event)
+    except StopIteration as done:
+        return done.value
+
+def run_gauntlet(policy):
+    """Plays a fresh deck until the first loss. Returns (deck, cards survived)."""
+    deck = new_deck()
+    for index, card in enumerate(deck):
+        game = make_game(card)
+        if game is None or not play_headless(game, policy):
+            return deck, index
+    return deck, len(deck)
+
+def simulate_chunk(job):
+    policy_name, runs, seed = job
+    random.seed(seed)
+    policy = POLICIES[policy_name]()
+    drawn = {}
+    survived = {}
+    completed = 0
+    for _ in range(runs):
+        deck, index = run_gauntlet(policy)
+        for i, card in enumerate(deck[:index + 1]):
+            key = f"{card.suit}{card.number}"
+            drawn[key] = drawn.get(key, 0) + 1
+            if i < index:
+                survived[key] = survived.get(key, 0) + 1
+        if index == len(deck):
+            completed += 1
+    return runs, completed, drawn, survived
+
+def simulate(runs, policy_name="smart", processes=None, chunk_size=1000, seed=None):
+    """Fans gauntlet runs out over a process pool and merges the counts."""
+    if seed is None:
+        seed = random.randrange(2**32)
+    jobs = []
+    for start in range(0, runs, chunk_size):
+        jobs.append((policy_name, min(chunk_size, runs - start), seed + start))
+
+    totals = {"runs": 0, "completed": 0, "drawn": {}, "survived": {}}
+    start_time = time.time()
+    with Pool(processes) as pool:
+        for done, completed, drawn, survived in pool.imap_unordered(simulate_chunk, jobs):
+            totals["runs"] += done
+            totals["completed"] += completed
+            for key, count in drawn.items():
+                totals["drawn"][key] = totals["drawn"].get(key, 0) + count
+            for key, count in survived.items():
+                totals["survived"][key] = totals["survived"].get(key, 0) + count
+    totals["elapsed"] = time.time() - start_time
+    return totals
+
+def print_report(totals):
+    elapsed = totals["elapsed"]
+    print(f"Runs: {totals['runs']} in {elapsed:.1f} s ({totals['runs'] / max(elapsed, 1e-9):.0f} runs/s)")
+    print(f"Survived all cards: {totals['completed'] / max(totals['runs'], 1):.2%}")
+    print()
+    print(f"{'Card':<6}{'Drawn':>10}{'Survived':>10}{'Rate':>9}")
+    print("-" * 35)
+    for suit in ['♥', '♦', '♣', '♠']:
+        for number in ['A', '2', '3', '4', '5', '6']:
+            key = f"{suit}{number}"
+            drawn = totals["drawn"].get(key, 0)
+            survived = totals["survived"].get(key, 0)
+            rate = f"{survived / drawn:.2%}" if drawn else "-"
+            print(f"{key:<6}{drawn:>10}{survived:>10}{rate:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Play gauntlets headlessly and report survival rates.")
+    parser.add_argument("--runs", type=int, default=10000)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="smart")
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    print_report(simulate(args.runs, args.policy, args.processes, args.chunk_size, args.seed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import argparse
+import random
+import struct
+import time
+
+# -----------------------------
+# Game Snapshots
+# -----------------------------
+# A snapshot is a game's state between two answers, as bytes: enough to
+# build the game again in another process, or after a crash, and carry on
+# from the same question. The run() generator a game was paused in cannot
+# be saved, so games keep their progress in attributes and run() starts by
+# skipping whatever that progress says is already done.
+#
+# Every game class declares a SnapshotFormat: a two-letter game code, a
+# version and the struct of its fixed-size fields. Layout:
+#   code 2s, version u8, the fixed fields, then each variable-size field
+#   (words, digits, board cells, models) as a varint length and its bytes
+# A varint is 7 bits per byte, low bits first, high bit set on all but the
+# last byte, so short fields cost one byte of length. Most cards in play
+# take 10-30 bytes, a Sokoban map about a hundred, and Rock Paper Scissors
+# about 800 with its opponent's model.
+HEADER = struct.Struct("<2sB")
+
+def pack_length(length):
+    data = bytearray()
+    while length >= 0x80:
+        data.append(length & 0x7F | 0x80)
+        length >>= 7
+    data.append(length)
+    return bytes(data)
+
+def unpack_length(data, offset):
+    """Returns (length, offset after it)."""
+    length = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        length |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return length, offset
+        shift += 7
+
+class SnapshotFormat:
+    def __init__(self, code, version, fields, blobs=0):
+        self.code = code
+        self.version = version
+        self.fields = struct.Struct("<" + fields)
+        self.blobs = blobs  # Variable-size fields after the fixed ones
+
+    def pack(self, values, *blobs):
+        parts = [HEADER.pack(self.code, self.version), self.fields.pack(*values)]
+        for blob in blobs:
+            parts.append(pack_length(len(blob)))
+            parts.append(blob)
+        return b"".join(parts)
+
+    def unpack(self, data):
+        """Returns (fixed field values, list of variable-size fields)."""
+        try:
+            code, version = HEADER.unpack_from(data)
+            if code != self.code or version != self.version:
+                raise ValueError(f"snapshot of {code!r} version {version}, expected "
+                                 f"{self.code!r} version {self.version}")
+            values = self.fields.unpack_from(data, HEADER.size)
+            offset = HEADER.size + self.fields.size
+            blobs = []
+            for _ in range(self.blobs):
+                length, offset = unpack_length(data, offset)
+                blobs.append(bytes(data[offset:offset + length]))
+                offset += length
+        except (struct.error, IndexError):
+            raise ValueError("truncated snapshot") from None
+        if offset != len(data):
+            raise ValueError(f"snapshot has {len(data) - offset} bytes left over")
+        return values, blobs
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def played(suit, rank, answers, rng):
+    """A game a random player has given a few answers to, paused at its next question."""
+    from clock import VirtualClock
+    from game_io import Wait
+    from game_registry import registry
+    from simulate import RandomPolicy
+    game = registry.create(suit, rank, rng)
+    game.clock = VirtualClock()
+    policy = RandomPolicy()
+    policy.begin(game)
+    steps = game.run()
+    reply = None
+    try:
+        while True:
+            event = steps.send(reply)
+            reply = None
+            if isinstance(event, Wait):
+                game.clock.sleep(event.seconds)
+            elif answers == 0:
+                break
+            else:
+                reply = policy.answer(game, event)
+                answers -= 1
+    except StopIteration:
+        pass
+    steps.close()
+    return game
+
+def main():
+    from calibrate import all_cards
+    parser = argparse.ArgumentParser(description="Measure snapshot sizes and restore times of every game.")
+    parser.add_argument("--answers", type=int, default=3, help="answers given before the snapshot")
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    print(f"{'Card':<6}{'Game':<14}{'Bytes':>7}{'Snapshot':>12}{'Restore':>12}  Round trip")
+    for suit, rank in all_cards():
+        game = played(suit, rank, args.answers, rng)
+        game_class = type(game)
+        data = game.snapshot()
+        start_time = time.perf_counter()
+        for _ in range(args.runs):
+            game.snapshot()
+        snapshot_time = (time.perf_counter() - start_time) / args.runs
+        start_time = time.perf_counter()
+        for _ in range(args.runs):
+            restored = game_class.restore(data, rng)
+        restore_time = (time.perf_counter() - start_time) / args.runs
+        same = restored.snapshot() == data
+        print(f"{suit}{rank:<5}{game_class.__name__:<14}{len(data):>7}{snapshot_time * 1e6:>9.1f} µs"
+              f"{restore_time * 1e6:>9.1f} µs  {'ok' if same else 'DIFFERS'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+import argparse
+import random
+import struct
+import time
+from array import array
+
+# -----------------------------
+# Sokoban Board
+# -----------------------------
+# The board is one flat bytearray holding the character of every cell as
+# Spade_SB shows it ('#' stands for the wall '■'). Rows are one cell wider
+# than the map and there is an extra row above and below, all wall, so the
+# cell next to any map cell exists and a move never needs a bounds check:
+# moving is adding a fixed offset. Targets live in a separate mask that
+# never changes, and the board counts the boxes standing on targets as they
+# are pushed, so checking for a win is one comparison on any size of map.
+#
+# Every move made is logged as one byte: the direction's index in MOVES in
+# the low two bits and PUSH_FLAG if it pushed a box. That is enough to undo
+# the move without any copy of the board, so a session costs one byte per
+# move on any map. Written out, the log is a replay string in 'wasd' with
+# pushes in capitals ("wwDa"), the same form the solver's paths take.
+#
+# Saved form (to_bytes, what a Sokoban snapshot holds):
+#   height u16, width u16, player cell u32, targets u32, moves u32, undone u32,
+#   then the cells as stored, each target's cell as u32, and the move and
+#   redo logs one byte per move
+WALL = ord('#')
+FLOOR = ord(' ')
+TARGET = ord('X')
+BOX = ord('B')
+PLAYER = ord('P')
+
+MOVES = "wasd"
+PUSH_FLAG = 4
+
+# Results of step()
+BLOCKED = 0   # Walked into a wall, nothing changed
+WALKED = 1
+PUSHED = 2
+STUCK = 3     # The box cannot move there, nothing changed
+
+class SokobanBoard:
+    HEAD = struct.Struct("<HHIIII")
+
+    def __init__(self, grid, player_pos, targets=None):
+        """Builds a board from a Spade_SB style grid (lists of '■', ' ', 'X', 'B', 'P').
+
+        Targets default to the grid's 'X' cells.
+        """
+        self.height = len(grid)
+        self.width = max(len(row) for row in grid)
+        self.stride = self.width + 1
+        self.cells = bytearray([WALL]) * (self.stride * (self.height + 2))
+        self.targets = bytearray(len(self.cells))
+        for i, row in enumerate(grid):
+            for j, char in enumerate(row):
+                self.cells[self.cell(i, j)] = WALL if char == '■' else ord(char)
+        if targets is None:
+            targets = [(i, j) for i, row in enumerate(grid) for j, char in enumerate(row) if char == 'X']
+        for i, j in targets:
+            self.targets[self.cell(i, j)] = 1
+        self.target_count = sum(self.targets)
+        self.boxes_on_targets = sum(1 for cell in range(len(self.cells))
+                                    if self.targets[cell] and self.cells[cell] == BOX)
+        self.player = self.cell(*player_pos)
+        self.offsets = {'w': -self.stride, 's': self.stride, 'a': -1, 'd': 1}
+        self.history = bytearray()  # Log of the moves made, one byte each
+        self.undone = bytearray()   # Moves taken back, most recent last
+
+    def cell(self, i, j):
+        return (i + 1) * self.stride + j
+
+    def position(self, cell):
+        i, j = divmod(cell, self.stride)
+        return i - 1, j
+
+    @property
+    def player_pos(self):
+        return self.position(self.player)
+
+    def floor(self, cell):
+        """What a cell shows with nothing on it."""
+        return TARGET if self.targets[cell] else FLOOR
+
+    def step(self, direction):
+        """Moves the player one cell. Returns BLOCKED, WALKED, PUSHED or STUCK."""
+        cells = self.cells
+        offset = self.offsets[direction]
+        player = self.player
+        ahead = player + offset
+        target = cells[ahead]
+        if target == FLOOR or target == TARGET:
+            cells[player] = self.floor(player)
+            cells[ahead] = PLAYER
+            self.player = ahead
+            return WALKED
+        if target != BOX:
+            return BLOCKED
+        beyond = ahead + offset
+        if cells[beyond] != FLOOR and cells[beyond] != TARGET:
+            return STUCK
+        cells[player] = self.floor(player)
+        cells[ahead] = PLAYER
+        cells[beyond] = BOX
+        self.boxes_on_targets += self.targets[beyond] - self.targets[ahead]
+        self.player = ahead
+        return PUSHED
+
+    def move(self, direction):
+        """step() that logs the move so it can be undone. Clears the redo log."""
+        result = self.step(direction)
+        if result == WALKED or result == PUSHED:
+            self.history.append(MOVES.index(direction) | (PUSH_FLAG if result == PUSHED else 0))
+            self.undone.clear()
+        return result
+
+    def undo(self):
+        """Takes back the last move. Returns False if there is none."""
+        if not self.history:
+            return False
+        entry = self.history.pop()
+        offset = self.offsets[MOVES[entry & 3]]
+        cells = self.cells
+        player = self.player
+        back = player - offset
+        if entry & PUSH_FLAG:
+            box = player + offset
+            cells[box] = self.floor(box)
+            cells[player] = BOX
+            self.boxes_on_targets += self.targets[player] - self.targets[box]
+        else:
+            cells[player] = self.floor(player)
+        cells[back] = PLAYER
+        self.player = back
+        self.undone.append(entry)
+        return True
+
+    def redo(self):
+        """Makes the last undone move again. Returns False if there is none."""
+        if not self.undone:
+            return False
+        entry = self.undone.pop()
+        self.step(MOVES[entry & 3])
+        self.history.append(entry)
+        return True
+
+    def replay_string(self):
+        """The moves made so far, pushes in capitals."""
+        return ''.join(MOVES[entry & 3].upper() if entry & PUSH_FLAG else MOVES[entry & 3]
+                       for entry in self.history)
+
+    def replay(self, moves):
+        """Plays a replay string without logging it. Returns how many moves played as written.
+
+        A move stops the replay if it hits a wall, cannot push, or pushes when
+        the string says it walks (or the other way round).
+        """
+        step = self.step
+        for count, move in enumerate(moves):
+            if move in "wasd":
+                if step(move) != WALKED:
+                    return count
+            elif step(move.lower()) != PUSHED:
+                return count
+        return len(moves)
+
+    def to_bytes(self):
+        targets = array('I', (cell for cell in range(len(self.targets)) if self.targets[cell]))
+        return (self.HEAD.pack(self.height, self.width, self.player, len(targets), len(self.history),
+                               len(self.undone))
+                + bytes(self.cells) + targets.tobytes() + bytes(self.history) + bytes(self.undone))
+
+    @classmethod
+    def from_bytes(cls, data):
+        height, width, player, target_count, moves, undone = cls.HEAD.unpack_from(data)
+        board = cls.__new__(cls)
+        board.height = height
+        board.width = width
+        board.stride = width + 1
+        size = board.stride * (height + 2)
+        offset = cls.HEAD.size
+        board.cells = bytearray(data[offset:offset + size])
+        offset += size
+        targets = array('I')
+        targets.frombytes(data[offset:offset + 4 * target_count])
+        offset += 4 * target_count
+        board.targets = bytearray(size)
+        for cell in targets:
+            board.targets[cell] = 1
+        board.target_count = target_count
+        board.boxes_on_targets = sum(1 for cell in targets if board.cells[cell] == BOX)
+        board.player = player
+        board.offsets = {'w': -board.stride, 's': board.stride, 'a': -1, 'd': 1}
+        board.history = bytearray(data[offset:offset + moves])
+        board.undone = bytearray(data[offset + moves:offset + moves + undone])
+        if len(board.cells) != size or len(targets) != target_count or len(board.undone) != undone:
+            raise ValueError("truncated Sokoban board")
+        return board
+
+    def is_won(self):
+        """Every target holds a box."""
+        return self.boxes_on_targets == self.target_count
+
+    def lines(self):
+        """The rows as Spade_SB displays them, cells separated by spaces."""
+        # Cells are dropped into every other byte of a row of spaces, so a
+        # frame costs a few C calls per row instead of one per cell
+        line = bytearray(b' ' * (2 * self.width - 1))
+        result = []
+        for i in range(self.height):
+            start = self.cell(i, 0)
+            line[0::2] = self.cells[start:start + self.width]
+            result.append(line.decode('ascii').replace('#', '■'))
+        return result
+
+    def to_grid(self):
+        """The board as a Spade_SB style grid, for the solver."""
+        return [list(line[0::2]) for line in self.lines()]
+
+    def target_cells(self):
+        return [self.position(cell) for cell in range(len(self.targets)) if self.targets[cell]]
+
+def check_solution(grid, player_pos, moves, targets=None):
+    """True if a replay string plays as written from a grid and ends with every box on a target."""
+    board = SokobanBoard(grid, player_pos, targets)
+    return board.replay(moves) == len(moves) and board.is_won()
+
+# -----------------------------
+# Benchmark
+# -----------------------------
+def open_room(size, boxes, rng):
+    """A size x size room with walls around it and boxes on random cells away from the walls."""
+    grid = [['■'] * size] + [['■'] + [' '] * (size - 2) + ['■'] for _ in range(size - 2)] + [['■'] * size]
+    inner = [(i, j) for i in range(2, size - 2) for j in range(2, size - 2)]
+    cells = rng.sample(inner, boxes * 2)
+    for i, j in cells[:boxes]:
+        grid[i][j] = 'B'
+    for i, j in cells[boxes:]:
+        grid[i][j] = 'X'
+    grid[1][1] = 'P'
+    return grid, (1, 1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time Sokoban moves, win checks, frames, undo and replay on big maps.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[7, 100, 300])
+    parser.add_argument("--moves", type=int, default=200000)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    print(f"{'Map':>9}{'moves/s':>12}{'win check':>12}{'frame':>10}{'undos/s':>12}{'replay/s':>12}")
+    for size in args.sizes:
+        grid, player_pos = open_room(size, size // 4, rng)
+        board = SokobanBoard(grid, player_pos)
+        directions = [rng.choice("wasd") for _ in range(args.moves)]
+        start_time = time.perf_counter()
+        for direction in directions:
+            board.step(direction)
+        move_rate = args.moves / (time.perf_counter() - start_time)
+        start_time = time.perf_counter()
+        for _ in range(100000):
+            board.is_won()
+        check_time = (time.perf_counter() - start_time) / 100000
+        start_time = time.perf_counter()
+        board.lines()
+        frame_time = time.perf_counter() - start_time
+        # Log every move, undo them all, then replay the log from the start
+        board = SokobanBoard(grid, player_pos)
+        for direction in directions:
+            board.move(direction)
+        replay = board.replay_string()
+        start_time = time.perf_counter()
+        while board.undo():
+            pass
+        undo_rate = len(replay) / (time.perf_counter() - start_time)
+        start_time = time.perf_counter()
+        board.replay(replay)
+        replay_rate = len(replay) / (time.perf_counter() - start_time)
+        print(f"{size:>4}x{size:<4}{move_rate:>12,.0f}{check_time * 1e9:>9.0f} ns{frame_time * 1000:>7.2f} ms"
+              f"{undo_rate:>12,.0f}{replay_rate:>12,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+from multiprocessing import Pool
+from sokoban_solver import WALL, solve
+
+# -------------------------
+# Level Generator
+# -------------------------
+# Levels are built backwards: boxes start on their targets and the player
+# walks around pulling them away. Every box position reached that way can be
+# pushed back, so each level is solvable. The solver then grades it.
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+GRADES = 9
+DEFAULT_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sokoban_levels.bin")
+
+# Which grades each Sokoban card draws from
+CARD_GRADES = {2: (1, 3), 4: (4, 6), 6: (7, 9), 8: (8, 9)}
+
+class Level:
+    def __init__(self, height, width, walls, targets, boxes, player, moves=0, pushes=0):
+        self.height = height
+        self.width = width
+        self.walls = walls        # Set of (row, col)
+        self.targets = targets    # List of (row, col)
+        self.boxes = boxes        # List of (row, col)
+        self.player = player      # (row, col)
+        self.moves = moves
+        self.pushes = pushes
+
+    @property
+    def grade(self):
+        return grade(self.moves, self.pushes)
+
+    def to_grid(self):
+        """Returns the grid and player position in the format Spade_SB plays."""
+        grid = [[WALL if (i, j) in self.walls else ' ' for j in range(self.width)]
+                for i in range(self.height)]
+        for i, j in self.targets:
+            grid[i][j] = 'X'
+        for i, j in self.boxes:
+            grid[i][j] = 'B'
+        grid[self.player[0]][self.player[1]] = 'P'
+        return grid, self.player
+
+def grade(moves, pushes):
+    """Difficulty from 1 to GRADES. Pushes count most, long walks add a little."""
+    return max(1, min(GRADES, (pushes + moves // 8) // 2))
+
+def make_room(height, width, rng, wall_chance=0.2):
+    """Random walls inside a border, keeping only the largest open area."""
+    open_cells = {(i, j) for i in range(1, height - 1) for j in range(1, width - 1)
+                  if rng.random() >= wall_chance}
+    best = set()
+    unseen = set(open_cells)
+    while unseen:
+        area = set()
+        stack = [unseen.pop()]
+        while stack:
+            i, j = stack.pop()
+            area.add((i, j))
+            for di, dj in DIRECTIONS:
+                cell = (i + di, j + dj)
+                if cell in unseen:
+                    unseen.discard(cell)
+                    stack.append(cell)
+        if len(area) > len(best):
+            best = area
+    walls = {(i, j) for i in range(height) for j in range(width)} - best
+    return walls, sorted(best)
+
+def pull_boxes(floor, targets, rng, steps):
+    """Walks the player around at random, pulling boxes off their targets."""
+    boxes = set(targets)
+    player = rng.choice([cell for cell in floor if cell not in boxes])
+    floor = set(floor)
+    # Keep walking past the step budget until no box or player hides a target
+    for step in range(steps * 2):
+        if step >= steps and player not in targets and not boxes & set(targets):
+            break
+        moves = []
+        pulls = []
+        for di, dj in DIRECTIONS:
+            nxt = (player[0] + di, player[1] + dj)
+            if nxt in floor and nxt not in boxes:
+                moves.append((di, dj))
+                if (player[0] - di, player[1] - dj) in boxes:
+                    pulls.append((di, dj))
+        if pulls and rng.random() < 0.5:
+            di, dj = rng.choice(pulls)
+            boxes.discard((player[0] - di, player[1] - dj))
+            boxes.add(player)
+        elif moves:
+            di, dj = rng.choice(moves)
+        else:
+            break
+        player = (player[0] + di, player[1] + dj)
+    return sorted(boxes), player
+
+def generate_level(rng, height=None, width=None, box_count=None, max_states=20000):
+    """Returns one graded Level, or None if this attempt made nothing useful."""
+    height = height or rng.randint(6, 10)
+    width = width or rng.randint(6, 10)
+    box_count = box_count or rng.randint(2, 5)
+    walls, floor = make_room(height, width, rng)
+    if len(floor) < box_count * 3 + 6:
+        return None
+    targets = rng.sample(floor, box_count)
+    boxes, player = pull_boxes(floor, targets, rng, rng.randint(30, 150))
+    # Spade_SB hides a target under a box or the player, so none may start there
+    if player in targets or set(boxes) & set(targets):
+        return None
+    level = Level(height, width, walls, sorted(targets), boxes, player)
+    solution = solve(level.to_grid()[0], max_states=max_states)
+    if solution is None:
+        return None  # Too hard to grade within the budget
+    level.moves = solution.moves
+    level.pushes = solution.pushes
+    return level
+
+# -------------------------
+# Level Cache File
+# -------------------------
+# Layout (little endian):
+#   header   magic b"SBLV", version u16, grade count u16, level count u32
+#   grades   (first level index u32, level count u32) per grade, levels sorted by grade
+#   offsets  u32 per level, from the start of the file
+#   levels   height u8, width u8, box count u8, moves u16, pushes u16, player u16,
+#            targets u16 * boxes, boxes u16 * boxes, wall bitmap (1 bit per cell)
+# Cells are stored as row * width + col.
+MAGIC = b"SBLV"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+GRADE_ENTRY = struct.Struct("<II")
+LEVEL_HEAD = struct.Struct("<BBBHHH")
+
+def encode_level(level):
+    width = level.width
+    cells = [i * width + j for i, j in level.targets] + [i * width + j for i, j in level.boxes]
+    bitmap = bytearray((level.height * width + 7) // 8)
+    for i, j in level.walls:
+        cell = i * width + j
+        bitmap[cell // 8] |= 1 << (cell % 8)
+    head = LEVEL_HEAD.pack(level.height, width, len(level.boxes), level.moves, level.pushes,
+                           level.player[0] * width + level.player[1])
+    return head + struct.pack(f"<{len(cells)}H", *cells) + bytes(bitmap)
+
+def decode_level(buffer, offset):
+    height, width, count, moves, pushes, player = LEVEL_HEAD.unpack_from(buffer, offset)
+    offset += LEVEL_HEAD.size
+    cells = struct.unpack_from(f"<{count * 2}H", buffer, offset)
+    offset += count * 4
+    bitmap = buffer[offset:offset + (height * width + 7) // 8]
+    walls = {divmod(cell, width) for cell in range(height * width)
+             if bitmap[cell // 8] >> (cell % 8) & 1}
+    return Level(height, width, walls,
+                 [divmod(cell, width) for cell in cells[:count]],
+                 [divmod(cell, width) for cell in cells[count:]],
+                 divmod(player, width), moves, pushes)
+
+def write_cache(levels, path=DEFAULT_CACHE):
+    levels = sorted(levels, key=lambda level: level.grade)
+    grades = []
+    for g in range(1, GRADES + 1):
+        first = next((i for i, level in enumerate(levels) if level.grade >= g), len(levels))
+        count = sum(1 for level in levels if level.grade == g)
+        grades.append((first, count))
+    records = [encode_level(level) for level in levels]
+    offset = HEADER.size + GRADE_ENTRY.size * GRADES + 4 * len(records)
+    offsets = []
+    for record in records:
+        offsets.append(offset)
+        offset += len(record)
+    # Write beside the old cache and swap it in, so readers never see half a file
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, GRADES, len(records)))
+        for first, count in grades:
+            f.write(GRADE_ENTRY.pack(first, count))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for record in records:
+            f.write(record)
+    os.replace(temp_path, path)
+
+class LevelCache:
+    """Memory-mapped level cache. Sampling a level is a couple of table lookups."""
+    def __init__(self, path=DEFAULT_CACHE):
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, grade_count, self.count = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a level cache this version can read")
+        self.grades = [GRADE_ENTRY.unpack_from(self.buffer, HEADER.size + GRADE_ENTRY.size * g)
+                       for g in range(grade_count)]
+        self.offsets_at = HEADER.size + GRADE_ENTRY.size * grade_count
+
+    def level(self, index):
+        offset, = struct.unpack_from("<I", self.buffer, self.offsets_at + 4 * index)
+        return decode_level(self.buffer, offset)
+
+    def sample(self, low, high, rng=random):
+        """A random level graded between low and high (inclusive), or None if there is none."""
+        first = self.grades[low - 1][0]
+        last = self.grades[high - 1][0] + self.grades[high - 1][1]
+        if last <= first:
+            return None
+        return self.level(rng.randrange(first, last))
+
+_cache = None
+
+def load_cache(path=DEFAULT_CACHE):
+    """The shared cache, opened on first use. None if no cache has been generated."""
+    global _cache
+    if _cache is None and os.path.exists(path):
+        _cache = LevelCache(path)
+    return _cache
+
+# -------------------------
+# Batch Generation
+# -------------------------
+def generate_batch(job):
+    seed, attempts = job
+    rng = random.Random(seed)
+    levels = []
+    for _ in range(attempts):
+        level = generate_level(rng)
+        if level is not None:
+            levels.append(level)
+    return levels
+
+def generate(count, processes=None, seed=None, batch=50):
+    """Generates at least count graded levels across a process pool."""
+    seed = random.randrange(2**32) if seed is None else seed
+    levels = []
+    with Pool(processes) as pool:
+        while len(levels) < count:
+            jobs = [(seed + i, batch) for i in range(max(1, (count - len(levels)) // batch))]
+            seed += len(jobs)
+            for found in pool.imap_unordered(generate_batch, jobs):
+                levels.extend(found)
+    return levels[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate graded Sokoban levels for Spade_SB.")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--processes", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=DEFAULT_CACHE)
+    args = parser.parse_args()
+
+    start_time = time.time()
+    levels = generate(args.count, args.processes, args.seed)
+    elapsed = time.time() - start_time
+    write_cache(levels, args.out)
+    print(f"Generated {len(levels)} levels in {elapsed:.1f} s ({len(levels) / elapsed * 60:.0f} per minute)")
+    for g in range(1, GRADES + 1):
+        print(f"Grade {g}: {sum(1 for level in levels if level.grade == g)}")
+    print(f"Saved to {args.out} ({os.path.getsize(args.out)} bytes)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+import heapq
+import random
+import sys
+import time
+from collections import deque
+from sokoban_board import check_solution
+
+# -------------------------
+# Sokoban Solver
+# -------------------------
+# A* over pushes: a state is the set of box cells plus the area the player
+# can walk to, and each step walks the player to a box and pushes it once.
+# Solutions have the fewest possible pushes; the move count is that of the
+# walk between those pushes. States are keyed by a Zobrist hash in a
+# transposition table, and pushes onto dead squares, into frozen box groups
+# or into positions where boxes cannot all be matched to targets are never
+# generated.
+DIRECTIONS = {'w': (-1, 0), 's': (1, 0), 'a': (0, -1), 'd': (0, 1)}
+WALL = '■'
+INFINITY = float('inf')
+
+class Solution:
+    def __init__(self, path, pushes):
+        self.path = path          # Moves as a 'wasd' string, pushes in capitals
+        self.moves = len(path)
+        self.pushes = pushes
+
+class Board:
+    """The static part of a map: walls, targets, dead squares and hash keys."""
+    def __init__(self, grid, targets):
+        # Cells are numbered row by row over the grid plus a ring of wall, so a
+        # step from any floor cell stays on the board.
+        self.height = len(grid) + 2
+        self.width = max(len(row) for row in grid) + 2
+        self.size = self.height * self.width
+        self.walls = [True] * self.size
+        for i, row in enumerate(grid):
+            for j, cell in enumerate(row):
+                self.walls[self.cell(i, j)] = cell == WALL
+        self.targets = frozenset(self.cell(i, j) for i, j in targets)
+        self.steps = {move: dx * self.width + dy for move, (dx, dy) in DIRECTIONS.items()}
+        self.neighbours = [[] for _ in range(self.size)]
+        for cell in range(self.size):
+            if not self.walls[cell]:
+                for move, step in self.steps.items():
+                    if not self.walls[cell + step]:
+                        self.neighbours[cell].append((move, step))
+        self.target_list = sorted(self.targets)
+        self.distance_to = {target: self.find_push_distances([target]) for target in self.target_list}
+        # Row of distances from each cell to every target, in target_list order
+        self.distance_row = [[self.distance_to[t][cell] for t in self.target_list]
+                             for cell in range(self.size)]
+        self.dead = [min(row, default=INFINITY) >= INFINITY for row in self.distance_row]
+        self.open_cells = [[cell + step for move, step in moves] for cell, moves in enumerate(self.neighbours)]
+        rng = random.Random(0)
+        self.box_keys = [rng.getrandbits(64) for _ in range(self.size)]
+        self.player_keys = [rng.getrandbits(64) for _ in range(self.size)]
+
+    def cell(self, i, j):
+        return (i + 1) * self.width + j + 1
+
+    def find_push_distances(self, targets):
+        # Pull a box backwards from the targets. A cell a box can never be
+        # pulled to from any target is dead: a box pushed there is stuck.
+        distance = [INFINITY] * self.size
+        queue = deque()
+        for target in targets:
+            distance[target] = 0
+            queue.append(target)
+        while queue:
+            cell = queue.popleft()
+            for move, step in self.neighbours[cell]:
+                # Box came from cell+step, player stood at cell+2*step
+                if distance[cell + step] == INFINITY and not self.walls[cell + 2 * step]:
+                    distance[cell + step] = distance[cell] + 1
+                    queue.append(cell + step)
+        return distance
+
+    def heuristic(self, boxes):
+        """Fewest pushes to put every box on its own target, ignoring the other boxes.
+
+        This is a minimum-cost matching of boxes to targets (Hungarian method).
+        Returns None if no matching exists, which means the state is dead.
+        """
+        cost = [None] + [self.distance_row[box] for box in boxes]
+        n = len(cost) - 1
+        columns = range(1, n + 1)
+        u = [0] * (n + 1)
+        v = [0] * (n + 1)
+        match = [0] * (n + 1)  # match[target] = box, both counted from 1
+        for row in columns:
+            match[0] = row
+            col = 0
+            slack = [INFINITY] * (n + 1)
+            previous = [0] * (n + 1)
+            used = [False] * (n + 1)
+            while match[col]:
+                used[col] = True
+                current = match[col]
+                costs = cost[current]
+                offset = u[current]
+                delta = INFINITY
+                nxt = 0
+                for c in columns:
+                    if not used[c]:
+                        reduced = costs[c - 1] - offset - v[c]
+                        if reduced < slack[c]:
+                            slack[c] = reduced
+                            previous[c] = col
+                        if slack[c] < delta:
+                            delta = slack[c]
+                            nxt = c
+                if delta >= INFINITY:
+                    return None
+                for c in range(n + 1):
+                    if used[c]:
+                        u[match[c]] += delta
+                        v[c] -= delta
+                    else:
+                        slack[c] -= delta
+                col = nxt
+            while col:
+                match[col] = match[previous[col]]
+                col = previous[col]
+        return -v[0]
+
+    def frozen(self, boxes, box, seen=None):
+        """True if the box can never move again because of walls and frozen neighbours."""
+        seen = {box} if seen is None else seen | {box}
+        width = self.width
+        stuck = []
+        for step in (1, width):  # Horizontal axis, then vertical axis
+            before, after = box - step, box + step
+            if self.walls[before] or self.walls[after]:
+                stuck.append(True)
+            elif self.dead[before] and self.dead[after]:
+                stuck.append(True)
+            else:
+                stuck.append(any(
+                    side in boxes and (side in seen or self.frozen(boxes, side, seen))
+                    for side in (before, after)))
+            if not stuck[-1]:
+                return False
+        return True
+
+    def deadlocked(self, boxes, box):
+        """True if pushing onto this box froze a group that is not all on targets."""
+        if not self.frozen(boxes, box):
+            return False
+        group = [box]
+        found = {box}
+        while group:
+            cell = group.pop()
+            if cell not in self.targets:
+                return True
+            for step in (1, -1, self.width, -self.width):
+                side = cell + step
+                # A box beside the group that can still move is not part of it
+                if side in boxes and side not in found and self.frozen(boxes, side):
+                    found.add(side)
+                    group.append(side)
+        return False
+
+    def walk(self, player, boxes):
+        """Every cell the player can reach without pushing a box."""
+        reach = {player}
+        stack = [player]
+        while stack:
+            cell = stack.pop()
+            for nxt in self.open_cells[cell]:
+                if nxt not in reach and nxt not in boxes:
+                    reach.add(nxt)
+                    stack.append(nxt)
+        return reach
+
+    def walk_path(self, player, goal, boxes):
+        parents = {player: None}
+        queue = deque([player])
+        while queue:
+            cell = queue.popleft()
+            if cell == goal:
+                break
+            for move, step in self.neighbours[cell]:
+                nxt = cell + step
+                if nxt not in parents and nxt not in boxes:
+                    parents[nxt] = (cell, move)
+                    queue.append(nxt)
+        path = []
+        while parents[goal] is not None:
+            goal, move = parents[goal]
+            path.append(move)
+        return ''.join(reversed(path))
+
+def parse_grid(grid, targets=None):
+    """Returns (rows, targets, boxes, player) from a Spade_SB style grid."""
+    rows = [list(row) for row in grid]
+    if targets is None:
+        targets = [(i, j) for i, row in enumerate(rows) for j, cell in enumerate(row) if cell == 'X']
+    boxes = [(i, j) for i, row in enumerate(rows) for j, cell in enumerate(row) if cell == 'B']
+    players = [(i, j) for i, row in enumerate(rows) for j, cell in enumerate(row) if cell == 'P']
+    return rows, targets, boxes, players[0] if players else None
+
+def solve(grid, player_pos=None, targets=None, max_states=200000):
+    """Solves a Spade_SB grid. Returns a Solution, or None if it cannot be solved."""
+    rows, targets, boxes, player = parse_grid(grid, targets)
+    if player_pos is not None:
+        player = tuple(player_pos)
+    if len(boxes) != len(targets):
+        return None  # The game is won when every target holds a box
+    board = Board(rows, targets)
+    boxes = frozenset(board.cell(i, j) for i, j in boxes)
+    player = board.cell(*player)
+    h = board.heuristic(boxes)
+    if h is None:
+        return None
+
+    # Frontier entries carry the exact player cell. The transposition table is
+    # keyed by the boxes plus the top-left cell the player can walk to, since
+    # every cell of that area is the same state for a push search.
+    closed = {}  # Zobrist hash -> (parent hash, box cell, move)
+    bounds = {}  # Zobrist hash of the boxes alone -> heuristic
+    counter = 0
+    frontier = [(h, 0, counter, boxes, player, None)]
+    while frontier and len(closed) < max_states:
+        _, pushes, _, boxes, player, parent = heapq.heappop(frontier)
+        pushes = -pushes
+        reach = board.walk(player, boxes)
+        box_key = 0
+        for box in boxes:
+            box_key ^= board.box_keys[box]
+        key = box_key ^ board.player_keys[min(reach)]
+        if key in closed:
+            continue
+        closed[key] = parent
+        if not boxes - board.targets:
+            return rebuild(board, closed, key, grid, player_pos, targets, pushes)
+        for box in boxes:
+            for move, step in board.neighbours[box]:
+                if box - step not in reach:
+                    continue
+                dest = box + step
+                if board.walls[dest] or dest in boxes or board.dead[dest]:
+                    continue
+                new_boxes = boxes - {box} | {dest}
+                if board.deadlocked(new_boxes, dest):
+                    continue
+                new_box_key = box_key ^ board.box_keys[box] ^ board.box_keys[dest]
+                if new_box_key in bounds:
+                    h = bounds[new_box_key]
+                else:
+                    h = bounds[new_box_key] = board.heuristic(new_boxes)
+                if h is None:
+                    continue  # Some box can no longer be matched to a target
+                counter += 1
+                # Ties go to the deeper state, which is closer to a solution
+                heapq.heappush(frontier, (pushes + 1 + h, -(pushes + 1), counter,
+                                          new_boxes, box, (key, box, move)))
+    return None
+
+def rebuild(board, parents, key, grid, player_pos, targets, pushes):
+    pushes_made = []
+    while parents[key] is not None:
+        key, box, move = parents[key]
+        pushes_made.append((box, move))
+    rows, targets, boxes, player = parse_grid(grid, targets)
+    if player_pos is not None:
+        player = tuple(player_pos)
+    boxes = {board.cell(i, j) for i, j in boxes}
+    player = board.cell(*player)
+    path = []
+    for box, move in reversed(pushes_made):
+        step = board.steps[move]
+        path.append(board.walk_path(player, box - step, boxes))
+        path.append(move.upper())
+        boxes.remove(box)
+        boxes.add(box + step)
+        player = box
+    return Solution(''.join(path), pushes)
+
+def solve_levels(levels):
+    """Batch API. levels maps a name to (grid, targets), targets None for the grid's 'X' cells.
+
+    Returns one result dict per level.
+    """
+    results = []
+    for name, (grid, targets) in levels.items():
+        start_time = time.perf_counter()
+        solution = solve(grid, targets=targets)
+        seconds = time.perf_counter() - start_time
+        results.append({
+            "level": name,
+            "solvable": solution is not None,
+            "moves": solution.moves if solution else None,
+            "pushes": solution.pushes if solution else None,
+            "path": solution.path if solution else None,
+            "verified": solution is not None and check_solution(grid, parse_grid(grid)[3], solution.path, targets),
+            "seconds": seconds,
+        })
+    return results
+
+def read_map(text):
+    """Reads a map in the common text format (# wall, $ box, . target, @ player).
+
+    A box or player on a target ('*', '+') is a 'B' or 'P' in the grid, so
+    the targets are returned separately: (grid, targets).
+    """
+    symbols = {'#': WALL, '$': 'B', '.': 'X', '@': 'P', '*': 'B', '+': 'P', ' ': ' ', '-': ' '}
+    grid, targets = [], []
+    for i, line in enumerate(text.rstrip("\n").split("\n")):
+        grid.append([symbols.get(c, ' ') for c in line])
+        targets.extend((i, j) for j, c in enumerate(line) if c in '.*+')
+    width = max(len(row) for row in grid)
+    for row in grid:
+        row.extend(' ' * (width - len(row)))
+    return grid, targets
+
+def main():
+    from spades_g import Spade_SB
+    levels = {}
+    for level in (2, 4, 6):
+        game = Spade_SB(level)
+        levels[f"Spade_SB level {level}"] = (game.grid, game.board.target_cells())
+    for path in sys.argv[1:]:
+        with open(path) as f:
+            levels[path] = read_map(f.read())
+    for result in solve_levels(levels):
+        if result["solvable"]:
+            checked = "replay ok" if result["verified"] else "REPLAY FAILED"
+            print(f"{result['level']}: {result['moves']} moves, {result['pushes']} pushes "
+                  f"({result['seconds'] * 1000:.1f} ms, {checked})  {result['path']}")
+        else:
+            print(f"{result['level']}: no solution ({result['seconds'] * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -1,138 +1,172 @@
 import random
-import os
-import copy
-import time
+from game_io import Ask, Game, Wait
+from sokoban_board import STUCK, SokobanBoard
+from sokoban_solver import solve
+from sokoban_levels import CARD_GRADES, load_cache
+from lights_out import get_engine
+from snapshot import SnapshotFormat
 
 # -------------------------
 # Spade 2-4-6: Sokoban
 # -------------------------
-class Spade_SB:
-    def __init__(self, level):
+def built_in_level(level):
+    """The hand-made map for a card, played when there is no level cache: (grid, player_pos)."""
+    wall = '■'
+    space = ' '
+    if level == 2:
+        grid = [
+            [wall, wall, wall, wall, wall],
+            [wall, space, space, 'X', wall],
+            [wall, space, 'B', space, wall],
+            [wall, space, 'P', space, wall],
+            [wall, wall, wall, wall, wall]
+        ]
+        player_pos = (3, 2)
+    elif level == 4:
+        grid = [
+            [wall]*6,
+            [wall, space, space, 'X', space, wall],
+            [wall, space, 'B', wall, space, wall],
+            [wall, space, space, 'B', space, wall],
+            [wall, 'P', space, 'X', space, wall],
+            [wall]*6
+        ]
+        player_pos = (4, 1)
+    elif level >= 6:
+        grid = [
+            [wall]*7,
+            [wall, space, 'B', space, 'X', space, wall],
+            [wall, space, space, space, wall, space, wall],
+            [wall, space, wall, 'B', 'B', space, wall],
+            [wall, space, space, space, 'X', space, wall],
+            [wall, space, 'X', space, space, 'P', wall],
+            [wall]*7
+        ]
+        player_pos = (5, 5)
+    else:
+        raise ValueError("Invalid difficulty level.")
+    return grid, player_pos
+
+class Spade_SB(Game):
+    # level; the board as SokobanBoard.to_bytes() saves it, undo and redo logs included
+    SNAPSHOT = SnapshotFormat(b"SB", 1, "B", blobs=1)
+
+    def __init__(self, level, rng=random):
         self.level = level
-        self.grid, self.player_pos = self.generate_level(level)
-        self.original_grid = copy.deepcopy(self.grid)
+        self.rng = rng
+        self.set_level(*self.generate_level(level))
+
+    def snapshot(self):
+        return self.SNAPSHOT.pack((self.level,), self.board.to_bytes())
+
+    @classmethod
+    def restore(cls, data, rng=random):
+        (level,), (board,) = cls.SNAPSHOT.unpack(data)
+        game = cls.__new__(cls)  # Skips dealing a level only to replace it
+        game.level = level
+        game.rng = rng
+        game.board = SokobanBoard.from_bytes(board)
+        return game
+
+    def set_level(self, grid, player_pos, targets=None):
+        """Starts playing a grid of any size. Targets default to its 'X' cells."""
+        self.board = SokobanBoard(grid, player_pos, targets)
+
+    @property
+    def grid(self):
+        return self.board.to_grid()
+
+    @property
+    def player_pos(self):
+        return self.board.player_pos
 
     def generate_level(self, level):
-        wall = '■'
-        space = ' '
-        if level == 2:
-            grid = [
-                [wall, wall, wall, wall, wall],
-                [wall, space, space, 'X', wall],
-                [wall, space, 'B', space, wall],
-                [wall, space, 'P', space, wall],
-                [wall, wall, wall, wall, wall]
-            ]
-            player_pos = (3, 2)
-        elif level == 4:
-            grid = [
-                [wall]*6,
-                [wall, space, space, 'X', space, wall],
-                [wall, space, 'B', wall, space, wall],
-                [wall, space, space, 'B', space, wall],
-                [wall, 'P', space, 'X', space, wall],
-                [wall]*6
-            ]
-            player_pos = (4, 1)
-        elif level == 6:
-            grid = [
-                [wall]*7,
-                [wall, space, 'B', space, 'X', space, wall],
-                [wall, space, space, space, wall, space, wall],
-                [wall, space, wall, 'B', space, space, wall],
-                [wall, space, space, space, 'X', 'B', wall],
-                [wall, space, 'X', space, space, 'P', wall],
-                [wall]*7
-            ]
-            player_pos = (5, 5)
-        else:
-            raise ValueError("Invalid difficulty level.")
-        return grid, player_pos
+        # Prefer a generated level of the right difficulty when a cache exists
+        cache = load_cache()
+        if cache is not None and level in CARD_GRADES:
+            generated = cache.sample(*CARD_GRADES[level], self.rng)
+            if generated is not None:
+                return generated.to_grid()
+        return built_in_level(level)
 
     def display(self):
-        print("\n♠ Spade Game - Sokoban")
-        print("=" * 50)
-        print("\nMap Info:")
-        print("P: Player     B: Box")
-        print("T: Target     #: Wall")
-        print("=" * 50)
-        for row in self.grid:
-            print(' '.join(row))
-        print()
+        if self.screen is None:
+            return  # Nobody is watching (simulator, replays), so skip building the map
+        self.say("\n♠ Spade Game - Sokoban")
+        self.say("=" * 50)
+        self.say("\nMap Info:")
+        self.say("P: Player     B: Box")
+        self.say("T: Target     #: Wall")
+        self.say("=" * 50)
+        self.say("\n".join(self.board.lines()))
+        self.say()
 
     def move(self, direction):
-        dx, dy = {'w': (-1, 0), 's': (1, 0), 'a': (0, -1), 'd': (0, 1)}.get(direction, (0, 0))
-        x, y = self.player_pos
-        nx, ny = x + dx, y + dy
-        nnx, nny = x + 2*dx, y + 2*dy
-
-        def in_bounds(x, y):
-            return 0 <= x < len(self.grid) and 0 <= y < len(self.grid[0])
-
-        if not in_bounds(nx, ny):
-            return
-
-        target = self.grid[nx][ny]
-        beyond = self.grid[nnx][nny] if in_bounds(nnx, nny) else '■'
-
-        if target in [' ', 'X']:
-            self.grid[x][y] = 'X' if self.original_grid[x][y] == 'X' else ' '
-            self.grid[nx][ny] = 'P'
-            self.player_pos = (nx, ny)
-
-        elif target == 'B' and beyond in [' ', 'X']:
-            self.grid[x][y] = 'X' if self.original_grid[x][y] == 'X' else ' '
-            self.grid[nx][ny] = 'P'
-            self.grid[nnx][nny] = 'B'
-            self.player_pos = (nx, ny)
-        elif target == 'B' and beyond not in [' ', 'X']:
-            print("❌ You can't move the box there!")
+        if self.board.move(direction) == STUCK:
+            self.say("❌ You can't move the box there!")
             return False
 
+    def hint(self):
+        solution = solve(self.grid, self.player_pos, self.board.target_cells())
+        if solution is None:
+            return "💡 There is no way to win from here."
+        return f"💡 Hint: move '{solution.path[0].lower()}' ({solution.pushes} pushes to go)"
+
     def check_win(self):
-        for i in range(len(self.grid)):
-            for j in range(len(self.grid[i])):
-                if self.original_grid[i][j] == 'X' and self.grid[i][j] != 'B':
-                    return False
-        return True
+        return self.board.is_won()
 
-    def play(self):
+    def run(self):
         while True:
             self.display()
             if self.check_win():
-                print("🎉 You won!")
+                self.say("🎉 You won!")
                 return True
-            command = input("Move (w/a/s/d): ").lower()
+            command = (yield Ask("Move (w/a/s/d, u/r to undo/redo, h for a hint): ", kind="move")).lower()
             if command in ['w', 'a', 's', 'd']:
                 if self.move(command) == False:
-                    print("💀 Game Over! You can't move the box.")
+                    self.say("💀 Game Over! You can't move the box.")
                     return False
+            elif command == 'u':
+                if not self.board.undo():
+                    self.say("Nothing to undo.")
+            elif command == 'r':
+                if not self.board.redo():
+                    self.say("Nothing to redo.")
+            elif command == 'h':
+                self.say(self.hint())
             else:
-                print("Invalid command.")
+                self.say("Invalid command.")
 
     def clear_screen(self):
-        time.sleep(3)  # Wait 3 seconds for the card visual to appear
-        os.system('cls' if os.name == 'nt' else 'clear')
+        yield Wait(3)  # Wait 3 seconds for the card visual to appear
+        self.clear()
 
 # -------------------------
 # Spade 1-3-5: Lights Out
 # -------------------------
-class Spade_LO:
-    def __init__(self, level):
+class Spade_LO(Game):
+    # level, steps left; the lights, one bit each
+    SNAPSHOT = SnapshotFormat(b"LO", 1, "BB", blobs=1)
+
+    def __init__(self, level, rng=random):
         self.level = level
-        self.lights = [random.choice([True, False]) for _ in range(3)]
-        self.buttons = {
-            0: [0, 1],
-            1: [1, 2],
-            2: [0, 2]
-        }
+        self.rng = rng
         # Determine the number of attempts based on card number
         if level == 1:
             self.steps = 7
         elif level == 3:
             self.steps = 6
-        else:  # level == 5
-            self.steps = 5
+        else:  # level == 5 and up
+            self.steps = 5 + (level - 5) // 2  # Endurance decks: 6 on a 7, 7 on a 9
+        # Board size and scramble grow with the card number. The board is
+        # scrambled with no more presses than steps, so it can always be solved.
+        # Past the 9x9 board a bigger board is easier (the presses end up far
+        # apart), so endurance cards get a longer scramble instead.
+        self.size = {1: 5, 3: 7}.get(level, 9)
+        self.engine = get_engine(self.size, self.size)
+        self.lights = self.engine.scramble(min(self.steps, {1: 4, 3: 5}.get(level, self.steps)), rng)
+        self.rows = [chr(ord('A') + i) for i in range(self.size)]
+        self.cols = [str(j + 1) for j in range(self.size)]
         # Color codes
         self.colors = {
             'blue': '\033[94m',    # Blue
@@ -140,46 +174,72 @@ class Spade_LO:
             'reset': '\033[0m'     # Reset color
         }
 
+    def snapshot(self):
+        return self.SNAPSHOT.pack((self.level, self.steps),
+                                  self.lights.to_bytes((self.engine.size + 7) // 8, "little"))
+
+    @classmethod
+    def restore(cls, data, rng=random):
+        (level, steps), (lights,) = cls.SNAPSHOT.unpack(data)
+        game = cls(level, rng)
+        game.steps = steps
+        game.lights = int.from_bytes(lights, "little")
+        return game
+
     def display(self):
-        print(f"\n{self.colors['blue']}♠ Spade Game - Lights Out{self.colors['reset']}")
+        self.say(f"\n{self.colors['blue']}♠ Spade Game - Lights Out{self.colors['reset']}")
         
-        print(f"{self.colors['pink']}Rules:")
-        print("1. Click on a cell to toggle it and its adjacent cells")
-        print(f"2. Try to turn off all lights{self.colors['reset']}")
-        print("Lights:", ['💡' if l else '❌' for l in self.lights])
-        print("Buttons: 0, 1, 2")
-        print(f"Steps left: {self.steps}")
+        self.say(f"{self.colors['pink']}Rules:")
+        self.say("1. Press a light to toggle it and its adjacent lights")
+        self.say(f"2. Try to turn off all lights{self.colors['reset']}")
+        self.say("   " + " ".join(f"{col:<2}" for col in self.cols))
+        for i, row in enumerate(self.rows):
+            cells = " ".join('💡' if self.lights >> (i * self.size + j) & 1 else '⬛'
+                             for j in range(self.size))
+            self.say(f"{row}  {cells}")
+        self.say(f"Steps left: {self.steps}")
+
+    def label(self, cell):
+        row, col = divmod(cell, self.size)
+        return f"{self.rows[row]}{self.cols[col]}"
+
+    def parse_button(self, text):
+        """Returns the light for a position like B3 or 3B, or None."""
+        text = text.strip().upper()
+        if len(text) == 2 and text[0] in self.rows and text[1] in self.cols:
+            row, col = text[0], text[1]
+        elif len(text) == 2 and text[1] in self.rows and text[0] in self.cols:
+            row, col = text[1], text[0]
+        else:
+            return None
+        return self.rows.index(row) * self.size + self.cols.index(col)
 
     def toggle(self, button):
-        for i in self.buttons[button]:
-            self.lights[i] = not self.lights[i]
+        self.lights = self.engine.press(self.lights, button)
 
-    def start(self):
+    def run(self):
         while self.steps > 0:
             self.display()
-            if not any(self.lights):
-                print("🎉 All lights are off! You win!")
+            if not self.lights:
+                self.say("🎉 All lights are off! You win!")
                 return True
-            try:
-                choice = int(input("Press button (0-2): "))
-                if choice in self.buttons:
-                    self.toggle(choice)
-                    self.steps -= 1
-                else:
-                    print("Invalid button.")
-            except:
-                print("Invalid input.")
+            choice = self.parse_button((yield Ask("Press a light (e.g. A1): ", kind="button")))
+            if choice is not None:
+                self.toggle(choice)
+                self.steps -= 1
+            else:
+                self.say(f"Invalid light. Use a letter {self.rows[0]}-{self.rows[-1]} and a number {self.cols[0]}-{self.cols[-1]}.")
         self.display()
-        if not any(self.lights):
-            print("🎉 You did it at the last step!")
+        if not self.lights:
+            self.say("🎉 You did it at the last step!")
             return True
         else:
-            print("☠️ You failed to turn off all lights.")
+            self.say("☠️ You failed to turn off all lights.")
             return False
 
     def clear_screen(self):
-        time.sleep(3)  # Wait 3 seconds for the card visual to appear
-        os.system('cls' if os.name == 'nt' else 'clear')
+        yield Wait(3)  # Wait 3 seconds for the card visual to appear
+        self.clear()
 
 # -------------------------
 # Game Handler
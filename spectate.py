@@ -0,0 +1,179 @@
+import asyncio
+import time
+from renderer import CLEAR_SCREEN, Renderer
+
+# -----------------------------
+# Spectator Channels
+# -----------------------------
+# Every gauntlet on the server publishes its output to a channel. The
+# channel keeps its own Renderer, so it always knows the frame on screen
+# (the board, the hangman word, the lights, ...) and turns each new frame
+# into the escape codes that rewrite only the lines that changed, the same
+# delta the player's terminal gets. Publishing never touches a viewer: it
+# only renders into the channel's pending text, so a player's turn costs the
+# same with no one watching and with thousands.
+#
+# Viewers are served by the hub's broadcast loop, FRAME_RATE times a second
+# at most. Frames published in between are coalesced: all a channel's
+# pending deltas are joined and encoded once, and that one bytes buffer is
+# written to every viewer who saw the previous broadcast. A viewer who has
+# not (just joined, or fell behind) gets a keyframe instead, the whole
+# current frame after a screen clear, also encoded once per broadcast. A
+# viewer whose socket still holds more than BUFFER_LIMIT unsent bytes is
+# skipped until it drains, then catches up with a keyframe, so slow
+# connections see the latest state and never a backlog.
+FRAME_RATE = 20
+BUFFER_LIMIT = 64 * 1024
+WRITES_PER_YIELD = 256  # Lets player sessions run between batches of viewer writes
+SCREEN_SIZE = (80, 24)  # Same as the player's, so deltas land where they should
+
+class Viewer:
+    def __init__(self, writer):
+        self.writer = writer
+        self.transport = writer.transport
+        self.synced = False  # Saw the channel's previous broadcast
+
+class Channel:
+    def __init__(self, number):
+        self.number = number
+        self.status = ""       # What the player is on, for the list of runs
+        self.progress = 0      # Cards passed, the runs furthest along are listed first
+        self.started = time.monotonic()
+        self.viewers = set()
+        self.pending = []
+        self.dirty = False
+        self.closed = False
+        self.renderer = Renderer(self.pending.append, size=SCREEN_SIZE, diff=False)
+        self.renderer.shown = [""]  # Viewers start from a cleared screen
+
+    def publish(self, chunks):
+        """Takes a player's output (text and CLEAR markers) as the player's terminal gets it."""
+        self.renderer.render(chunks)
+        if not self.viewers:
+            self.pending.clear()  # Only the frame itself matters until someone watches
+        self.dirty = True
+
+    def keyframe(self):
+        return CLEAR_SCREEN + "\n".join(line or "" for line in self.renderer.shown)
+
+    def add(self, viewer):
+        self.viewers.add(viewer)
+        self.renderer.diff = True
+        self.dirty = True
+
+    def remove(self, viewer):
+        self.viewers.discard(viewer)
+        if not self.viewers:
+            self.renderer.diff = False  # Full frames are cheaper to make than deltas
+
+class SpectatorHub:
+    def __init__(self, frame_rate=FRAME_RATE, buffer_limit=BUFFER_LIMIT):
+        self.interval = 1 / frame_rate
+        self.buffer_limit = buffer_limit
+        self.channels = {}
+        self.next_number = 1
+        self.broadcasts = 0
+        self.skipped = 0       # Writes skipped because a viewer was behind
+        self.connections = set()
+
+    def open(self):
+        channel = Channel(self.next_number)
+        self.next_number += 1
+        self.channels[channel.number] = channel
+        return channel
+
+    def close(self, channel):
+        """The run is over; viewers get its last frame and are sent away."""
+        channel.closed = True
+        channel.dirty = True
+
+    async def broadcast_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            for channel in list(self.channels.values()):
+                if channel.dirty:
+                    await self.broadcast(channel)
+
+    async def broadcast(self, channel):
+        channel.dirty = False
+        if not channel.viewers and not channel.closed:
+            return
+        delta = "".join(channel.pending).encode()
+        channel.pending.clear()
+        # Made now, not on first use: frames published while this loop yields
+        # belong to the next broadcast
+        key = channel.keyframe().encode()
+        writes = 0
+        for viewer in list(channel.viewers):
+            if viewer.transport.is_closing():
+                channel.remove(viewer)
+                continue
+            if viewer.transport.get_write_buffer_size() > self.buffer_limit:
+                viewer.synced = False
+                self.skipped += 1
+                continue
+            if viewer.synced:
+                if delta:
+                    viewer.writer.write(delta)
+            else:
+                viewer.writer.write(key)
+                viewer.synced = True
+            writes += 1
+            if writes % WRITES_PER_YIELD == 0:
+                await asyncio.sleep(0)
+        self.broadcasts += 1
+        if channel.closed:
+            del self.channels[channel.number]
+            for viewer in channel.viewers:
+                viewer.writer.write("\n\n📺 The run is over.\n".encode())
+                viewer.writer.close()
+            channel.viewers.clear()
+
+    def listing(self):
+        """Open runs, furthest along first."""
+        runs = sorted((channel for channel in self.channels.values() if not channel.closed),
+                      key=lambda channel: (-channel.progress, channel.started))
+        lines = [f"  {channel.number:>4}  {channel.status}" for channel in runs]
+        return runs, lines
+
+    async def handle_viewer(self, reader, writer):
+        self.connections.add(writer)
+        runs, lines = self.listing()
+        if not runs:
+            writer.write("No gauntlets are being played right now.\n".encode())
+            self.connections.discard(writer)
+            writer.close()
+            return
+        writer.write(("👀 Live gauntlets:\n" + "\n".join(lines) +
+                      "\nWatch which run? (Enter for the one furthest along) ").encode())
+        viewer = channel = None
+        try:
+            line = await reader.readline()
+            choice = line.decode(errors="replace").strip()
+            if not line:
+                return
+            channel = runs[0] if not choice else self.channels.get(int(choice) if choice.isdecimal() else None)
+            if channel is None or channel.closed:
+                writer.write("That run is not being played.\n".encode())
+                return
+            viewer = Viewer(writer)
+            channel.add(viewer)
+            while await reader.read(1024):  # Viewers only talk to pick a run; wait for them to leave
+                pass
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            if viewer is not None:
+                channel.remove(viewer)
+            self.connections.discard(writer)
+            writer.close()
+
+async def serve_spectators(hub, host, port):
+    """Accepts viewers and runs the broadcast loop until cancelled."""
+    server = await asyncio.start_server(hub.handle_viewer, host, port, limit=1024, backlog=4096)
+    async with server:
+        try:
+            await hub.broadcast_loop()
+        finally:
+            for writer in list(hub.connections):
+                writer.close()
@@ -0,0 +1,166 @@
+import argparse
+import json
+import threading
+import time
+from collections import deque
+
+# -----------------------------
+# Histograms
+# -----------------------------
+# HDR-style: every power of two is split into SUB_BUCKETS equal buckets, so
+# any value is recorded within about 3% and a histogram holds a few hundred
+# counters however many values go in. Values are whole microseconds.
+SUB_BITS = 5
+SUB_BUCKETS = 1 << SUB_BITS
+
+def bucket_of(value):
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+def bucket_value(bucket):
+    """The highest value that falls in a bucket."""
+    if bucket < SUB_BUCKETS:
+        return bucket
+    shift = bucket // SUB_BUCKETS - 1
+    return ((bucket % SUB_BUCKETS + SUB_BUCKETS + 1) << shift) - 1
+
+class Histogram:
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.max = 0
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1e6))
+        bucket = bucket_of(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def percentile(self, p):
+        """The value (in seconds) that p of all recorded values are at or below."""
+        if not self.count:
+            return 0.0
+        rank = p * self.count
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(bucket_value(bucket), self.max) / 1e6
+        return self.max / 1e6
+
+    def summary(self):
+        return {"count": self.count, "p50": self.percentile(0.50), "p90": self.percentile(0.90),
+                "p99": self.percentile(0.99), "max": self.max / 1e6}
+
+# -----------------------------
+# Telemetry
+# -----------------------------
+# Events go into a bounded deque, whose appends are atomic, so the game
+# never takes a lock. A background thread drains it every flush interval and
+# writes the batch to a JSONL file. If the writer falls behind, the oldest
+# events are dropped rather than slowing the game down. When telemetry is
+# off, every hook is a single attribute check.
+class Telemetry:
+    def __init__(self):
+        self.enabled = False
+        self.events = None
+        self.histograms = {}
+        self.emitted = 0
+        self.written = 0
+        self.path = None
+        self.thread = None
+        self.stop = threading.Event()
+
+    def enable(self, path, capacity=65536, flush_interval=1.0):
+        self.path = path
+        self.events = deque(maxlen=capacity)
+        self.flush_interval = flush_interval
+        self.stop.clear()
+        self.thread = threading.Thread(target=self.flush_loop, name="telemetry", daemon=True)
+        self.thread.start()
+        self.enabled = True
+
+    def emit(self, kind, **fields):
+        if self.enabled:
+            self.emitted += 1
+            self.events.append((time.time(), kind, fields))
+
+    def observe(self, name, seconds):
+        """Records a duration into the named histogram."""
+        if self.enabled:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram()
+            self.histograms[name].record(seconds)
+
+    def flush(self):
+        batch = []
+        while self.events:
+            at, kind, fields = self.events.popleft()
+            batch.append(json.dumps({"t": round(at, 6), "event": kind, **fields}, ensure_ascii=False))
+        if batch:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(batch) + "\n")
+            self.written += len(batch)
+
+    def flush_loop(self):
+        while not self.stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """Stops the writer and appends the histogram summaries."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self.stop.set()
+        self.thread.join()
+        dropped = self.emitted - self.written - len(self.events)
+        self.events.append((time.time(), "summary", {
+            "dropped": dropped,
+            "histograms": {name: h.summary() for name, h in self.histograms.items()}}))
+        self.flush()
+
+telemetry = Telemetry()
+
+# -----------------------------
+# Report
+# -----------------------------
+def report(path):
+    """Reads a telemetry file and prints how each card went."""
+    played = {}
+    lost = {}
+    durations = {}
+    latencies = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            event = json.loads(line)
+            if event["event"] == "card_end":
+                card = event["card"]
+                played[card] = played.get(card, 0) + 1
+                if not event["won"]:
+                    lost[card] = lost.get(card, 0) + 1
+                durations.setdefault(card, Histogram()).record(event["seconds"])
+            elif event["event"] == "answer":
+                latencies.setdefault(event["game"], Histogram()).record(event["seconds"])
+
+    print(f"{'Card':<6}{'Played':>8}{'Died':>8}{'Median time':>13}")
+    print("-" * 35)
+    for card in sorted(played, key=lambda card: -lost.get(card, 0)):
+        print(f"{card:<6}{played[card]:>8}{lost.get(card, 0):>8}{durations[card].percentile(0.5):>12.1f}s")
+    print()
+    print(f"{'Game':<14}{'Answers':>9}{'p50':>9}{'p99':>9}")
+    print("-" * 41)
+    for game, histogram in sorted(latencies.items()):
+        print(f"{game:<14}{histogram.count:>9}{histogram.percentile(0.5):>8.1f}s"
+              f"{histogram.percentile(0.99):>8.1f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a telemetry file.")
+    parser.add_argument("path")
+    args = parser.parse_args()
+    report(args.path)
+
+if __name__ == "__main__":
+    main()
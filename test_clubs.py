@@ -0,0 +1,15 @@
+import unittest
+from clubs_g import Club_RPS
+
+class RockPaperScissorsTest(unittest.TestCase):
+    def test_endurance_goals_never_go_down(self):
+        goals = [Club_RPS(card_number).goal for card_number in (5, 7, 9)]
+        self.assertEqual(goals, sorted(goals))
+        self.assertLess(goals[0], goals[-1])
+
+    def test_every_card_needs_a_win(self):
+        for card_number in (1, 3, 5, 7, 9):
+            self.assertGreaterEqual(Club_RPS(card_number).goal, 1)
+
+if __name__ == "__main__":
+    unittest.main()
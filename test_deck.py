@@ -0,0 +1,39 @@
+import unittest
+from collections import Counter
+from deck import STANDARD, Deck, DeckSpec
+
+SPECS = [STANDARD, DeckSpec(decks=1, numbers=9), DeckSpec(decks=3, numbers=6), DeckSpec(decks=50, numbers=9)]
+
+class DeckTest(unittest.TestCase):
+    def test_saved_deck_round_trips(self):
+        for spec in SPECS:
+            deck = Deck(1234567, spec)
+            loaded = Deck.from_bytes(deck.to_bytes())
+            self.assertEqual(len(deck.to_bytes()), 16)
+            self.assertEqual(list(loaded.deal()), list(deck.deal()))
+
+    def test_deck_is_a_permutation(self):
+        for spec in SPECS:
+            for seed in range(5):
+                deck = Deck(seed, spec)
+                positions = [deck.position(index) for index in range(len(deck))]
+                self.assertEqual(sorted(positions), list(range(spec.size)))
+                # Every card appears once per deck shuffled together
+                counts = Counter(card for index, card in deck.deal())
+                self.assertEqual(set(counts.values()), {spec.decks})
+                self.assertEqual(len(counts), spec.per_deck)
+
+    def test_seeds_shuffle_differently(self):
+        orders = {tuple(card for index, card in Deck(seed).deal()) for seed in range(20)}
+        self.assertGreater(len(orders), 15)
+
+    def test_resuming_deals_the_rest(self):
+        deck = Deck(99, DeckSpec(decks=2))
+        self.assertEqual(list(deck.deal(30)), list(deck.deal())[30:])
+
+    def test_bad_saved_deck(self):
+        with self.assertRaises(ValueError):
+            Deck.from_bytes(b"NOPE" + Deck(1).to_bytes()[4:])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import random
+import unittest
+from lights_out import get_engine
+
+def pressed(engine, lights, presses):
+    for cell in range(engine.size):
+        if presses >> cell & 1:
+            lights = engine.press(lights, cell)
+    return lights
+
+class LightsOutTest(unittest.TestCase):
+    def test_solution_clears_the_board(self):
+        rng = random.Random(0)
+        for rows, cols in ((3, 3), (5, 5), (7, 7), (9, 9), (4, 6)):
+            engine = get_engine(rows, cols)
+            for presses in (1, 4, 9):
+                lights = engine.scramble(presses, rng)
+                solution = engine.solve(lights)
+                self.assertEqual(pressed(engine, lights, solution), 0)
+                # Never more presses than made the scramble
+                self.assertLessEqual(solution.bit_count(), presses)
+
+    def test_unsolvable_board(self):
+        engine = get_engine(5, 5)  # 5x5 boards are not all solvable
+        unsolvable = [1 << cell for cell in range(engine.size) if not engine.solvable(1 << cell)]
+        self.assertTrue(unsolvable)
+        for lights in unsolvable:
+            self.assertIsNone(engine.solve(lights))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+from run_history import RunHistory
+
+DECK = [('♥', 'A'), ('♦', '2'), ('♣', '3'), ('♠', '4')]
+DAY = 1_700_000_000  # Runs finished at fixed times, so they fall on known days
+
+class RunHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.history = RunHistory(os.path.join(self.directory.name, "runs.db"))
+
+    def tearDown(self):
+        self.history.close()
+        self.directory.cleanup()
+
+    def test_top_runs_most_cards_then_fastest(self):
+        self.history.record("ann", DECK, 2, 50.0, finished_at=DAY)
+        self.history.record("bob", DECK, 4, 90.0, finished_at=DAY + 1)
+        self.history.record("cy", DECK, 2, 30.0, finished_at=DAY + 2)
+        self.history.flush()
+        top = self.history.top(3)
+        self.assertEqual([run.profile for run in top], ["bob", "cy", "ann"])
+        self.assertEqual([run.profile for run in self.history.top(1)], ["bob"])
+
+    def test_top_by_profile_and_recent(self):
+        for i in range(5):
+            self.history.record("ann", DECK, i % 3, 10.0 + i, finished_at=DAY + i)
+        self.history.record("bob", DECK, 4, 5.0, finished_at=DAY)
+        self.history.flush()
+        self.assertEqual({run.profile for run in self.history.top(profile="ann")}, {"ann"})
+        recent = self.history.recent("ann", 2)
+        self.assertEqual([run.finished_at for run in recent], [DAY + 4, DAY + 3])
+
+    def test_deadliest_cards(self):
+        self.history.record("ann", DECK, 1, 10.0, finished_at=DAY)  # Dies on ♦2
+        self.history.record("bob", DECK, 1, 10.0, finished_at=DAY)  # Dies on ♦2
+        self.history.record("cy", DECK, 3, 10.0, finished_at=DAY)   # Dies on ♠4
+        self.history.record("dee", DECK, 4, 10.0, finished_at=DAY)  # Survives them all
+        self.history.flush()
+        deadliest = self.history.deadliest(2)
+        self.assertEqual(deadliest[0], ('♦2', 2, 4))
+        self.assertEqual(deadliest[1], ('♠4', 1, 2))
+
+if __name__ == "__main__":
+    unittest.main()
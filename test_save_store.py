@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+from deck import Deck, DeckSpec, FixedDeck
+from save_store import SAVE_SLOTS, SaveStore
+
+CARDS = [('♥', 'A'), ('♦', '3'), ('♣', '6')]
+
+class SaveStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = SaveStore(os.path.join(self.directory.name, "saves.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_save_and_load(self):
+        self.store.save("player", 1, CARDS, 1)
+        self.store.save("player", 2, FixedDeck(CARDS[::-1]), 0)
+        self.assertEqual(self.store.load("player", 1), (CARDS, 1))
+        self.assertEqual(self.store.load("player", 2), (CARDS[::-1], 0))
+        self.assertEqual(self.store.load("player", 3), (None, None))
+        self.assertEqual(self.store.load("other", 1), (None, None))
+        self.store.save("player", 1, CARDS, 2)  # Overwrites the slot
+        self.assertEqual(self.store.load("player", 1), (CARDS, 2))
+        self.assertEqual(sorted(info.slot for info in self.store.list_saves("player")), [1, 2])
+
+    def test_streamed_deck_is_saved_as_its_seed(self):
+        deck = Deck(42, DeckSpec(decks=100, numbers=9))
+        self.store.save("player", 1, deck, 1500)
+        cards, card_index = self.store.load("player", 1)
+        self.assertIsInstance(cards, Deck)
+        self.assertEqual(card_index, 1500)
+        self.assertEqual(cards.card(1500), deck.card(1500))
+        self.assertEqual(self.store.list_saves("player")[0].card_count, len(deck))
+
+    def test_saves_survive_reopening(self):
+        self.store.save("player", 1, CARDS, 1)
+        self.store.close()
+        self.store = SaveStore(os.path.join(self.directory.name, "saves.db"))
+        self.assertEqual(self.store.load("player", 1), (CARDS, 1))
+
+    def test_checkpoint(self):
+        self.assertEqual(self.store.load_checkpoint("player"), (None, None, None))
+        deck = Deck(7)
+        self.store.save_checkpoint("player", deck, 4, b"SB\x01snapshot")
+        cards, card_index, snapshot = self.store.load_checkpoint("player")
+        self.assertEqual(list(cards.deal()), list(deck.deal()))
+        self.assertEqual((card_index, snapshot), (4, b"SB\x01snapshot"))
+        self.store.save_checkpoint("player", CARDS, 1, b"later")
+        self.assertEqual(self.store.load_checkpoint("player"), (CARDS, 1, b"later"))
+        self.store.clear_checkpoint("player")
+        self.assertEqual(self.store.load_checkpoint("player"), (None, None, None))
+
+    def test_models(self):
+        self.assertIsNone(self.store.load_model("player", "rps"))
+        self.store.save_model("player", "rps", b"\x00\x01")
+        self.assertEqual(self.store.load_model("player", "rps"), b"\x00\x01")
+
+    def write_json(self):
+        path = os.path.join(self.directory.name, "save_game.json")
+        with open(path, "w") as f:
+            json.dump({"deck": [{"suit": suit, "number": number} for suit, number in CARDS],
+                       "current_card_index": 2}, f)
+        return path
+
+    def test_migrate_json_goes_to_first_free_slot(self):
+        self.store.save("player", 1, [('♠', '2')], 0)
+        path = self.write_json()
+        self.assertEqual(self.store.migrate_json(path, "player"), 2)
+        self.assertEqual(self.store.load("player", 2), (CARDS, 2))
+        self.assertEqual(self.store.load("player", 1), ([('♠', '2')], 0))
+        self.assertFalse(os.path.exists(path))
+        self.assertTrue(os.path.exists(path + ".migrated"))
+
+    def test_migrate_json_keeps_file_when_slots_are_full(self):
+        for slot in range(1, SAVE_SLOTS + 1):
+            self.store.save("player", slot, [('♠', '2')], 0)
+        path = self.write_json()
+        self.assertIsNone(self.store.migrate_json(path, "player"))
+        self.assertTrue(os.path.exists(path))
+
+    def test_migrate_json_without_a_file(self):
+        self.assertIsNone(self.store.migrate_json(os.path.join(self.directory.name, "none.json")))
+
+if __name__ == "__main__":
+    unittest.main()
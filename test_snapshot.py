@@ -0,0 +1,28 @@
+import random
+import unittest
+from calibrate import all_cards
+from game_registry import registry
+from snapshot import played
+
+class SnapshotTest(unittest.TestCase):
+    def test_every_game_round_trips(self):
+        rng = random.Random(0)
+        random.seed(0)
+        for suit, rank in all_cards():
+            for answers in (0, 3):
+                game = played(suit, rank, answers, rng)
+                data = game.snapshot()
+                restored = type(game).restore(data, rng)
+                self.assertEqual(restored.snapshot(), data, f"{suit}{rank} after {answers} answers")
+
+    def test_other_games_snapshot_is_refused(self):
+        rng = random.Random(0)
+        data = played('♥', 'A', 0, rng).snapshot()
+        game_class = registry.game_class('♠', '2')
+        with self.assertRaises(ValueError):
+            game_class.restore(data, rng)
+        with self.assertRaises(ValueError):
+            type(played('♥', 'A', 0, rng)).restore(data[:-1], rng)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from sokoban_solver import read_map, solve, solve_levels
+from spades_g import built_in_level
+
+def solved(text):
+    """The solve_levels result for a map in the common text format."""
+    return solve_levels({"map": read_map(text)})[0]
+
+class SolverTest(unittest.TestCase):
+    def test_box_starting_on_a_target(self):
+        result = solved("#######\n"
+                        "#@ $ .#\n"
+                        "#  *  #\n"
+                        "#######\n")
+        self.assertTrue(result["solvable"])
+        self.assertTrue(result["verified"])
+        self.assertEqual(result["pushes"], 2)
+
+    def test_player_starting_on_a_target(self):
+        result = solved("######\n"
+                        "#    #\n"
+                        "#+$  #\n"
+                        "#    #\n"
+                        "######\n")
+        self.assertTrue(result["solvable"])
+        self.assertTrue(result["verified"])
+        self.assertEqual(result["pushes"], 1)
+
+    def test_box_beside_a_frozen_box_on_a_target(self):
+        # Pushing the lower box up freezes the upper one on its target; the
+        # lower box can still move, so the level is not dead
+        result = solved("######\n"
+                        "##.###\n"
+                        "#.$###\n"
+                        "#$ ###\n"
+                        "#@####\n"
+                        "######\n")
+        self.assertTrue(result["solvable"])
+        self.assertTrue(result["verified"])
+
+    def test_box_in_a_corner(self):
+        result = solved("######\n"
+                        "#@ .$#\n"
+                        "######\n")
+        self.assertFalse(result["solvable"])
+
+    def test_built_in_levels_are_solvable(self):
+        for level in (2, 4, 6, 8):
+            grid, player_pos = built_in_level(level)
+            self.assertIsNotNone(solve(grid, player_pos), f"level {level}")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+import time
+import unittest
+
+# Each script runs in a child whose stdin is a pipe we keep open, so a line
+# not answered in time has to be a timeout rather than the end of input.
+READ_BOTH = """
+from timed_input import read_line, timed_input
+print(repr(read_line("menu: ")))
+print(repr(timed_input("guess: ", 5)))
+"""
+
+READ_TIMED = """
+from timed_input import timed_input
+print(repr(timed_input("guess: ", 0.3)))
+"""
+
+def run(script, piped):
+    """Writes piped to the child at once and returns its output and how long it took."""
+    child = subprocess.Popen([sys.executable, "-c", script], stdin=subprocess.PIPE,
+                             stdout=subprocess.PIPE, text=True)
+    start_time = time.monotonic()
+    child.stdin.write(piped)
+    child.stdin.flush()
+    try:
+        output = child.stdout.read()
+        child.wait(timeout=10)
+        return output, time.monotonic() - start_time
+    finally:
+        child.stdin.close()
+
+class TimedInputTest(unittest.TestCase):
+    def test_answer_piped_ahead_is_not_a_timeout(self):
+        output, seconds = run(READ_BOTH, "1\nfunction\n")
+        self.assertEqual(output.splitlines(), ["menu: '1'", "guess: 'function'"])
+        self.assertLess(seconds, 3)
+
+    def test_nothing_piped_times_out(self):
+        output, _ = run(READ_TIMED, "")
+        self.assertTrue(output.endswith("None\n"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import os
+import sys
+import time
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import selectors
+    import termios
+
+# Countdowns are redrawn at most this often. Between redraws we block on the
+# keyboard (or just sleep), so a waiting game uses no CPU.
+REDRAW_INTERVAL = 0.1
+
+# -----------------------------
+# Keyboard Backends
+# -----------------------------
+class PosixKeys:
+    """Reads keys from a POSIX terminal without waiting for Enter."""
+    def __enter__(self):
+        self.fd = sys.stdin.fileno()
+        self.saved = termios.tcgetattr(self.fd)
+        mode = termios.tcgetattr(self.fd)
+        mode[3] &= ~(termios.ICANON | termios.ECHO)  # We echo the typed text ourselves
+        mode[6][termios.VMIN] = 1
+        mode[6][termios.VTIME] = 0
+        termios.tcsetattr(self.fd, termios.TCSANOW, mode)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.fd, selectors.EVENT_READ)
+        return self
+
+    def __exit__(self, *exc):
+        termios.tcsetattr(self.fd, termios.TCSADRAIN, self.saved)
+        self.selector.close()
+
+    def read(self, timeout):
+        if self.selector.select(timeout):
+            return os.read(self.fd, 64).decode(errors="ignore")
+        return ""
+
+class WindowsKeys:
+    """Polls the Windows console. The console cannot be waited on, so we nap between polls."""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def read(self, timeout):
+        deadline = time.monotonic() + timeout
+        while not msvcrt.kbhit():
+            if time.monotonic() >= deadline:
+                return ""
+            time.sleep(0.02)
+        keys = ""
+        while msvcrt.kbhit():
+            keys += msvcrt.getwch()
+        return keys
+
+def keyboard():
+    if os.name == 'nt':
+        return WindowsKeys()
+    return PosixKeys()
+
+# -----------------------------
+# Timed Input
+# -----------------------------
+def countdown(seconds, speed=1.0):
+    """Shows the remaining time until the given number of game seconds has passed.
+
+    Game time runs speed times faster than real time; the display is in game seconds.
+    """
+    deadline = time.monotonic() + seconds / speed
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        print(f"\r⏰ Time remaining: {remaining * speed:.1f} seconds", end="", flush=True)
+        time.sleep(min(REDRAW_INTERVAL, remaining))
+
+# -----------------------------
+# Redirected Input
+# -----------------------------
+# When stdin is a pipe or a file we read its file descriptor ourselves and
+# keep our own line buffer. sys.stdin reads ahead of the line it returns, so
+# an answer piped in early would already sit in its buffer, where select()
+# cannot see it, and would be reported as a timeout. Every line the console
+# asks for goes through read_line() so that there is only one buffer.
+class LineReader:
+    """Splits bytes read from a file descriptor into lines."""
+    def __init__(self, fd):
+        self.fd = fd
+        self.pending = b""
+        self.ended = False
+
+    def fill(self, timeout):
+        """Reads whatever has arrived, waiting up to timeout seconds (None waits for good)."""
+        if os.name != 'nt' and timeout is not None:
+            with selectors.DefaultSelector() as selector:
+                selector.register(self.fd, selectors.EVENT_READ)
+                if not selector.select(timeout):
+                    return
+        data = os.read(self.fd, 4096)
+        if data:
+            self.pending += data
+        else:
+            self.ended = True
+
+    def readline(self, deadline=None):
+        """Returns the next line without its newline, or None if the deadline passes first."""
+        while b"\n" not in self.pending:
+            if self.ended:
+                if not self.pending:
+                    raise EOFError
+                break  # Last line without a newline
+            if deadline is None:
+                self.fill(None)
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.fill(remaining)
+        line, _, self.pending = self.pending.partition(b"\n")
+        return line.decode(sys.stdin.encoding or "utf-8", errors="replace").rstrip("\r")
+
+stdin_lines = None
+
+def redirected_stdin():
+    global stdin_lines
+    if stdin_lines is None:
+        stdin_lines = LineReader(sys.stdin.fileno())
+    return stdin_lines
+
+def read_line(prompt=""):
+    """input() that shares its buffer with timed_input() when stdin is redirected."""
+    if sys.stdin.isatty():
+        return input(prompt)
+    print(prompt, end="", flush=True)
+    return redirected_stdin().readline()
+
+def read_line_before(prompt, deadline):
+    """Line read for redirected input. Returns None if the deadline passes first."""
+    print(prompt, end="", flush=True)
+    return redirected_stdin().readline(deadline)
+
+def timed_input(prompt, timeout, speed=1.0):
+    """Reads a line while counting down. Returns None if time runs out first.
+
+    The timeout is in game seconds, which run speed times faster than real time.
+    """
+    deadline = time.monotonic() + timeout / speed
+    if not sys.stdin.isatty():
+        return read_line_before(prompt, deadline)
+
+    print(prompt[:len(prompt) - len(prompt.lstrip("\n"))], end="")
+    prompt = prompt.strip()
+    typed = ""
+    shown = None
+    with keyboard() as keys:
+        while True:
+            remaining = max(0, deadline - time.monotonic())
+            line = f"\r⏰ Time remaining: {remaining * speed:4.1f} seconds  {prompt} {typed}\033[K"
+            if line != shown:
+                print(line, end="", flush=True)
+                shown = line
+            if remaining <= 0:
+                print()
+                return None
+            # Wake up for the next key or the next countdown redraw, whichever is first
+            for key in keys.read(min(REDRAW_INTERVAL, remaining)):
+                if key in "\r\n":
+                    print()
+                    return typed
+                elif key in "\x7f\b":
+                    typed = typed[:-1]
+                elif key == "\x03":
+                    raise KeyboardInterrupt
+                elif key.isprintable():
+                    typed += key
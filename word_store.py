@@ -0,0 +1,194 @@
+import argparse
+import math
+import mmap
+import os
+import random
+import struct
+import time
+import zlib
+
+# -----------------------------
+# Word Store
+# -----------------------------
+# A plain word list is compiled once into a sorted binary file and then
+# memory-mapped, so a game picks a word with two table lookups and nothing
+# is loaded or copied per game. Words are scored by length and letter rarity
+# and split into GRADES equal bands; a card plays the band of its number
+# (Hangman uses 1, 3, 5 and Encrypted Door 2, 4, 6).
+#
+# The file also holds an anagram index: words grouped by signature (their
+# letters in sorted order) and a hash table from signature to group, so all
+# the anagrams of a word are found with one or two probes.
+GRADES = 6
+DEFAULT_STORE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "words.bin")
+
+# Layout (little endian):
+#   header   magic b"WDST", version u16, grade count u16, word count u32, slot count u32
+#   grades   (first word index u32, word count u32) per grade
+#   offsets  u32 per word plus one past the end, from the start of the word data
+#   slots    (first group entry u32, group size u32) per hash slot, size 0 if empty
+#   groups   word index u32 per word, words with the same signature side by side
+#   words    ASCII bytes, sorted by grade and then alphabetically
+# A signature lives in slot crc32(signature) % slot count, or the next free
+# slot after it.
+MAGIC = b"WDST"
+VERSION = 2
+HEADER = struct.Struct("<4sHHII")
+GRADE_ENTRY = struct.Struct("<II")
+SLOT = struct.Struct("<II")
+
+def read_words(path, min_length=4, max_length=12):
+    """Lowercase a-z words from a list with one word per line, without duplicates."""
+    words = set()
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            word = line.strip().lower()
+            if min_length <= len(word) <= max_length and word.isascii() and word.isalpha():
+                words.add(word)
+    return sorted(words)
+
+def letter_rarity(words):
+    """-log2 of how often each letter appears across the word list."""
+    counts = {}
+    for word in words:
+        for letter in word:
+            counts[letter] = counts.get(letter, 0) + 1
+    total = sum(counts.values())
+    return {letter: -math.log2(count / total) for letter, count in counts.items()}
+
+def difficulty(word, rarity):
+    """Longer words with rarer letters score higher."""
+    letters = set(word)
+    return len(word) + sum(rarity[letter] for letter in letters) / len(letters)
+
+def signature(word):
+    return ''.join(sorted(word))
+
+def signature_slot(sig, slot_count):
+    return zlib.crc32(sig.encode("ascii")) % slot_count
+
+def build_anagram_index(words):
+    """Returns (slots, groups) for words in store order."""
+    by_signature = {}
+    for index, word in enumerate(words):
+        by_signature.setdefault(signature(word), []).append(index)
+    slot_count = 1
+    while slot_count < 2 * len(by_signature):  # At most half full, so probes stay short
+        slot_count *= 2
+    slots = [(0, 0)] * slot_count
+    groups = []
+    for sig, indexes in by_signature.items():
+        slot = signature_slot(sig, slot_count)
+        while slots[slot][1]:
+            slot = (slot + 1) % slot_count
+        slots[slot] = (len(groups), len(indexes))
+        groups.extend(indexes)
+    return slots, groups
+
+def compile_store(words, path=DEFAULT_STORE):
+    """Grades the words and writes them as a store file. Returns the word count per grade."""
+    rarity = letter_rarity(words)
+    ranked = sorted(words, key=lambda word: difficulty(word, rarity))
+    bands = [sorted(ranked[len(ranked) * g // GRADES:len(ranked) * (g + 1) // GRADES])
+             for g in range(GRADES)]
+    data = bytearray()
+    offsets = []
+    grades = []
+    for band in bands:
+        grades.append((len(offsets), len(band)))
+        for word in band:
+            offsets.append(len(data))
+            data += word.encode("ascii")
+    offsets.append(len(data))
+    slots, groups = build_anagram_index([word for band in bands for word in band])
+    # Write beside the old store and swap it in, so readers never see half a file
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, GRADES, len(offsets) - 1, len(slots)))
+        for first, count in grades:
+            f.write(GRADE_ENTRY.pack(first, count))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for first, count in slots:
+            f.write(SLOT.pack(first, count))
+        f.write(struct.pack(f"<{len(groups)}I", *groups))
+        f.write(data)
+    os.replace(temp_path, path)
+    return [len(band) for band in bands]
+
+class WordStore:
+    """Memory-mapped word store. Reading a word never touches the rest of the file."""
+    def __init__(self, path=DEFAULT_STORE):
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.buffer[:4] != MAGIC or struct.unpack_from("<H", self.buffer, 4)[0] != VERSION:
+            raise ValueError(f"{path} is not a word store this version can read, compile it again")
+        _, _, grade_count, self.count, self.slot_count = HEADER.unpack_from(self.buffer, 0)
+        self.grades = [GRADE_ENTRY.unpack_from(self.buffer, HEADER.size + GRADE_ENTRY.size * g)
+                       for g in range(grade_count)]
+        self.offsets_at = HEADER.size + GRADE_ENTRY.size * grade_count
+        self.slots_at = self.offsets_at + 4 * (self.count + 1)
+        self.groups_at = self.slots_at + SLOT.size * self.slot_count
+        self.data_at = self.groups_at + 4 * self.count
+
+    def __len__(self):
+        return self.count
+
+    def word(self, index):
+        start, end = struct.unpack_from("<II", self.buffer, self.offsets_at + 4 * index)
+        return self.buffer[self.data_at + start:self.data_at + end].decode("ascii")
+
+    def words(self, grade):
+        """Every word of a grade, read lazily in alphabetical order."""
+        first, count = self.grades[grade - 1]
+        for index in range(first, first + count):
+            yield self.word(index)
+
+    def sample(self, grade, rng=random):
+        """A random word of the grade, or None if the grade is empty."""
+        first, count = self.grades[grade - 1]
+        if not count:
+            return None
+        return self.word(first + rng.randrange(count))
+
+    def anagrams(self, word):
+        """Every word in the store made of exactly the same letters, the word itself included."""
+        sig = signature(word)
+        slot = signature_slot(sig, self.slot_count)
+        while True:
+            first, count = SLOT.unpack_from(self.buffer, self.slots_at + SLOT.size * slot)
+            if not count:
+                return []
+            indexes = struct.unpack_from(f"<{count}I", self.buffer, self.groups_at + 4 * first)
+            found = [self.word(index) for index in indexes]
+            if signature(found[0]) == sig:
+                return found
+            slot = (slot + 1) % self.slot_count
+
+_store = None
+
+def load_store(path=DEFAULT_STORE):
+    """The shared store, opened on first use. None if no store has been compiled."""
+    global _store
+    if _store is None and os.path.exists(path):
+        _store = WordStore(path)
+    return _store
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a word list for the Heart games.")
+    parser.add_argument("source", help="word list, one word per line (e.g. /usr/share/dict/words)")
+    parser.add_argument("--out", default=DEFAULT_STORE)
+    parser.add_argument("--min-length", type=int, default=4)
+    parser.add_argument("--max-length", type=int, default=12)
+    args = parser.parse_args()
+
+    start_time = time.time()
+    words = read_words(args.source, args.min_length, args.max_length)
+    counts = compile_store(words, args.out)
+    print(f"Compiled {len(words)} words in {time.time() - start_time:.1f} s")
+    store = WordStore(args.out)
+    for g, count in enumerate(counts, 1):
+        print(f"Grade {g}: {count} words, e.g. {', '.join(store.sample(g) for _ in range(3)) if count else '-'}")
+    print(f"Saved to {args.out} ({os.path.getsize(args.out)} bytes)")
+
+if __name__ == "__main__":
+    main()